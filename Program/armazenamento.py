@@ -0,0 +1,149 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+class ArmazenamentoClientes(ABC):
+    """Interface comum dos gerenciadores de clientes.
+
+    O serviço HTTP e a importação dependem apenas destes métodos, então o
+    armazenamento (arquivo JSON, SQLite) pode ser trocado sem alterá-los.
+    A interface gráfica usa o GerenciadorClientes diretamente: ela exibe a
+    lista e as ordens mantidas em memória, acompanha as alterações com
+    observar e lê as estatísticas e a gravação em segundo plano, que não
+    fazem parte desta interface. O índice devolvido por `buscar_cliente` e
+    `obter_todos_clientes` é o mesmo aceito por `editar_cliente` e
+    `remover_cliente`; os métodos `*_por_id` usam o id permanente do cliente.
+    Clientes de um histórico somente leitura, quando houver, aparecem nas
+    buscas com índice None.
+    """
+
+    @abstractmethod
+    def adicionar_cliente(self, cliente: 'Cliente') -> bool:
+        """Adiciona um novo cliente; falha se a placa já existir"""
+
+    @abstractmethod
+    def adicionar_clientes_em_lote(self, clientes: Iterable['Cliente']) -> Tuple[int, List['Cliente']]:
+        """Adiciona vários clientes em uma única gravação.
+
+        Retorna quantos foram adicionados e os recusados por placa repetida.
+        """
+
+    @abstractmethod
+    def editar_cliente(self, indice: int, cliente_atualizado: 'Cliente') -> bool:
+        """Substitui os dados de um cliente existente"""
+
+    @abstractmethod
+    def remover_cliente(self, indice: int) -> bool:
+        """Remove um cliente"""
+
+    @abstractmethod
+    def editar_cliente_por_id(self, id_cliente: str, cliente_atualizado: 'Cliente') -> bool:
+        """Substitui os dados do cliente com o id informado, mantendo o id"""
+
+    @abstractmethod
+    def remover_cliente_por_id(self, id_cliente: str) -> bool:
+        """Remove o cliente com o id informado"""
+
+    @abstractmethod
+    def obter_por_id(self, id_cliente: str) -> Optional['Cliente']:
+        """Retorna o cliente com o id informado, se existir"""
+
+    @abstractmethod
+    def buscar_cliente(self, termo: str) -> List[tuple]:
+        """Busca clientes por nome, placa ou telefone"""
+
+    @abstractmethod
+    def obter_todos_clientes(self) -> List[tuple]:
+        """Retorna todos os clientes com seus índices"""
+
+    @abstractmethod
+    def obter_por_placa(self, placa: str) -> Optional['Cliente']:
+        """Retorna o cliente com a placa informada, se existir"""
+
+    @abstractmethod
+    def total_clientes(self) -> int:
+        """Retorna a quantidade de clientes cadastrados"""
+
+    # Variantes paginadas e sob demanda da listagem e da busca. Estas versões
+    # usam os métodos acima; os armazenamentos as reescrevem para não montar
+    # a lista inteira.
+
+    def iterar_clientes(self, inicio: int = 0) -> Iterator[tuple]:
+        """Entrega (índice, Cliente) a partir da posição inicio"""
+        return iter(self.obter_todos_clientes()[inicio:])
+
+    def pagina_clientes(self, inicio: int, limite: int) -> List[tuple]:
+        """Até `limite` clientes a partir da posição inicio"""
+        return self.obter_todos_clientes()[inicio:inicio + limite]
+
+    def iterar_busca(self, termo: str) -> Iterator[tuple]:
+        """Entrega os resultados de buscar_cliente um a um"""
+        return iter(self.buscar_cliente(termo))
+
+    def buscar_pagina(self, termo: str, inicio: int, limite: int) -> List[tuple]:
+        """Até `limite` resultados da busca a partir da posição inicio"""
+        return self.buscar_cliente(termo)[inicio:inicio + limite]
+
+    def contar_busca(self, termo: str) -> int:
+        """Quantidade de resultados da busca"""
+        return len(self.buscar_cliente(termo))
+
+    def consultar(self, texto: str) -> List[tuple]:
+        """Busca por campos (`cidade:Campinas servico:Freios`), ver Program.consulta.
+
+        Esta versão verifica cliente a cliente; armazenamentos com índices
+        por campo podem fazer melhor. Levanta ValueError se a consulta for
+        inválida.
+        """
+        from Program.consulta import interpretar_consulta
+        criterios = interpretar_consulta(texto)
+        return [(indice, cliente) for indice, cliente in self.obter_todos_clientes()
+                if all(criterio.aceita(cliente) for criterio in criterios)]
+
+    def buscar_telefone(self, telefone: str) -> List[tuple]:
+        """Todos os clientes (veículos) com o telefone, completo ou só o final.
+
+        Esta versão verifica cliente a cliente; ver IndiceTelefones.
+        """
+        from Program.indices import IndiceTelefones
+        from Program.texto import apenas_digitos
+        digitos = apenas_digitos(telefone)
+        return [(indice, cliente) for indice, cliente in self.obter_todos_clientes()
+                if IndiceTelefones.combinam(digitos, apenas_digitos(cliente.telefone))]
+
+    def sugerir(self, campo: str, prefixo: str, limite: int = 10) -> List[str]:
+        """Valores já usados no campo que começam com o prefixo, dos mais usados aos menos.
+
+        Esta versão conta os valores de todos os clientes; ver TrieSugestoes.
+        """
+        from collections import Counter
+        from Program.texto import normalizar
+        chave = normalizar(prefixo)
+        contagens = Counter(getattr(cliente, campo) for _, cliente in self.obter_todos_clientes())
+        return [valor for valor, _ in contagens.most_common()
+                if normalizar(valor).startswith(chave)][:limite]
+
+    def buscar_com_tolerancia(self, termo: str) -> List[tuple]:
+        """Busca que tolera erros de digitação quando a busca normal não encontra nada.
+
+        Armazenamentos sem busca aproximada fazem apenas a busca normal.
+        """
+        return self.buscar_cliente(termo)
+
+    def sincronizar(self, esperar: bool = True) -> int:
+        """Incorpora alterações feitas por outros processos no mesmo armazenamento.
+
+        Retorna quantos clientes mudaram. Armazenamentos consultados
+        diretamente a cada operação (como o SQLite) não precisam fazer nada.
+        """
+        return 0
+
+
+def criar_gerenciador(arquivo_dados: str, **opcoes) -> ArmazenamentoClientes:
+    """Cria o gerenciador adequado à extensão do arquivo (.db/.sqlite ou JSON)"""
+    if arquivo_dados.endswith(('.db', '.sqlite', '.sqlite3')):
+        from Program.armazenamento_sqlite import GerenciadorClientesSQLite
+        return GerenciadorClientesSQLite(arquivo_dados)
+
+    from Program.cliente import GerenciadorClientes
+    return GerenciadorClientes(arquivo_dados, **opcoes)
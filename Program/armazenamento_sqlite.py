@@ -0,0 +1,321 @@
+import json
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from Program.armazenamento import ArmazenamentoClientes
+from Program.cliente import Cliente
+from Program.texto import apenas_digitos, digitos_telefone, normalizar, normalizar_placa
+
+COLUNAS = ('nome', 'telefone', 'cidade', 'placa', 'cor', 'modelo', 'servico', 'data_entrada')
+# Nome, placa e telefone na forma comparada pela busca, como em
+# GerenciadorClientes._textos_busca: sem acentos nem maiúsculas, O e I da
+# placa como 0 e 1 e só os dígitos do telefone
+COLUNAS_BUSCA = ('busca_nome', 'busca_placa', 'busca_telefone')
+SQL_INSERIR = (f"INSERT INTO clientes ({', '.join(COLUNAS + COLUNAS_BUSCA)}, data_ordem, uid) "
+               f"VALUES ({', '.join('?' * (len(COLUNAS) + len(COLUNAS_BUSCA) + 2))})")
+
+
+class GerenciadorClientesSQLite(ArmazenamentoClientes):
+    """Gerenciador de clientes armazenado em um banco SQLite.
+
+    Os clientes não são mantidos em memória: cada operação é uma consulta
+    ou uma transação no banco. O índice usado por editar/remover é o id da
+    linha, que não muda quando outros clientes são removidos; o id
+    permanente do Cliente fica na coluna uid. A busca encontra os mesmos
+    clientes que a do GerenciadorClientes, comparando colunas com o nome,
+    a placa e o telefone já normalizados.
+
+    Usado pelo serviço HTTP e pela importação; a interface gráfica precisa
+    do GerenciadorClientes (ver ArmazenamentoClientes).
+    """
+
+    def __init__(self, arquivo_dados: str = "clientes.db"):
+        self.arquivo_dados = arquivo_dados
+        self.versao = 0
+        # A busca assíncrona consulta o banco a partir de outra thread
+        self._trava = threading.Lock()
+        self.conexao = sqlite3.connect(arquivo_dados, check_same_thread=False)
+        self.conexao.row_factory = sqlite3.Row
+        self._criar_esquema()
+
+    def _criar_esquema(self):
+        """Cria as tabelas e índices, se ainda não existirem"""
+        with self.conexao:
+            self.conexao.execute("PRAGMA journal_mode=WAL")
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS clientes (
+                    id INTEGER PRIMARY KEY,
+                    uid TEXT UNIQUE,
+                    nome TEXT NOT NULL,
+                    telefone TEXT NOT NULL,
+                    cidade TEXT NOT NULL,
+                    placa TEXT NOT NULL UNIQUE,
+                    cor TEXT NOT NULL,
+                    modelo TEXT NOT NULL,
+                    servico TEXT NOT NULL,
+                    data_entrada TEXT NOT NULL,
+                    data_ordem TEXT NOT NULL,
+                    busca_nome TEXT NOT NULL,
+                    busca_placa TEXT NOT NULL,
+                    busca_telefone TEXT NOT NULL
+                )""")
+            self.conexao.execute("CREATE INDEX IF NOT EXISTS idx_clientes_nome ON clientes(nome)")
+            self.conexao.execute("CREATE INDEX IF NOT EXISTS idx_clientes_telefone ON clientes(telefone)")
+            self.conexao.execute("CREATE INDEX IF NOT EXISTS idx_clientes_data ON clientes(data_ordem)")
+            self.busca_textual = self._criar_busca_textual()
+
+    @staticmethod
+    def _textos_busca(nome: str, placa: str, telefone: str) -> tuple:
+        """Valores das colunas de busca"""
+        return normalizar(nome), normalizar_placa(placa), apenas_digitos(telefone)
+
+    def _criar_busca_textual(self) -> bool:
+        """Cria o índice FTS5 de trigramas usado na busca por substring.
+
+        Retorna False se o SQLite disponível não tiver o tokenizador trigram
+        (versões anteriores à 3.34); nesse caso a busca usa LIKE.
+        """
+        existia = self.conexao.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'clientes_busca'").fetchone()
+        try:
+            self.conexao.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS clientes_busca USING fts5(
+                    busca_nome, busca_placa, busca_telefone,
+                    content='clientes', content_rowid='id', tokenize='trigram'
+                )""")
+        except sqlite3.OperationalError:
+            return False
+        self.conexao.executescript("""
+            CREATE TRIGGER IF NOT EXISTS clientes_busca_ai AFTER INSERT ON clientes BEGIN
+                INSERT INTO clientes_busca(rowid, busca_nome, busca_placa, busca_telefone)
+                VALUES (new.id, new.busca_nome, new.busca_placa, new.busca_telefone);
+            END;
+            CREATE TRIGGER IF NOT EXISTS clientes_busca_ad AFTER DELETE ON clientes BEGIN
+                INSERT INTO clientes_busca(clientes_busca, rowid, busca_nome, busca_placa, busca_telefone)
+                VALUES ('delete', old.id, old.busca_nome, old.busca_placa, old.busca_telefone);
+            END;
+            CREATE TRIGGER IF NOT EXISTS clientes_busca_au AFTER UPDATE ON clientes BEGIN
+                INSERT INTO clientes_busca(clientes_busca, rowid, busca_nome, busca_placa, busca_telefone)
+                VALUES ('delete', old.id, old.busca_nome, old.busca_placa, old.busca_telefone);
+                INSERT INTO clientes_busca(rowid, busca_nome, busca_placa, busca_telefone)
+                VALUES (new.id, new.busca_nome, new.busca_placa, new.busca_telefone);
+            END;
+        """)
+        if not existia:
+            # Indexa os clientes que já estavam no banco
+            self.conexao.execute("INSERT INTO clientes_busca(clientes_busca) VALUES ('rebuild')")
+        return True
+
+    def _valores(self, cliente: Cliente) -> tuple:
+        """Valores das colunas de um cliente, incluindo as de busca e a data ordenável"""
+        try:
+            data_ordem = datetime.strptime(cliente.data_entrada, "%d/%m/%Y").strftime("%Y-%m-%d")
+        except ValueError:
+            data_ordem = ''
+        return (tuple(getattr(cliente, coluna) for coluna in COLUNAS)
+                + self._textos_busca(cliente.nome, cliente.placa, cliente.telefone)
+                + (data_ordem, cliente.id))
+
+    def _cliente(self, linha: sqlite3.Row) -> Cliente:
+        """Monta o Cliente de uma linha; o id do Cliente é a coluna uid"""
+        dados = dict(linha)
+        dados['id'] = dados['uid']
+        return Cliente.from_dict(dados)
+
+    def _consultar(self, sql: str, parametros: tuple = ()) -> List[tuple]:
+        """Executa uma consulta e retorna (id, Cliente) para cada linha"""
+        with self._trava:
+            linhas = self.conexao.execute(sql, parametros).fetchall()
+        return [(linha['id'], self._cliente(linha)) for linha in linhas]
+
+    def _executar(self, sql: str, parametros: tuple) -> bool:
+        """Executa uma alteração em uma transação"""
+        try:
+            with self._trava, self.conexao:
+                cursor = self.conexao.execute(sql, parametros)
+                self.versao += 1
+        except sqlite3.IntegrityError:
+            return False
+        except sqlite3.Error as e:
+            print(f"Erro ao salvar dados: {e}")
+            return False
+        return cursor.rowcount > 0
+
+    def adicionar_cliente(self, cliente: Cliente) -> bool:
+        """Adiciona um novo cliente"""
+        return self._executar(SQL_INSERIR, self._valores(cliente))
+
+    def adicionar_clientes_em_lote(self, clientes: Iterable[Cliente]) -> Tuple[int, List[Cliente]]:
+        """Adiciona vários clientes em uma única transação"""
+        recusados = []
+        adicionados = 0
+        sql = SQL_INSERIR.replace("INSERT", "INSERT OR IGNORE", 1)
+        try:
+            with self._trava, self.conexao:
+                for cliente in clientes:
+                    if self.conexao.execute(sql, self._valores(cliente)).rowcount:
+                        adicionados += 1
+                    else:
+                        recusados.append(cliente)
+                self.versao += 1
+        except sqlite3.Error as e:
+            print(f"Erro ao salvar dados: {e}")
+            return 0, recusados
+        return adicionados, recusados
+
+    def editar_cliente(self, indice: int, cliente_atualizado: Cliente) -> bool:
+        """Edita um cliente existente"""
+        return self._editar("id", indice, cliente_atualizado)
+
+    def editar_cliente_por_id(self, id_cliente: str, cliente_atualizado: Cliente) -> bool:
+        """Edita o cliente com o id informado, mantendo o id"""
+        return self._editar("uid", id_cliente, cliente_atualizado)
+
+    def _editar(self, coluna_chave: str, chave, cliente_atualizado: Cliente) -> bool:
+        atribuicoes = ', '.join(f"{coluna} = ?"
+                                for coluna in COLUNAS + COLUNAS_BUSCA + ('data_ordem',))
+        valores = self._valores(cliente_atualizado)[:-1]
+        return self._executar(f"UPDATE clientes SET {atribuicoes} WHERE {coluna_chave} = ?",
+                              valores + (chave,))
+
+    def remover_cliente(self, indice: int) -> bool:
+        """Remove um cliente"""
+        return self._executar("DELETE FROM clientes WHERE id = ?", (indice,))
+
+    def remover_cliente_por_id(self, id_cliente: str) -> bool:
+        """Remove o cliente com o id informado"""
+        return self._executar("DELETE FROM clientes WHERE uid = ?", (id_cliente,))
+
+    def obter_por_id(self, id_cliente: str) -> Optional[Cliente]:
+        """Retorna o cliente com o id informado, se existir"""
+        resultado = self._consultar("SELECT * FROM clientes WHERE uid = ?", (id_cliente,))
+        return resultado[0][1] if resultado else None
+
+    def _filtro_busca(self, termo: str) -> Tuple[str, tuple]:
+        """Condição WHERE e parâmetros da busca por nome, placa ou telefone.
+
+        Como no GerenciadorClientes, o termo é comparado sem acentos nem
+        maiúsculas, na placa com O e I como 0 e 1, e os seus dígitos com os
+        do telefone quando ele pode ser um telefone. Trechos com 3 ou mais
+        caracteres usam o índice de trigramas; os mais curtos, LIKE.
+        """
+        termo = normalizar(termo)
+        termos = {'busca_nome': termo, 'busca_placa': normalizar_placa(termo)}
+        digitos = digitos_telefone(termo)
+        if digitos is not None:
+            termos['busca_telefone'] = digitos
+
+        condicoes, parametros, frases = [], [], []
+        for coluna, trecho in termos.items():
+            if self.busca_textual and len(trecho) >= 3:
+                frases.append(f'{coluna} : "' + trecho.replace('"', '""') + '"')
+            else:
+                condicoes.append(f"{coluna} LIKE ? ESCAPE '\\'")
+                parametros.append('%' + trecho.replace('\\', '\\\\').replace('%', '\\%')
+                                  .replace('_', '\\_') + '%')
+        if frases:
+            condicoes.append("id IN (SELECT rowid FROM clientes_busca WHERE clientes_busca MATCH ?)")
+            parametros.append(' OR '.join(frases))
+        return '(' + ' OR '.join(condicoes) + ')', tuple(parametros)
+
+    def buscar_cliente(self, termo: str) -> List[tuple]:
+        """Busca clientes por nome, placa ou telefone"""
+        filtro, parametros = self._filtro_busca(termo)
+        return self._consultar(f"SELECT * FROM clientes WHERE {filtro} ORDER BY id", parametros)
+
+    def buscar_pagina(self, termo: str, inicio: int, limite: int) -> List[tuple]:
+        """Até `limite` resultados da busca a partir da posição inicio"""
+        filtro, parametros = self._filtro_busca(termo)
+        return self._consultar(f"SELECT * FROM clientes WHERE {filtro} ORDER BY id "
+                               "LIMIT ? OFFSET ?", parametros + (limite, inicio))
+
+    def iterar_busca(self, termo: str) -> Iterator[tuple]:
+        """Entrega os resultados da busca lendo o banco em blocos"""
+        filtro, parametros = self._filtro_busca(termo)
+        return self._iterar(filtro, parametros)
+
+    def contar_busca(self, termo: str) -> int:
+        """Quantidade de resultados da busca, contada pelo banco"""
+        filtro, parametros = self._filtro_busca(termo)
+        with self._trava:
+            return self.conexao.execute(
+                f"SELECT COUNT(*) FROM clientes WHERE {filtro}", parametros).fetchone()[0]
+
+    def obter_todos_clientes(self) -> List[tuple]:
+        """Retorna todos os clientes com seus índices"""
+        return self._consultar("SELECT * FROM clientes ORDER BY id")
+
+    def pagina_clientes(self, inicio: int, limite: int) -> List[tuple]:
+        """Até `limite` clientes a partir da posição inicio"""
+        return self._consultar("SELECT * FROM clientes ORDER BY id LIMIT ? OFFSET ?",
+                               (limite, inicio))
+
+    def iterar_clientes(self, inicio: int = 0) -> Iterator[tuple]:
+        """Entrega os clientes a partir da posição inicio, lendo o banco em blocos"""
+        return self._iterar("1", (), inicio)
+
+    def _iterar(self, filtro: str, parametros: tuple, inicio: int = 0,
+                tamanho_bloco: int = 500) -> Iterator[tuple]:
+        """Percorre as linhas do filtro em ordem de id, um bloco por consulta.
+
+        Cada bloco continua a partir do último id lido, sem OFFSET, e a trava
+        não fica presa entre os blocos.
+        """
+        bloco = self._consultar(f"SELECT * FROM clientes WHERE {filtro} ORDER BY id "
+                                "LIMIT ? OFFSET ?", parametros + (tamanho_bloco, inicio))
+        while bloco:
+            yield from bloco
+            bloco = self._consultar(f"SELECT * FROM clientes WHERE {filtro} AND id > ? "
+                                    "ORDER BY id LIMIT ?",
+                                    parametros + (bloco[-1][0], tamanho_bloco))
+
+    def obter_por_placa(self, placa: str) -> Optional[Cliente]:
+        """Retorna o cliente com a placa informada, se existir"""
+        resultado = self._consultar("SELECT * FROM clientes WHERE placa = ?",
+                                    (placa.strip().upper(),))
+        return resultado[0][1] if resultado else None
+
+    def total_clientes(self) -> int:
+        """Retorna a quantidade de clientes cadastrados"""
+        with self._trava:
+            return self.conexao.execute("SELECT COUNT(*) FROM clientes").fetchone()[0]
+
+    def importar_json(self, arquivo_json: str) -> tuple:
+        """Importa um clientes.json em uma única transação.
+
+        Clientes com placa já cadastrada são ignorados. Retorna a quantidade
+        de clientes importados e ignorados.
+        """
+        with open(arquivo_json, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+
+        with self._trava, self.conexao:
+            cursor = self.conexao.executemany(
+                SQL_INSERIR.replace("INSERT", "INSERT OR IGNORE", 1),
+                (self._valores(Cliente.from_dict(item)) for item in dados))
+            importados = cursor.rowcount
+            self.versao += 1
+        return importados, len(dados) - importados
+
+    def fechar(self):
+        """Fecha a conexão com o banco"""
+        self.conexao.close()
+
+
+def main():
+    """Migra um clientes.json para um banco SQLite"""
+    if len(sys.argv) != 3:
+        print("Uso: python -m Program.armazenamento_sqlite clientes.json clientes.db")
+        sys.exit(1)
+
+    gerenciador = GerenciadorClientesSQLite(sys.argv[2])
+    importados, ignorados = gerenciador.importar_json(sys.argv[1])
+    gerenciador.fechar()
+    print(f"{importados} clientes importados, {ignorados} ignorados (placa repetida)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import time
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def gravar_atomicamente(caminho: str, conteudo: bytes):
+    """Grava o conteúdo em um arquivo temporário e o substitui atomicamente"""
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    fd, caminho_temp = tempfile.mkstemp(prefix='.tmp-', dir=diretorio)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(caminho_temp, caminho)
+    except BaseException:
+        if os.path.exists(caminho_temp):
+            os.remove(caminho_temp)
+        raise
+
+
+def carimbo_arquivo(info: os.stat_result) -> Tuple[int, int, int]:
+    """Identifica uma versão do arquivo sem lê-lo.
+
+    Como o arquivo é sempre substituído por os.replace, cada gravação gera
+    um novo inode, além de mudar a data de modificação.
+    """
+    return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+
+def carimbo_atual(caminho: str) -> Optional[Tuple[int, int, int]]:
+    """Carimbo do arquivo no disco, ou None se ele não existir"""
+    try:
+        return carimbo_arquivo(os.stat(caminho))
+    except FileNotFoundError:
+        return None
+
+
+class TravaArquivo:
+    """Trava exclusiva entre processos, usando um arquivo `<caminho>.lock`.
+
+    Serve para que várias estações gravando o mesmo arquivo de dados (por
+    exemplo em uma pasta compartilhada) não gravem ao mesmo tempo.
+    """
+
+    def __init__(self, caminho: str, timeout: float = 10.0):
+        self.caminho = caminho + ".lock"
+        self.timeout = timeout
+        self._arquivo = None
+
+    def __enter__(self):
+        arquivo = open(self.caminho, 'a+b')
+        limite = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    arquivo.seek(0)
+                    msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() >= limite:
+                    arquivo.close()
+                    raise TimeoutError(f"Arquivo em uso por outra estação: {self.caminho}")
+                time.sleep(0.05)
+        self._arquivo = arquivo
+        return self
+
+    def __exit__(self, *exc):
+        arquivo, self._arquivo = self._arquivo, None
+        try:
+            if fcntl:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+            else:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            arquivo.close()
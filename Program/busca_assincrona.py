@@ -0,0 +1,76 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+
+class BuscaAssincrona:
+    """Executa buscas fora da thread do Tk, com debounce e descarte de buscas obsoletas.
+
+    Cada tecla apenas reagenda a busca; ela só começa depois de `atraso_ms`
+    sem digitação. A busca roda em uma thread de trabalho e o resultado é
+    entregue na thread do Tk por `ao_concluir(termo, resultados)`. Quando um
+    termo mais novo chega, a busca anterior é cancelada se ainda não começou
+    e, se já estiver rodando, seu resultado é descartado. `buscar` troca o
+    método do gerenciador usado (por padrão, buscar_cliente).
+    """
+
+    INTERVALO_VERIFICACAO_MS = 20
+
+    def __init__(self, root, gerenciador, ao_concluir: Callable[[str, List[tuple]], None],
+                 atraso_ms: int = 200, buscar: Optional[Callable[[str], List[tuple]]] = None):
+        self.root = root
+        self.gerenciador = gerenciador
+        self.ao_concluir = ao_concluir
+        self.atraso_ms = atraso_ms
+        self.buscar = buscar
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._agendamento: Optional[str] = None
+        self._futuro: Optional[Future] = None
+        self._termo = ''
+        self._versao = 0
+
+    def agendar(self, termo: str):
+        """Reinicia a contagem do debounce para o novo termo"""
+        self.cancelar()
+        self._termo = termo
+        self._agendamento = self.root.after(self.atraso_ms, self._iniciar)
+
+    def cancelar(self):
+        """Cancela a busca agendada ou em andamento"""
+        if self._agendamento is not None:
+            self.root.after_cancel(self._agendamento)
+            self._agendamento = None
+        if self._futuro is not None:
+            self._futuro.cancel()
+            self._futuro = None
+
+    def encerrar(self):
+        """Cancela buscas pendentes e libera a thread de trabalho"""
+        self.cancelar()
+        self._executor.shutdown(wait=False)
+
+    def _iniciar(self):
+        self._agendamento = None
+        self._versao = self.gerenciador.versao
+        buscar = self.buscar or self.gerenciador.buscar_cliente
+        self._futuro = self._executor.submit(buscar, self._termo)
+        self.root.after(self.INTERVALO_VERIFICACAO_MS, self._verificar, self._futuro)
+
+    def _verificar(self, futuro: Future):
+        if futuro is not self._futuro:
+            return  # Substituída por uma busca mais nova
+        if not futuro.done():
+            self.root.after(self.INTERVALO_VERIFICACAO_MS, self._verificar, futuro)
+            return
+
+        self._futuro = None
+        try:
+            resultados = futuro.result()
+        except (RuntimeError, KeyError):
+            # Os índices mudaram enquanto a busca rodava
+            resultados = None
+        if resultados is None or self._versao != self.gerenciador.versao:
+            # Os dados mudaram durante a busca: refaz com os dados atuais
+            self._iniciar()
+            return
+        self.ao_concluir(self._termo, resultados)
@@ -0,0 +1,147 @@
+import codecs
+import json
+import os
+import queue
+import threading
+import zlib
+from typing import Dict, Iterator, List
+
+from Program.arquivos import carimbo_arquivo
+from Program.cliente import Cliente, clientes_do_arquivo
+from Program.journal import assinatura_snapshot
+from Program.snapshot import MAGICO, eh_snapshot
+
+
+class LeitorIncremental:
+    """Lê a lista de clientes de um arquivo JSON em blocos, sem carregá-lo inteiro.
+
+    Cada bloco lido é decodificado e os objetos completos encontrados nele são
+    devolvidos; o restante fica no buffer até o próximo bloco. Ao final,
+    `assinatura` identifica o arquivo lido da mesma forma que o journal e
+    `carimbo`, a versão do arquivo (ver carimbo_arquivo).
+    """
+
+    def __init__(self, caminho: str, tamanho_bloco: int = 1 << 16):
+        self.caminho = caminho
+        self.tamanho_bloco = tamanho_bloco
+        self.assinatura = assinatura_snapshot(0, 0)
+        self.carimbo = None
+
+    def __iter__(self) -> Iterator[List[Dict]]:
+        if not os.path.exists(self.caminho):
+            return
+
+        decodificador_utf8 = codecs.getincrementaldecoder('utf-8')()
+        decodificador_json = json.JSONDecoder()
+        buffer = ''
+        inicio_lista = False
+        tamanho = crc = 0
+
+        with open(self.caminho, 'rb') as f:
+            self.carimbo = carimbo_arquivo(os.fstat(f.fileno()))
+            while True:
+                bloco = f.read(self.tamanho_bloco)
+                fim = not bloco
+                tamanho += len(bloco)
+                crc = zlib.crc32(bloco, crc)
+                buffer += decodificador_utf8.decode(bloco, final=fim)
+
+                objetos = []
+                pos = 0
+                while True:
+                    pos = self._pular_espacos(buffer, pos)
+                    if pos >= len(buffer):
+                        break
+                    if not inicio_lista:
+                        if buffer[pos] != '[':
+                            raise json.JSONDecodeError("Esperado '['", buffer, pos)
+                        inicio_lista = True
+                        pos += 1
+                        continue
+                    if buffer[pos] in ',]':
+                        pos += 1
+                        continue
+                    try:
+                        objeto, pos_final = decodificador_json.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        if fim:
+                            raise
+                        break  # Objeto incompleto: espera o próximo bloco
+                    objetos.append(objeto)
+                    pos = pos_final
+
+                buffer = buffer[pos:]
+                if objetos:
+                    yield objetos
+                if fim:
+                    break
+
+        self.assinatura = assinatura_snapshot(tamanho, crc)
+
+    @staticmethod
+    def _pular_espacos(texto: str, pos: int) -> int:
+        while pos < len(texto) and texto[pos] in ' \t\r\n':
+            pos += 1
+        return pos
+
+
+class CarregadorEmSegundoPlano:
+    """Converte o arquivo em objetos Cliente em uma thread separada.
+
+    Os lotes prontos ficam em `fila` como ('lote', [Cliente, ...]); ao final
+    vem ('fim', (assinatura, ids_gerados, carimbo)) ou ('erro', exceção).
+    Quem consome a fila (a thread do Tk) é quem os incorpora ao gerenciador.
+    """
+
+    def __init__(self, caminho: str, tamanho_lote: int = 2000):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self.fila: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+
+    def iniciar(self):
+        """Começa a leitura do arquivo"""
+        self._thread.start()
+
+    def _executar(self):
+        if self._eh_snapshot():
+            self._executar_snapshot()
+            return
+        leitor = LeitorIncremental(self.caminho)
+        lote = []
+        ids_gerados = False
+        try:
+            for objetos in leitor:
+                for dados in objetos:
+                    lote.append(Cliente.from_dict(dados))
+                    ids_gerados = ids_gerados or 'id' not in dados
+                    if len(lote) >= self.tamanho_lote:
+                        self.fila.put(('lote', lote))
+                        lote = []
+            if lote:
+                self.fila.put(('lote', lote))
+            self.fila.put(('fim', (leitor.assinatura, ids_gerados, leitor.carimbo)))
+        except (json.JSONDecodeError, UnicodeDecodeError, KeyError) as e:
+            self.fila.put(('erro', e))
+
+    def _eh_snapshot(self) -> bool:
+        try:
+            with open(self.caminho, 'rb') as f:
+                return eh_snapshot(f.read(len(MAGICO)))
+        except OSError:
+            return False
+
+    def _executar_snapshot(self):
+        """O formato binário é decodificado de uma vez (é rápido) e entregue em lotes"""
+        try:
+            with open(self.caminho, 'rb') as f:
+                carimbo = carimbo_arquivo(os.fstat(f.fileno()))
+                conteudo = f.read()
+            clientes, ids_gerados = clientes_do_arquivo(conteudo)
+        except (OSError, ValueError, KeyError) as e:
+            self.fila.put(('erro', e))
+            return
+        for inicio in range(0, len(clientes), self.tamanho_lote):
+            self.fila.put(('lote', clientes[inicio:inicio + self.tamanho_lote]))
+        assinatura = assinatura_snapshot(len(conteudo), zlib.crc32(conteudo))
+        self.fila.put(('fim', (assinatura, ids_gerados, carimbo)))
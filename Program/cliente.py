@@ -1,23 +1,85 @@
+import gc
 import json
+import operator
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
+import sys
+import threading
+import uuid
+import heapq
+import zlib
+from collections import Counter
+from datetime import date, datetime
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, List, Dict, NamedTuple, Optional, Tuple
+
+from Program.armazenamento import ArmazenamentoClientes
+from Program.consulta import CAMPOS_CATEGORIA, Criterio, eh_consulta, interpretar_consulta
+from Program.arquivos import TravaArquivo, carimbo_arquivo, carimbo_atual, gravar_atomicamente
+from Program.gravacao import GravadorEmSegundoPlano
+from Program.historico import HistoricoClientes
+from Program.estatisticas import EstatisticasClientes
+from Program.indices import (ArvoreBK, IndiceSegmentos, IndiceTelefones, IndiceTrigramas,
+                              IndiceValores, PosicoesLista, TrieSugestoes, distancia_edicao)
+from Program.journal import Journal, assinatura_snapshot
+from Program.ordenacao import OrdemCampo, VisaoOrdenada, chave_ordenacao, ordinal_data
+from Program.snapshot import codificar_snapshot, decodificar_snapshot, eh_snapshot
+from Program.texto import (apenas_digitos, digitos_telefone, normalizar, normalizar_placa,
+                           normalizar_repetido)
+
+# Serviços oferecidos no formulário de cadastro
+SERVICOS = [
+    "Troca de óleo", "Revisão geral", "Freios", "Suspensão",
+    "Motor", "Transmissão", "Ar condicionado", "Elétrica",
+    "Pintura", "Funilaria", "Pneus", "Outros"
+]
+
+# Campos de um cliente, na ordem em que são gravados no arquivo de dados
+CAMPOS_JSON = ('id', 'nome', 'telefone', 'cidade', 'placa', 'cor', 'modelo',
+               'servico', 'data_entrada')
+valores_json = operator.attrgetter(*CAMPOS_JSON)
+# Campos com poucos valores distintos, que os clientes compartilham (sys.intern)
+CAMPOS_REPETIDOS = ('cidade', 'cor', 'modelo', 'servico', 'data_entrada')
+# Campos de texto livre com sugestões ao digitar (ver GerenciadorClientes.sugerir)
+CAMPOS_SUGESTAO = ('cidade', 'modelo', 'cor')
+# Formatos do arquivo de dados; o binário (ver Program.snapshot) usa a extensão .bin
+FORMATOS = ('json', 'binario')
+# Edições toleradas, no máximo, entre uma placa e o termo da busca aproximada
+EDICOES_PLACA = 2
+
+
+def compartilhado(valor):
+    """A string compartilhada (sys.intern) igual ao valor; outros valores ficam como estão.
+
+    Um valor que não é texto não pode ser compartilhado e não impede a
+    criação do cliente.
+    """
+    return sys.intern(valor) if isinstance(valor, str) else valor
+
 
 class Cliente:
+    # Sem __dict__ por instância: economiza memória com muitos clientes
+    __slots__ = ('id', 'nome', 'telefone', 'cidade', 'placa', 'cor', 'modelo',
+                 'servico', 'data_entrada')
+    
     def __init__(self, nome: str, telefone: str, cidade: str, placa: str, 
-                 cor: str, modelo: str, servico: str, data_entrada: str = None):
+                 cor: str, modelo: str, servico: str, data_entrada: str = None,
+                 id: str = None):
+        # Identificador permanente, não muda com edições nem com a posição na lista
+        self.id = id or uuid.uuid4().hex
         self.nome = nome
         self.telefone = telefone
-        self.cidade = cidade
         self.placa = placa.upper()  # Placa sempre em maiúsculo
-        self.cor = cor
-        self.modelo = modelo
-        self.servico = servico
-        self.data_entrada = data_entrada or datetime.now().strftime("%d/%m/%Y")
+        # Campos com poucos valores distintos compartilham a mesma string
+        self.cidade = compartilhado(cidade)
+        self.cor = compartilhado(cor)
+        self.modelo = compartilhado(modelo)
+        self.servico = compartilhado(servico)
+        self.data_entrada = compartilhado(data_entrada or datetime.now().strftime("%d/%m/%Y"))
     
     def to_dict(self) -> Dict:
         """Converte o cliente para dicionário"""
         return {
+            'id': self.id,
             'nome': self.nome,
             'telefone': self.telefone,
             'cidade': self.cidade,
@@ -30,90 +92,1210 @@ class Cliente:
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'Cliente':
-        """Cria um cliente a partir de um dicionário"""
+        """Cria um cliente a partir de um dicionário.
+        
+        Campos nulos viram texto vazio e números viram texto, para que
+        arquivos editados à mão continuem abrindo e sendo buscados.
+        """
+        def texto(campo: str) -> str:
+            valor = data[campo]
+            return '' if valor is None else str(valor)
+        
         return cls(
-            nome=data['nome'],
-            telefone=data['telefone'],
-            cidade=data['cidade'],
-            placa=data['placa'],
-            cor=data['cor'],
-            modelo=data['modelo'],
-            servico=data['servico'],
-            data_entrada=data['data_entrada']
+            nome=texto('nome'),
+            telefone=texto('telefone'),
+            cidade=texto('cidade'),
+            placa=texto('placa'),
+            cor=texto('cor'),
+            modelo=texto('modelo'),
+            servico=texto('servico'),
+            data_entrada=data['data_entrada'] and texto('data_entrada'),
+            id=data.get('id')
         )
+    
+    @classmethod
+    def de_colunas(cls, colunas: Dict[str, list]) -> List['Cliente']:
+        """Cria clientes a partir dos valores de cada campo (ver decodificar_snapshot).
+        
+        Os valores já estão como o Cliente os grava (placa em maiúsculo, data
+        e id preenchidos), então o __init__ não é chamado. A coleta de lixo
+        fica pausada enquanto os objetos são criados: com muitos clientes ela
+        seria boa parte do tempo.
+        """
+        novo = object.__new__
+        
+        def criar(id, nome, telefone, cidade, placa, cor, modelo, servico, data_entrada):
+            cliente = novo(cls)
+            cliente.id = id
+            cliente.nome = nome
+            cliente.telefone = telefone
+            cliente.cidade = cidade
+            cliente.placa = placa
+            cliente.cor = cor
+            cliente.modelo = modelo
+            cliente.servico = servico
+            cliente.data_entrada = data_entrada
+            return cliente
+        
+        valores = [colunas[campo] for campo in CAMPOS_JSON]
+        coleta_ativa = gc.isenabled()
+        gc.disable()
+        try:
+            return list(map(criar, *valores))
+        finally:
+            if coleta_ativa:
+                gc.enable()
+
+
+def clientes_do_arquivo(conteudo: bytes) -> Tuple[List[Cliente], bool]:
+    """Clientes do arquivo de dados (JSON ou binário) e se algum recebeu id novo.
+    
+    Levanta ValueError (ou KeyError, se faltar um campo) se o conteúdo for inválido.
+    """
+    if eh_snapshot(conteudo):
+        return Cliente.de_colunas(decodificar_snapshot(conteudo, CAMPOS_REPETIDOS)), False
+    dados = json.loads(conteudo.decode('utf-8'))
+    clientes = [Cliente.from_dict(cliente_data) for cliente_data in dados]
+    return clientes, any('id' not in cliente_data for cliente_data in dados)
+
+
+def registros_do_arquivo(conteudo: bytes) -> List[Dict]:
+    """Registros do arquivo de dados (JSON ou binário) como dicionários"""
+    if eh_snapshot(conteudo):
+        colunas = decodificar_snapshot(conteudo)
+        return [dict(zip(colunas, valores)) for valores in zip(*colunas.values())]
+    return json.loads(conteudo.decode('utf-8'))
+
 
-class GerenciadorClientes:
-    def __init__(self, arquivo_dados: str = "clientes.json"):
+def serializar_clientes(clientes: List[Cliente], formato: str = 'json') -> bytes:
+    """Conteúdo do arquivo de dados no formato 'json' ou 'binario'"""
+    if formato == 'binario':
+        return codificar_snapshot(CAMPOS_JSON, map(valores_json, clientes))
+    if formato != 'json':
+        raise ValueError(f"Formato de dados desconhecido: {formato!r}")
+    return json.dumps([cliente.to_dict() for cliente in clientes],
+                      indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def formato_do_arquivo(arquivo_dados: str) -> str:
+    """Formato do arquivo de dados pela extensão: 'binario' para .bin"""
+    return 'binario' if arquivo_dados.endswith('.bin') else 'json'
+
+
+class AlteracaoCliente(NamedTuple):
+    """Uma alteração na lista de clientes, entregue aos observadores do gerenciador.
+
+    `tipo` é 'inserido', 'alterado', 'removido' ou 'recarregado'. Em
+    'recarregado' a lista inteira mudou (carregamento, arquivamento) e os
+    demais campos ficam vazios. `id` identifica o cliente, `cliente` é o
+    objeto atual (None na remoção) e `anterior`, o objeto substituído ou
+    removido. `posicao` é a posição do cliente na lista (na remoção, a que
+    ele ocupava).
+    """
+    tipo: str
+    id: Optional[str] = None
+    cliente: Optional[Cliente] = None
+    anterior: Optional[Cliente] = None
+    posicao: Optional[int] = None
+
+
+class GerenciadorClientes(ArmazenamentoClientes):
+    TAMANHO_CACHE_BUSCA = 64
+    
+    def __init__(self, arquivo_dados: str = "clientes.json", modo_journal: bool = False,
+                 limite_compactacao: int = 1000, carregar: bool = True,
+                 gravacao_adiada: bool = False, atraso_gravacao: float = 0.5,
+                 idade_arquivamento: Optional[int] = None, formato: Optional[str] = None,
+                 ao_falhar_gravacao: Optional[Callable[[], None]] = None):
         self.arquivo_dados = arquivo_dados
+        # Formato usado na gravação: 'json' ou 'binario' (ver Program.snapshot),
+        # definido pela extensão do arquivo; `formato`, se informado, precisa
+        # ser o mesmo. A leitura aceita os dois.
+        self.formato = formato_do_arquivo(arquivo_dados)
+        if formato is not None and formato != self.formato:
+            if formato not in FORMATOS:
+                raise ValueError(f"Formato de dados desconhecido: {formato!r}")
+            raise ValueError(f"O formato {formato!r} não combina com o arquivo {arquivo_dados!r}; "
+                             "o formato binário usa arquivos .bin")
         self.clientes: List[Cliente] = []
-        self.carregar_dados()
+        self._por_placa: Dict[str, Cliente] = {}
+        self._por_id: Dict[str, Cliente] = {}
+        # Posição de cada cliente na lista (ver PosicoesLista)
+        self._posicao = PosicoesLista()
+        # Nome, placa e telefone de cada cliente na forma comparada pela busca
+        self._chaves_busca: Dict[Cliente, tuple] = {}
+        self._indice_busca = IndiceTrigramas()
+        # Telefones só com dígitos, pelo número completo e pelo final
+        self._telefones = IndiceTelefones()
+        # Índices da busca aproximada (palavras do nome e placas), criados na
+        # primeira busca aproximada e mantidos depois
+        self._nomes_aproximados: Optional[ArvoreBK] = None
+        self._placas_aproximadas: Optional[IndiceSegmentos] = None
+        # Índices de valores por campo (cidade, serviço, data...) usados pelas
+        # consultas por campo; criados na primeira consulta e mantidos depois
+        self._indices_campos: Dict[str, IndiceValores] = {}
+        # Ordens por campo, criadas na primeira ordenação e mantidas depois
+        self._ordens: Dict[str, OrdemCampo] = {}
+        # Sugestões por campo, criadas na primeira sugestão e mantidas depois
+        self._sugestoes: Dict[str, TrieSugestoes] = {}
+        # Contadores por dia, mês, serviço e cidade, sempre atualizados
+        self.estatisticas = EstatisticasClientes()
+        # Resultados de buscas recentes; invalidados a cada alteração
+        self._cache_busca: Dict[str, List[tuple]] = {}
+        self.versao = 0
+        # Funções chamadas a cada alteração (ver observar); a tupla é trocada
+        # em vez de alterada, então pode ser percorrida sem trava
+        self._observadores: Tuple[Callable[[AlteracaoCliente], None], ...] = ()
+        # No modo journal cada alteração é acrescentada ao diário e o arquivo
+        # principal só é reescrito na compactação
+        self.journal = Journal(arquivo_dados + ".journal") if modo_journal else None
+        self.limite_compactacao = limite_compactacao
+        # Na gravação adiada as alterações só marcam os dados como pendentes e
+        # uma thread regrava o arquivo, agrupando alterações próximas; se a
+        # gravação falhar, `ao_falhar_gravacao` é chamado nessa thread. Um
+        # journal deixado pelo modo journal ainda é reaplicado ao carregar e
+        # é apagado na primeira gravação, que já inclui as suas operações.
+        self.gravador = None
+        self._journal_residual = False
+        if gravacao_adiada:
+            if not self.journal and os.path.exists(arquivo_dados + ".journal"):
+                self.journal = Journal(arquivo_dados + ".journal")
+                self._journal_residual = True
+            self.gravador = GravadorEmSegundoPlano(lambda: self.salvar_dados(), atraso_gravacao,
+                                                   ao_falhar=ao_falhar_gravacao)
+        self._trava_gravacao = threading.Lock()
+        # Estado do arquivo na última leitura ou gravação, para detectar e
+        # mesclar alterações de outras estações que usam o mesmo arquivo
+        self._carimbo = None
+        self._base: Dict[str, Cliente] = {}
+        # Clientes com entrada há mais de `idade_arquivamento` dias vão para o
+        # histórico (segmentos mensais compactados) ao final do carregamento
+        self.idade_arquivamento = idade_arquivamento
+        self.historico = HistoricoClientes(arquivo_dados + ".historico", Cliente.from_dict,
+                                           self._textos_busca)
+        self.estatisticas.incluir_historico(*self.historico.contadores())
+        # Com carregar=False os dados são entregues aos poucos por
+        # incorporar_lote() e concluir_carregamento()
+        if carregar:
+            self.carregar_dados()
     
     def carregar_dados(self):
-        """Carrega os dados do arquivo JSON"""
+        """Carrega os dados do arquivo (JSON ou binário)"""
+        conteudo = b''
+        ids_gerados = False
+        carimbo = None
         if os.path.exists(self.arquivo_dados):
             try:
-                with open(self.arquivo_dados, 'r', encoding='utf-8') as f:
-                    dados = json.load(f)
-                    self.clientes = [Cliente.from_dict(cliente_data) for cliente_data in dados]
-            except (json.JSONDecodeError, KeyError) as e:
+                with open(self.arquivo_dados, 'rb') as f:
+                    carimbo = carimbo_arquivo(os.fstat(f.fileno()))
+                    conteudo = f.read()
+                self.clientes, ids_gerados = clientes_do_arquivo(conteudo)
+            except (ValueError, KeyError) as e:
                 print(f"Erro ao carregar dados: {e}")
                 self.clientes = []
         else:
             self.clientes = []
+        
+        self._reconstruir_indices()
+        self.concluir_carregamento(self._assinatura(conteudo), ids_gerados, carimbo)
+    
+    def incorporar_lote(self, clientes: List[Cliente]):
+        """Acrescenta clientes lidos do arquivo, sem persistir nada"""
+        for cliente in clientes:
+            self._inserir(cliente)
+    
+    def concluir_carregamento(self, assinatura: str, ids_gerados: bool = False,
+                              carimbo: Optional[tuple] = None):
+        """Finaliza o carregamento, reaplicando o journal.
+        
+        Se o arquivo era de uma versão sem ids, os ids recém-gerados são
+        gravados imediatamente, pois o journal passa a se referir a eles.
+        `carimbo` identifica a versão do arquivo que foi lida.
+        """
+        self._carimbo = carimbo
+        self._base = dict(self._por_id)
+        if self.journal:
+            for operacao in self.journal.ler(assinatura):
+                self._aplicar_operacao(operacao)
+        if ids_gerados:
+            self.salvar_dados()
+        if self.idade_arquivamento:
+            self.arquivar_antigos()
+    
+    def _reconstruir_indices(self):
+        """Recria os índices a partir da lista de clientes"""
+        self._por_placa = {}
+        self._por_id = {}
+        self._chaves_busca = {}
+        self._indice_busca.limpar()
+        self._telefones.limpar()
+        self._nomes_aproximados = self._placas_aproximadas = None
+        self._indices_campos = {}
+        self._ordens = {}
+        self._sugestoes = {}
+        self.estatisticas.limpar()
+        self.estatisticas.incluir_historico(*self.historico.contadores())
+        self._invalidar_cache()
+        for cliente in self.clientes:
+            self._indexar(cliente)
+        self._posicao = PosicoesLista(self.clientes)
+        self._notificar('recarregado')
+    
+    @staticmethod
+    def _textos_busca(cliente: Cliente) -> tuple:
+        """Campos considerados pela busca, sem acentos nem maiúsculas.
+        
+        Na placa, O e I também viram 0 e 1 (ver normalizar_placa); do
+        telefone ficam só os dígitos.
+        """
+        return (normalizar(cliente.nome), normalizar_placa(cliente.placa),
+                apenas_digitos(cliente.telefone))
+    
+    def _invalidar_cache(self):
+        """Marca os dados como alterados e descarta as buscas em cache"""
+        self.versao += 1
+        self._cache_busca = {}
+    
+    def _indexar(self, cliente: Cliente):
+        """Inclui o cliente nos índices"""
+        self._invalidar_cache()
+        self._por_placa[cliente.placa] = cliente
+        self._por_id[cliente.id] = cliente
+        textos = self._chaves_busca[cliente] = self._textos_busca(cliente)
+        self._indice_busca.adicionar(cliente, textos)
+        self._telefones.adicionar(cliente, textos[2])
+        if self._nomes_aproximados is not None:
+            self._indexar_aproximado(cliente, textos, self._nomes_aproximados,
+                                     self._placas_aproximadas)
+        for campo, indice in self._indices_campos.items():
+            indice.adicionar(chave_ordenacao(campo)(cliente), cliente)
+        for ordem in self._ordens.values():
+            ordem.adicionar(cliente)
+        for campo, sugestoes in self._sugestoes.items():
+            valor = getattr(cliente, campo)
+            sugestoes.adicionar(self._chave_sugestao(valor), valor)
+        self.estatisticas.adicionar(cliente)
+    
+    def _desindexar(self, cliente: Cliente):
+        """Remove o cliente dos índices"""
+        self._invalidar_cache()
+        if self._por_placa.get(cliente.placa) is cliente:
+            del self._por_placa[cliente.placa]
+        if self._por_id.get(cliente.id) is cliente:
+            del self._por_id[cliente.id]
+        textos = self._chaves_busca.pop(cliente)
+        self._indice_busca.remover(cliente, textos)
+        self._telefones.remover(cliente, textos[2])
+        nomes, placas = self._nomes_aproximados, self._placas_aproximadas
+        if nomes is not None:
+            nome, placa, _ = textos
+            for palavra in set(nome.split()):
+                nomes.remover(palavra, cliente)
+            placas.remover(placa, cliente)
+        for campo, indice in self._indices_campos.items():
+            indice.remover(chave_ordenacao(campo)(cliente), cliente)
+        for ordem in self._ordens.values():
+            ordem.remover(cliente)
+        for campo, sugestoes in self._sugestoes.items():
+            valor = getattr(cliente, campo)
+            sugestoes.remover(self._chave_sugestao(valor), valor)
+        self.estatisticas.remover(cliente)
+    
+    def observar(self, observador: Callable[[AlteracaoCliente], None]):
+        """Passa a chamar `observador` com cada AlteracaoCliente.
+        
+        As inclusões, edições e remoções (também as vindas de outras
+        estações em sincronizar) geram um evento por cliente; carregar_dados
+        e o arquivamento geram 'recarregado'. O carregamento aos poucos
+        (incorporar_lote) não gera eventos. O observador é chamado na thread
+        que fez a alteração, logo depois dela.
+        """
+        self._observadores += (observador,)
+    
+    def deixar_de_observar(self, observador: Callable[[AlteracaoCliente], None]):
+        """Para de chamar o observador"""
+        self._observadores = tuple(o for o in self._observadores if o != observador)
+    
+    def _notificar(self, tipo: str, cliente: Optional[Cliente] = None,
+                   anterior: Optional[Cliente] = None, posicao: Optional[int] = None):
+        if not self._observadores:
+            return
+        alvo = cliente or anterior
+        alteracao = AlteracaoCliente(tipo, alvo.id if alvo else None, cliente, anterior, posicao)
+        for observador in self._observadores:
+            observador(alteracao)
+    
+    def _inserir(self, cliente: Cliente):
+        """Acrescenta o cliente à lista e aos índices"""
+        self.clientes.append(cliente)
+        self._indexar(cliente)
+        self._posicao.anexar(cliente)
+    
+    def _substituir(self, antigo: Cliente, novo: Cliente):
+        """Coloca o novo cliente na posição do antigo"""
+        posicao = self._posicao[antigo]
+        self._desindexar(antigo)
+        self.clientes[posicao] = novo
+        self._indexar(novo)
+        self._posicao.substituir(antigo, novo)
+    
+    def _retirar(self, cliente: Cliente):
+        """Remove o cliente da lista e dos índices.
+        
+        Custa O(log n) para achar a posição mais o deslocamento da lista e do
+        array de posições (memmove); os clientes seguintes não são
+        renumerados.
+        """
+        self._desindexar(cliente)
+        del self.clientes[self._posicao.retirar(cliente)]
     
     def salvar_dados(self):
-        """Salva os dados no arquivo JSON"""
+        """Salva os dados no arquivo, no formato configurado.
+        
+        Pode ser chamado pela thread de gravação: a cópia da lista é feita de
+        uma vez e os clientes nunca são alterados depois de inseridos (a
+        edição troca o objeto), então o arquivo sempre reflete um estado
+        consistente.
+        """
+        try:
+            with self._trava_gravacao, TravaArquivo(self.arquivo_dados):
+                clientes = list(self.clientes)
+                atualizado = carimbo_atual(self.arquivo_dados) in (None, self._carimbo)
+                base = {cliente.id: cliente for cliente in clientes}
+                if not atualizado:
+                    # Outra estação gravou depois da nossa última leitura
+                    clientes = self._mesclar_com_arquivo(clientes)
+                conteudo = self._serializar(clientes)
+                gravar_atomicamente(self.arquivo_dados, conteudo)
+                if self._journal_residual:
+                    self.journal.remover()
+                    self.journal = None
+                    self._journal_residual = False
+                elif self.journal:
+                    self.journal.iniciar(self._assinatura(conteudo))
+                # A base passa a ter o que esta estação gravou. Se houve mescla,
+                # a memória ainda não tem as alterações da outra estação: para
+                # elas a base fica com o cliente local (ou sem o cliente
+                # novo) e o carimbo continua o antigo, de modo que
+                # sincronizar() ainda as encontra e incorpora
+                self._base = base
+                if atualizado:
+                    self._carimbo = carimbo_atual(self.arquivo_dados)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar dados: {e}")
+            return False
+    
+    def _ler_arquivo(self) -> Tuple[tuple, List[Dict]]:
+        """Lê os registros do arquivo e o carimbo da versão lida"""
+        with open(self.arquivo_dados, 'rb') as f:
+            carimbo = carimbo_arquivo(os.fstat(f.fileno()))
+            conteudo = f.read()
+        return carimbo, registros_do_arquivo(conteudo)
+    
+    def _comparar_com_arquivo(self, registros: List[Dict], locais: Dict[str, Cliente]):
+        """Separa as alterações que outras estações fizeram no arquivo.
+        
+        A base guarda os clientes como estavam no arquivo da última vez; um
+        cliente local que ainda é o mesmo objeto da base não foi alterado
+        aqui. Quando os dois lados alteraram o mesmo cliente, vale a
+        alteração local. Retorna (novos, alterados, removidos, nova_base).
+        """
+        base = self._base
+        novos, alterados, removidos = [], [], []
+        nova_base = {}
+        for dados in registros:
+            local = locais.get(dados.get('id'))
+            if local is not None and valores_json(local) == tuple(map(dados.get, CAMPOS_JSON)):
+                nova_base[local.id] = local
+                continue
+            
+            remoto = Cliente.from_dict(dados)
+            nova_base[remoto.id] = remoto
+            anterior = base.get(remoto.id)
+            if anterior is None:
+                if local is None:
+                    novos.append(remoto)
+            elif local is anterior:
+                alterados.append((local, remoto))
+        
+        for id_cliente, anterior in base.items():
+            if id_cliente not in nova_base and locais.get(id_cliente) is anterior:
+                removidos.append(anterior)
+        return novos, alterados, removidos, nova_base
+    
+    def _mesclar_com_arquivo(self, clientes: List[Cliente]) -> List[Cliente]:
+        """Aplica sobre uma cópia da lista as alterações das outras estações"""
+        _, registros = self._ler_arquivo()
+        novos, alterados, removidos, _ = self._comparar_com_arquivo(
+            registros, {cliente.id: cliente for cliente in clientes})
+        substitutos = {antigo.id: novo for antigo, novo in alterados}
+        retirados = {cliente.id for cliente in removidos}
+        return [substitutos.get(cliente.id, cliente) for cliente in clientes
+                if cliente.id not in retirados] + novos
+    
+    def sincronizar(self, esperar: bool = True) -> int:
+        """Incorpora as alterações que outras estações gravaram no arquivo.
+        
+        Só consulta a data e o tamanho do arquivo; se ele mudou, aplica
+        apenas os clientes incluídos, alterados ou removidos. Deve ser
+        chamado pela mesma thread que faz as alterações. Com esperar=False,
+        desiste se uma gravação estiver em andamento. Retorna quantos
+        clientes mudaram.
+        """
+        if not self._trava_gravacao.acquire(blocking=esperar):
+            return 0
+        try:
+            carimbo = carimbo_atual(self.arquivo_dados)
+            if carimbo is None or carimbo == self._carimbo:
+                return 0
+            try:
+                # A trava evita ler enquanto outra estação substitui o arquivo,
+                # o que no Windows faria a gravação dela falhar
+                with TravaArquivo(self.arquivo_dados):
+                    carimbo, registros = self._ler_arquivo()
+                novos, alterados, removidos, base = self._comparar_com_arquivo(
+                    registros, self._por_id)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Erro ao carregar dados: {e}")
+                return 0
+            
+            for antigo, novo in alterados:
+                self._substituir(antigo, novo)
+                self._notificar('alterado', novo, antigo, self._posicao[novo])
+            for cliente in removidos:
+                posicao = self._posicao[cliente]
+                self._retirar(cliente)
+                self._notificar('removido', anterior=cliente, posicao=posicao)
+            for cliente in novos:
+                self._inserir(cliente)
+                self._notificar('inserido', cliente, posicao=len(self.clientes) - 1)
+            self._carimbo = carimbo
+            self._base = base
+            return len(novos) + len(alterados) + len(removidos)
+        finally:
+            self._trava_gravacao.release()
+    
+    def _serializar(self, clientes: List[Cliente]) -> bytes:
+        """Conteúdo do arquivo de dados no formato configurado"""
+        return serializar_clientes(clientes, self.formato)
+    
+    def descarregar(self, timeout: float = None) -> bool:
+        """Espera a gravação das alterações pendentes (gravação adiada)"""
+        if not self.gravador:
+            return True
+        return self.gravador.descarregar(timeout)
+    
+    def fechar(self) -> bool:
+        """Grava o que estiver pendente e encerra a thread de gravação"""
+        if not self.gravador:
+            return True
+        return self.gravador.encerrar()
+    
+    def arquivar_antigos(self, idade_dias: Optional[int] = None,
+                         hoje: Optional[date] = None) -> int:
+        """Move para o histórico os clientes com entrada há mais de `idade_dias` dias.
+        
+        Por padrão usa `idade_arquivamento`. O histórico é gravado antes do
+        arquivo principal; se a gravação for interrompida entre os dois, o
+        cliente fica nos dois lugares e vale o da lista principal até o
+        próximo arquivamento. Retorna quantos clientes foram movidos.
+        """
+        idade = idade_dias or self.idade_arquivamento
+        if not idade:
+            return 0
+        limite = (hoje or date.today()).toordinal() - idade
+        antigos = [cliente for cliente in self.clientes
+                   if 0 < ordinal_data(cliente.data_entrada) < limite]
+        if not antigos:
+            return 0
         try:
-            with open(self.arquivo_dados, 'w', encoding='utf-8') as f:
-                dados = [cliente.to_dict() for cliente in self.clientes]
-                json.dump(dados, f, ensure_ascii=False, indent=2)
+            self.historico.arquivar(antigos)
+        except OSError as e:
+            print(f"Erro ao arquivar clientes antigos: {e}")
+            return 0
+        
+        movidos = set(antigos)
+        self.clientes[:] = [cliente for cliente in self.clientes if cliente not in movidos]
+        self._reconstruir_indices()
+        self.salvar_dados()
+        return len(antigos)
+    
+    def compactar(self) -> bool:
+        """Incorpora o diário de operações em um novo snapshot"""
+        return self.salvar_dados()
+    
+    def _assinatura(self, conteudo: bytes) -> str:
+        """Identifica o conteúdo de um snapshot pelo tamanho e CRC32"""
+        return assinatura_snapshot(len(conteudo), zlib.crc32(conteudo))
+    
+    def _persistir(self, operacao: Dict) -> bool:
+        """Persiste uma alteração, no diário ou reescrevendo o arquivo.
+        
+        Na gravação adiada só agenda a gravação e retorna True; uma falha
+        posterior chega a quem passou `ao_falhar_gravacao`.
+        """
+        if self.gravador:
+            self.gravador.agendar()
             return True
+        if not self.journal:
+            return self.salvar_dados()
+        try:
+            self.journal.registrar(operacao)
         except Exception as e:
             print(f"Erro ao salvar dados: {e}")
             return False
+        if self.journal.total_operacoes >= self.limite_compactacao:
+            self.compactar()
+        return True
+    
+    def _aplicar_operacao(self, operacao: Dict):
+        """Reaplica uma operação lida do diário"""
+        tipo = operacao['op']
+        if tipo == 'adicionar':
+            self._inserir(Cliente.from_dict(operacao['cliente']))
+            return
+        
+        alvo = self._por_id.get(operacao['id'])
+        if alvo is None:
+            return
+        if tipo == 'editar':
+            self._substituir(alvo, Cliente.from_dict(operacao['cliente']))
+        elif tipo == 'remover':
+            self._retirar(alvo)
+    
+    def _no_historico(self, clientes: List[Cliente],
+                      com_ids: bool = True) -> Tuple[set, set]:
+        """Placas (e ids) dos clientes que já estão no histórico"""
+        return self.historico.repetidos(
+            {cliente.placa: normalizar_placa(cliente.placa) for cliente in clientes},
+            (cliente.id for cliente in clientes) if com_ids else ())
     
     def adicionar_cliente(self, cliente: Cliente) -> bool:
         """Adiciona um novo cliente"""
-        # Verifica se já existe cliente com a mesma placa
-        if any(c.placa == cliente.placa for c in self.clientes):
+        # Verifica se já existe cliente com a mesma placa (ou o mesmo id),
+        # também entre os arquivados
+        if cliente.placa in self._por_placa or cliente.id in self._por_id:
+            return False
+        if any(self._no_historico([cliente])):
             return False
         
-        self.clientes.append(cliente)
-        return self.salvar_dados()
+        self._inserir(cliente)
+        self._notificar('inserido', cliente, posicao=len(self.clientes) - 1)
+        return self._persistir({'op': 'adicionar', 'cliente': cliente.to_dict()})
+    
+    def adicionar_clientes_em_lote(self, clientes: Iterable[Cliente]) -> Tuple[int, List[Cliente]]:
+        """Adiciona vários clientes gravando o arquivo uma única vez.
+        
+        Retorna quantos foram adicionados e os recusados por placa ou id
+        repetido, também no histórico. Se a gravação falhar, nenhum cliente
+        do lote permanece adicionado.
+        """
+        clientes = list(clientes)
+        placas_arquivadas, ids_arquivados = self._no_historico(clientes)
+        inicio = len(self.clientes)
+        recusados = []
+        for cliente in clientes:
+            if (cliente.placa in self._por_placa or cliente.id in self._por_id
+                    or cliente.placa in placas_arquivadas or cliente.id in ids_arquivados):
+                recusados.append(cliente)
+            else:
+                self._inserir(cliente)
+        
+        adicionados = len(self.clientes) - inicio
+        if adicionados and not self.salvar_dados():
+            for cliente in reversed(self.clientes[inicio:]):
+                self._desindexar(cliente)
+                self._posicao.retirar(cliente)
+            del self.clientes[inicio:]
+            return 0, recusados
+        for posicao in range(inicio, len(self.clientes)):
+            self._notificar('inserido', self.clientes[posicao], posicao=posicao)
+        return adicionados, recusados
     
     def editar_cliente(self, indice: int, cliente_atualizado: Cliente) -> bool:
         """Edita um cliente existente"""
         if 0 <= indice < len(self.clientes):
-            # Verifica se a nova placa não conflita com outros clientes
-            placa_original = self.clientes[indice].placa
-            if (cliente_atualizado.placa != placa_original and 
-                any(c.placa == cliente_atualizado.placa for c in self.clientes)):
-                return False
-            
-            self.clientes[indice] = cliente_atualizado
-            return self.salvar_dados()
+            return self.editar_cliente_por_id(self.clientes[indice].id, cliente_atualizado)
         return False
     
+    def editar_cliente_por_id(self, id_cliente: str, cliente_atualizado: Cliente) -> bool:
+        """Edita o cliente com o id informado, mantendo o id"""
+        cliente = self._por_id.get(id_cliente)
+        if cliente is None:
+            return False
+        
+        # Verifica se a nova placa não conflita com outros clientes
+        if cliente_atualizado.placa != cliente.placa and (
+                cliente_atualizado.placa in self._por_placa
+                or self._no_historico([cliente_atualizado], com_ids=False)[0]):
+            return False
+        
+        cliente_atualizado.id = cliente.id
+        self._substituir(cliente, cliente_atualizado)
+        self._notificar('alterado', cliente_atualizado, cliente,
+                        self._posicao[cliente_atualizado])
+        return self._persistir({'op': 'editar', 'id': cliente.id,
+                                'cliente': cliente_atualizado.to_dict()})
+    
     def remover_cliente(self, indice: int) -> bool:
         """Remove um cliente"""
         if 0 <= indice < len(self.clientes):
-            del self.clientes[indice]
-            return self.salvar_dados()
+            return self.remover_cliente_por_id(self.clientes[indice].id)
         return False
     
+    def remover_cliente_por_id(self, id_cliente: str) -> bool:
+        """Remove o cliente com o id informado"""
+        cliente = self._por_id.get(id_cliente)
+        if cliente is None:
+            return False
+        
+        posicao = self._posicao[cliente]
+        self._retirar(cliente)
+        self._notificar('removido', anterior=cliente, posicao=posicao)
+        return self._persistir({'op': 'remover', 'id': id_cliente})
+    
     def buscar_cliente(self, termo: str) -> List[tuple]:
-        """Busca clientes por nome, placa ou telefone"""
-        resultados = []
-        termo = termo.lower()
+        """Busca clientes por nome, placa ou telefone.
+        
+        Não diferencia acentos nem maiúsculas ('joao' encontra 'João') e, na
+        placa, O de 0 e I de 1. Os clientes do histórico vêm depois dos
+        demais, com índice None.
+        """
+        termo = normalizar(termo)
+        versao = self.versao
+        cache = self._cache_busca
+        if termo in cache:
+            return cache[termo]
+        
+        posicao = self._posicao
+        resultados = [(posicao.get(cliente), cliente) for cliente in self._varrer_busca(termo)]
+        if versao == self.versao:
+            cache[termo] = resultados
+            if len(cache) > self.TAMANHO_CACHE_BUSCA:
+                # Buscas podem rodar em paralelo (serviço HTTP); outra thread
+                # pode já ter descartado a mesma entrada
+                try:
+                    del cache[next(iter(cache))]
+                except (KeyError, RuntimeError):
+                    pass
+        return resultados
+    
+    def _varrer_busca(self, termo: str, ordenado: bool = True) -> Iterator[Cliente]:
+        """Percorre, sob demanda, os clientes que contêm o termo já normalizado.
+        
+        Com `ordenado` os clientes vêm na ordem da lista; sem ele a ordem é
+        qualquer uma, o que poupa ordenar os candidatos quando só se conta.
+        """
+        termo_placa = normalizar_placa(termo)
+        termo_telefone = digitos_telefone(termo)
+        cache = self._cache_busca
+        # Se um prefixo do termo já foi buscado, basta filtrar aquele resultado.
+        # Um prefixo sem dígitos, como '(', não procurou nos telefones, e um
+        # curto demais para o índice do histórico não procurou no histórico.
+        anterior = next((cache[termo[:n]] for n in range(len(termo) - 1, 0, -1)
+                         if termo[:n] in cache
+                         and (termo_telefone is None or digitos_telefone(termo[:n]) is not None)
+                         and self._meses_historico(termo[:n]) is not None),
+                        None)
+        if anterior is not None:
+            candidatos = (cliente for _, cliente in anterior)
+        else:
+            candidatos = self._candidatos_busca(termo, termo_placa, termo_telefone)
+            if candidatos is None:
+                # Termo curto demais para o índice: percorre todos os clientes
+                candidatos = self.clientes
+            elif ordenado:
+                candidatos = sorted(candidatos, key=self._posicao.__getitem__)
+            candidatos = chain(candidatos,
+                               self._varrer_historico(termo, termo_placa, termo_telefone))
+        return (cliente for cliente in candidatos
+                if self._corresponde(cliente, termo, termo_placa, termo_telefone))
+    
+    def _varrer_historico(self, termo: str, termo_placa: str,
+                          termo_telefone: Optional[str]) -> Iterator[Cliente]:
+        """Clientes do histórico que contêm o termo.
+        
+        Só abre os meses que podem ter o termo, pelo índice do histórico;
+        termos curtos demais para o índice (menos de 3 letras ou 5 dígitos)
+        não procuram no histórico, que é bem maior que a lista principal.
+        """
+        meses = self._meses_historico(termo, termo_placa, termo_telefone)
+        if not meses:
+            return
+        ativos = self._por_id
+        for cliente, chaves in self.historico.registros(meses=meses):
+            if self._contem(chaves, termo, termo_placa, termo_telefone) \
+                    and cliente.id not in ativos:
+                yield cliente
+    
+    def _meses_historico(self, termo: str, termo_placa: Optional[str] = None,
+                         termo_telefone: Optional[str] = None) -> Optional[set]:
+        """Meses do histórico que podem ter o termo já normalizado (ver meses_com)"""
+        if termo_placa is None:
+            termo_placa, termo_telefone = normalizar_placa(termo), digitos_telefone(termo)
+        return self.historico.meses_com(termo, termo_placa, termo_telefone)
+    
+    def iterar_busca(self, termo: str) -> Iterator[tuple]:
+        """Como buscar_cliente, mas entrega (índice, Cliente) à medida que encontra.
+        
+        Quem só precisa dos primeiros resultados não paga pela busca inteira.
+        """
+        termo = normalizar(termo)
+        resultados = self._cache_busca.get(termo)
+        if resultados is not None:
+            yield from resultados
+            return
+        posicao = self._posicao
+        for cliente in self._varrer_busca(termo):
+            yield posicao.get(cliente), cliente
+    
+    def buscar_pagina(self, termo: str, inicio: int, limite: int) -> List[tuple]:
+        """Resultados de inicio a inicio + limite - 1 da busca, na ordem de buscar_cliente"""
+        termo = normalizar(termo)
+        resultados = self._cache_busca.get(termo)
+        if resultados is not None:
+            return resultados[inicio:inicio + limite]
+        return list(islice(self.iterar_busca(termo), inicio, inicio + limite))
+    
+    def contar_busca(self, termo: str) -> int:
+        """Quantidade de resultados da busca, sem montar a lista"""
+        termo = normalizar(termo)
+        resultados = self._cache_busca.get(termo)
+        if resultados is not None:
+            return len(resultados)
+        return sum(1 for _ in self._varrer_busca(termo, ordenado=False))
+    
+    def _candidatos_busca(self, termo: str, termo_placa: str,
+                          termo_telefone: Optional[str] = None) -> Optional[set]:
+        """Clientes que podem conter o termo, pelo índice de trigramas"""
+        candidatos = self._indice_busca.candidatos(termo)
+        for variante in (termo_placa, termo_telefone):
+            if candidatos is None:
+                break
+            if variante is not None and variante != termo:
+                outros = self._indice_busca.candidatos(variante)
+                # Dígitos de menos para o índice: percorre todos os clientes
+                candidatos = None if outros is None else candidatos | outros
+        return candidatos
+    
+    def _corresponde(self, cliente: Cliente, termo: str, termo_placa: str,
+                     termo_telefone: Optional[str] = None) -> bool:
+        """Verifica se o termo (já normalizado) aparece nos campos de busca"""
+        chaves = self._chaves_busca.get(cliente)
+        if chaves is None:
+            # Cliente do histórico, vindo de uma busca anterior em cache
+            chaves = self._textos_busca(cliente)
+        return self._contem(chaves, termo, termo_placa, termo_telefone)
+    
+    @staticmethod
+    def _contem(chaves: tuple, termo: str, termo_placa: str,
+                termo_telefone: Optional[str]) -> bool:
+        """O termo aparece no nome ou na placa, ou os seus dígitos no telefone.
+        
+        `termo_telefone` é None quando o termo não pode ser um telefone.
+        """
+        nome, placa, telefone = chaves
+        return (termo in nome or termo_placa in placa
+                or (termo_telefone is not None and termo_telefone in telefone))
+    
+    def corresponde_busca(self, texto: str, cliente: Cliente) -> bool:
+        """Indica se o cliente atende à busca (comum ou consulta por campo).
+        
+        Permite manter o resultado de uma busca em dia, cliente a cliente,
+        sem refazê-la. Levanta ValueError se a consulta for inválida.
+        """
+        if eh_consulta(texto):
+            return all(criterio.aceita(cliente) for criterio in interpretar_consulta(texto))
+        termo = normalizar(texto)
+        return self._corresponde(cliente, termo, normalizar_placa(termo), digitos_telefone(termo))
+    
+    def buscar_aproximado(self, termo: str, distancia_maxima: Optional[int] = None) -> List[tuple]:
+        """Clientes com placa ou nome parecidos com o termo, dos mais parecidos aos menos.
+        
+        Tolera letras trocadas, faltando ou sobrando: até `distancia_maxima`
+        na placa e em cada palavra do nome (por padrão 1 em palavras de até
+        4 letras e 2 nas maiores). Todas as palavras do termo precisam se
+        parecer com alguma palavra do nome. A primeira chamada também cria
+        os índices usados, o que leva mais tempo.
+        """
+        termo = normalizar(termo)
+        nomes, placas = self._indices_aproximados()
+        
+        def tolerancia(texto: str) -> int:
+            return self._tolerancia(texto, distancia_maxima)
+        
+        distancias: Dict[Cliente, int] = {}
+        placa = normalizar_placa(''.join(filter(str.isalnum, termo)))
+        if len(placa) >= 3:
+            for distancia, _, clientes in placas.buscar(placa, tolerancia(placa)):
+                for cliente in clientes:
+                    distancias[cliente] = distancia
+        
+        # Soma, por cliente, a distância da palavra mais parecida do nome
+        # com cada palavra do termo
+        por_nome: Optional[Dict[Cliente, int]] = None
+        for palavra in termo.split():
+            parecidos: Dict[Cliente, int] = {}
+            for distancia, _, clientes in nomes.buscar(palavra, tolerancia(palavra)):
+                for cliente in clientes:
+                    if distancia < parecidos.get(cliente, distancia + 1):
+                        parecidos[cliente] = distancia
+            if por_nome is None:
+                por_nome = parecidos
+            else:
+                por_nome = {cliente: por_nome[cliente] + distancia
+                            for cliente, distancia in parecidos.items() if cliente in por_nome}
+            if not por_nome:
+                break
+        for cliente, distancia in (por_nome or {}).items():
+            if distancia < distancias.get(cliente, distancia + 1):
+                distancias[cliente] = distancia
+        
+        posicao = self._posicao
+        ordenados = sorted(distancias, key=lambda cliente: (distancias[cliente], posicao[cliente]))
+        return [(posicao[cliente], cliente) for cliente in ordenados]
+    
+    @staticmethod
+    def _tolerancia(texto: str, distancia_maxima: Optional[int] = None) -> int:
+        """Edições toleradas pela busca aproximada em uma palavra ou placa"""
+        if distancia_maxima is not None:
+            return distancia_maxima
+        return 0 if len(texto) < 3 else 1 if len(texto) <= 4 else 2
+    
+    def corresponde_aproximado(self, texto: str, cliente: Cliente,
+                               distancia_maxima: Optional[int] = None) -> bool:
+        """Indica se o cliente está no resultado de buscar_aproximado(texto).
+        
+        Compara o termo só com a placa e as palavras do nome deste cliente,
+        pelos mesmos critérios, sem usar os índices.
+        """
+        termo = normalizar(texto)
+        nome, placa_cliente, _ = self._chaves_busca.get(cliente) or self._textos_busca(cliente)
+        placa = normalizar_placa(''.join(filter(str.isalnum, termo)))
+        if len(placa) >= 3:
+            maximo = min(self._tolerancia(placa, distancia_maxima), EDICOES_PLACA)
+            if distancia_edicao(placa, placa_cliente) <= maximo:
+                return True
+        palavras_nome = nome.split()
+        palavras = termo.split()
+        return bool(palavras) and all(
+            any(distancia_edicao(palavra, outra) <= self._tolerancia(palavra, distancia_maxima)
+                for outra in palavras_nome)
+            for palavra in palavras)
+    
+    def consultar(self, texto: str) -> List[tuple]:
+        """Busca por campos: `cidade:Campinas servico:Freios data:>=01/01/2026`.
+        
+        A sintaxe está em Program.consulta. Cada critério é resolvido pelo
+        índice do seu campo; o plano começa pelo critério mais seletivo e os
+        demais só verificam os clientes que restaram, então consultas com
+        vários critérios não percorrem a base inteira. Os clientes do
+        histórico vêm depois, com índice None. Levanta ValueError se a
+        consulta for inválida.
+        """
+        criterios = interpretar_consulta(texto)
+        if not criterios:
+            return self.obter_todos_clientes()
+        
+        planos = sorted((self._planejar(criterio) for criterio in criterios),
+                        key=operator.itemgetter(0))
+        _, selecionar, _ = planos[0]
+        candidatos = selecionar()
+        for _, _, aceita in planos[1:]:
+            if not candidatos:
+                break
+            candidatos = [cliente for cliente in candidatos if aceita(cliente)]
         
-        for i, cliente in enumerate(self.clientes):
-            if (termo in cliente.nome.lower() or 
-                termo in cliente.placa.lower() or 
-                termo in cliente.telefone):
-                resultados.append((i, cliente))
+        posicao = self._posicao
+        resultados = sorted((posicao[cliente], cliente) for cliente in candidatos)
         
+        # No histórico, só os meses que podem atender a todos os critérios:
+        # pela data, pelo resumo de cada mês ou pelo índice do histórico
+        minimo, maximo, meses = 0, None, None
+        for criterio in criterios:
+            if criterio.campo == 'data_entrada':
+                minimo = max(minimo, criterio.minimo)
+                maximo = criterio.maximo if maximo is None else min(maximo, criterio.maximo)
+                continue
+            if criterio.campo in CAMPOS_CATEGORIA:
+                possiveis = self.historico.meses_com_valor(criterio.campo, criterio.valor)
+            elif criterio.campo == 'nome':
+                possiveis = self.historico.meses_com(nome=criterio.valor)
+            elif criterio.campo == 'placa':
+                possiveis = self.historico.meses_com(placa=normalizar_placa(criterio.valor))
+            elif criterio.campo == 'telefone':
+                digitos = digitos_telefone(criterio.valor)
+                possiveis = set() if digitos is None else self.historico.meses_com(telefone=digitos)
+            else:
+                possiveis = self._meses_historico(criterio.valor)
+            if possiveis is not None:
+                meses = possiveis if meses is None else meses & possiveis
+        ativos = self._por_id
+        resultados += [(None, cliente)
+                       for cliente, _ in self.historico.registros(minimo, maximo, meses)
+                       if cliente.id not in ativos
+                       and all(criterio.aceita(cliente) for criterio in criterios)]
         return resultados
     
+    def _planejar(self, criterio: Criterio):
+        """Plano de um critério: (estimativa de clientes, selecionar(), aceita(cliente)).
+        
+        selecionar() devolve os clientes que atendem ao critério usando os
+        índices; aceita() verifica um cliente isolado, para os critérios
+        aplicados depois do mais seletivo.
+        """
+        campo = criterio.campo
+        if campo == 'data_entrada' or campo in CAMPOS_CATEGORIA:
+            indice = self._indice_campo(campo)
+            if campo == 'data_entrada':
+                conjuntos = indice.faixa(criterio.minimo, criterio.maximo)
+            else:
+                conjuntos = indice.contendo(criterio.valor)
+            return (sum(map(len, conjuntos)),
+                    lambda: set().union(*conjuntos),
+                    criterio.aceita)
+        
+        # Nome, placa e telefone: índice de trigramas e as chaves de busca
+        chaves = self._chaves_busca
+        termo = criterio.valor
+        termo_placa = normalizar_placa(termo)
+        termo_telefone = digitos_telefone(termo)
+        if campo == 'nome':
+            aceita = lambda cliente: termo in chaves[cliente][0]
+        elif campo == 'placa':
+            aceita = lambda cliente: termo_placa in chaves[cliente][1]
+        elif campo == 'telefone':
+            aceita = lambda cliente: (termo_telefone is not None
+                                      and termo_telefone in chaves[cliente][2])
+        else:
+            aceita = lambda cliente: self._corresponde(cliente, termo, termo_placa,
+                                                       termo_telefone)
+        
+        # Cada campo é procurado no índice pela sua forma do termo
+        formas = {'nome': (termo,), 'placa': (termo_placa,), 'telefone': (termo_telefone,)}
+        variantes = {variante for variante in formas.get(campo, (termo, termo_placa, termo_telefone))
+                     if variante is not None}
+        if not variantes:
+            # telefone: com letras, que nenhum telefone contém
+            return 0, list, aceita
+        indice = self._indice_busca
+        estimativas = [indice.estimar(variante) for variante in variantes]
+        if None in estimativas:
+            # Termo curto demais para o índice: percorre todos os clientes
+            return (len(self.clientes),
+                    lambda: [cliente for cliente in self.clientes if aceita(cliente)],
+                    aceita)
+        return (sum(estimativas),
+                lambda: [cliente for cliente in set().union(
+                             *(indice.candidatos(variante) for variante in variantes))
+                         if aceita(cliente)],
+                aceita)
+    
+    def _indice_campo(self, campo: str) -> IndiceValores:
+        """Índice de valores do campo, criado na primeira vez que é usado"""
+        indice = self._indices_campos.get(campo)
+        if indice is not None:
+            return indice
+        
+        versao = self.versao
+        indice = IndiceValores()
+        chave = chave_ordenacao(campo)
+        for cliente in list(self.clientes):
+            indice.adicionar(chave(cliente), cliente)
+        # Substitui o dicionário em vez de alterá-lo: _indexar pode estar
+        # percorrendo o atual em outra thread
+        self._indices_campos = {**self._indices_campos, campo: indice}
+        if versao != self.versao:
+            # Mesmo cuidado de _indices_aproximados
+            self._indices_campos = {nome: outro for nome, outro in self._indices_campos.items()
+                                    if nome != campo}
+            raise RuntimeError("Os clientes foram alterados durante a busca")
+        return indice
+    
+    def buscar_com_tolerancia(self, termo: str) -> List[tuple]:
+        """Busca normal; se nada for encontrado, usa a busca aproximada"""
+        resultados = self.buscar_cliente(termo)
+        if not resultados and termo.strip():
+            return self.buscar_aproximado(termo)
+        return resultados
+    
+    def _indices_aproximados(self) -> Tuple[ArvoreBK, IndiceSegmentos]:
+        """Índices da busca aproximada, criados na primeira vez que são usados"""
+        nomes, placas = self._nomes_aproximados, self._placas_aproximadas
+        if nomes is not None:
+            return nomes, placas
+        
+        versao = self.versao
+        nomes, placas = ArvoreBK(), IndiceSegmentos(maximo=EDICOES_PLACA)
+        for cliente, textos in list(self._chaves_busca.items()):
+            self._indexar_aproximado(cliente, textos, nomes, placas)
+        self._nomes_aproximados, self._placas_aproximadas = nomes, placas
+        if versao != self.versao:
+            # A busca pode rodar fora da thread que altera os clientes; se eles
+            # mudaram durante a construção, os índices podem estar incompletos
+            self._nomes_aproximados = self._placas_aproximadas = None
+            raise RuntimeError("Os clientes foram alterados durante a busca")
+        return nomes, placas
+    
+    @staticmethod
+    def _indexar_aproximado(cliente: Cliente, textos: tuple, nomes: ArvoreBK,
+                            placas: IndiceSegmentos):
+        nome, placa, _ = textos
+        for palavra in nome.split():
+            nomes.adicionar(palavra, cliente)
+        placas.adicionar(placa, cliente)
+    
+    def ordenados_por(self, campo: str, decrescente: bool = False) -> VisaoOrdenada:
+        """Todos os clientes na ordem do campo, sem copiar a lista.
+        
+        A primeira chamada para um campo calcula as chaves e ordena; depois a
+        ordem é mantida a cada inclusão e exclusão.
+        """
+        return VisaoOrdenada(self._ordem(campo), decrescente)
+    
+    def _ordem(self, campo: str) -> OrdemCampo:
+        ordem = self._ordens.get(campo)
+        if ordem is None:
+            ordem = self._ordens[campo] = OrdemCampo(campo, self.clientes)
+        return ordem
+    
+    def sugerir(self, campo: str, prefixo: str, limite: int = TrieSugestoes.LIMITE) -> List[str]:
+        """Valores já usados no campo que começam com o prefixo, dos mais usados aos menos.
+        
+        Não diferencia acentos nem maiúsculas ("sao" sugere "São Paulo"); de
+        cada valor é sugerida a grafia mais usada. A primeira chamada para um
+        campo conta os valores dos clientes; depois as sugestões acompanham
+        cada inclusão, edição e exclusão.
+        """
+        sugestoes = self._sugestoes.get(campo)
+        if sugestoes is None:
+            sugestoes = TrieSugestoes()
+            for valor, quantidade in Counter(getattr(cliente, campo)
+                                             for cliente in self.clientes).items():
+                sugestoes.adicionar(self._chave_sugestao(valor), valor, quantidade)
+            self._sugestoes[campo] = sugestoes
+        chave = ' '.join(normalizar(prefixo).split())
+        if chave and prefixo[-1:].isspace():
+            chave += ' '  # "sao " ainda separa "São Paulo" de "Santos"
+        return sugestoes.sugerir(chave, limite)
+    
+    @staticmethod
+    def _chave_sugestao(valor: str) -> str:
+        return ' '.join(normalizar_repetido(valor).split())
+    
+    @staticmethod
+    def _ordinais_periodo(inicio, fim) -> Tuple[int, int]:
+        """Ordinais das datas (date ou 'DD/MM/AAAA')"""
+        # Datas em texto inválidas levantam ValueError
+        minimo, maximo = (
+            datetime.strptime(data, "%d/%m/%Y") if isinstance(data, str) else data
+            for data in (inicio, fim))
+        return minimo.toordinal(), maximo.toordinal()
+    
+    def clientes_no_periodo(self, inicio, fim) -> List[Cliente]:
+        """Clientes com entrada entre as datas (date ou 'DD/MM/AAAA'), inclusive.
+        
+        Inclui os do histórico, abrindo apenas os meses do período.
+        """
+        minimo, maximo = self._ordinais_periodo(inicio, fim)
+        ordem = self._ordem('data_entrada')
+        primeiro, ultimo = ordem.faixa(minimo, maximo)
+        clientes = ordem.clientes()[primeiro:ultimo]
+        
+        ativos = self._por_id
+        arquivados = [cliente for cliente, _ in self.historico.registros(minimo, maximo)
+                      if minimo <= ordinal_data(cliente.data_entrada) <= maximo
+                      and cliente.id not in ativos]
+        if arquivados:
+            # Os segmentos já estão em ordem de data
+            clientes = list(heapq.merge(arquivados, clientes,
+                                        key=chave_ordenacao('data_entrada')))
+        return clientes
+    
+    def contar_no_periodo(self, inicio, fim) -> int:
+        """Quantidade de entradas entre as datas, sem montar a lista.
+        
+        Do histórico só são abertos os meses cobertos em parte pelo período.
+        """
+        minimo, maximo = self._ordinais_periodo(inicio, fim)
+        primeiro, ultimo = self._ordem('data_entrada').faixa(minimo, maximo)
+        return ultimo - primeiro + self.historico.contar(minimo, maximo)
+    
+    def ordenar_resultados(self, clientes: List[Cliente], campo: str,
+                           decrescente: bool = False) -> List[Cliente]:
+        """Ordena parte dos clientes (por exemplo o resultado de uma busca)"""
+        posicao = self._posicao
+        if len(clientes) * 8 < len(self.clientes) or any(
+                cliente not in posicao for cliente in clientes):
+            # Poucos clientes, ou clientes do histórico, que não estão nas
+            # ordens mantidas: calcula as chaves deles
+            ordenados = sorted(clientes, key=chave_ordenacao(campo))
+            return ordenados[::-1] if decrescente else ordenados
+        # Muitos: percorre a ordem já mantida, filtrando os clientes pedidos
+        selecionados = set(clientes)
+        return [cliente for cliente in self.ordenados_por(campo, decrescente)
+                if cliente in selecionados]
+    
     def obter_todos_clientes(self) -> List[tuple]:
         """Retorna todos os clientes com seus índices"""
-        return [(i, cliente) for i, cliente in enumerate(self.clientes)]
\ No newline at end of file
+        return [(i, cliente) for i, cliente in enumerate(self.clientes)]
+    
+    def iterar_clientes(self, inicio: int = 0) -> Iterator[tuple]:
+        """Entrega (índice, Cliente) a partir de inicio, sem copiar a lista"""
+        clientes = self.clientes
+        i = inicio
+        while i < len(clientes):
+            yield i, clientes[i]
+            i += 1
+    
+    def pagina_clientes(self, inicio: int, limite: int) -> List[tuple]:
+        """Clientes de inicio a inicio + limite - 1, com seus índices"""
+        return list(enumerate(self.clientes[inicio:inicio + limite], inicio))
+    
+    def buscar_telefone(self, telefone: str) -> List[tuple]:
+        """Todos os clientes (veículos) com o telefone, com ou sem máscara.
+        
+        Aceita o número completo, sem o DDD ou com o código do país, ou só
+        os últimos 8 dígitos. Usa o índice de telefones, então o custo não
+        depende da quantidade de clientes. Os resultados vêm na ordem da
+        lista, com seus índices.
+        """
+        posicao = self._posicao
+        return sorted((posicao[cliente], cliente)
+                      for cliente in self._telefones.buscar(apenas_digitos(telefone)))
+    
+    def corresponde_telefone(self, telefone: str, cliente: Cliente) -> bool:
+        """Indica se o cliente está no resultado de buscar_telefone(telefone)"""
+        chaves = self._chaves_busca.get(cliente) or self._textos_busca(cliente)
+        return IndiceTelefones.combinam(apenas_digitos(telefone), chaves[2])
+    
+    def buscar_telefones(self, telefones: Iterable[str]) -> Dict[str, List[tuple]]:
+        """buscar_telefone para vários números de uma vez (uma planilha a importar, por exemplo)"""
+        return {telefone: self.buscar_telefone(telefone) for telefone in telefones}
+    
+    def telefones_repetidos(self) -> List[List[tuple]]:
+        """Grupos de clientes com o mesmo telefone, para achar cadastros duplicados.
+        
+        Um grupo pode ser o mesmo dono com vários veículos ou a mesma pessoa
+        cadastrada mais de uma vez (com o nome escrito de outro jeito, por
+        exemplo). Cada grupo está na ordem da lista, e os grupos, na ordem
+        do seu primeiro cliente.
+        """
+        posicao = self._posicao
+        grupos = [sorted((posicao[cliente], cliente) for cliente in chaves)
+                  for chaves in self._telefones.repetidos()]
+        grupos.sort(key=lambda grupo: grupo[0][0])
+        return grupos
+    
+    def obter_por_placa(self, placa: str) -> Optional[Cliente]:
+        """Retorna o cliente com a placa informada, se existir"""
+        return self._por_placa.get(placa.strip().upper())
+    
+    def total_clientes(self) -> int:
+        """Retorna a quantidade de clientes cadastrados"""
+        return len(self.clientes)
+    
+    def obter_por_id(self, id_cliente: str) -> Optional[Cliente]:
+        """Retorna o cliente com o id informado, se existir"""
+        return self._por_id.get(id_cliente)
\ No newline at end of file
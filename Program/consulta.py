@@ -0,0 +1,110 @@
+"""Consultas por campo, como `cidade:Campinas servico:Freios data:>=01/01/2026`.
+
+Cada parte da consulta vira um Criterio e o cliente precisa atender a todos.
+Palavras sem campo são procuradas no nome, na placa e no telefone, como na
+busca comum; valores com espaços vão entre aspas (`cidade:"São Paulo"`).
+Os textos são comparados sem acentos nem maiúsculas e basta que o valor
+apareça no campo (`servico:oleo` encontra "Troca de óleo"). Datas aceitam
+`data:15/01/2026`, `data:>=01/01/2026` (também >, <= e <) e faixas
+`data:01/01/2026..31/01/2026`.
+"""
+import re
+from datetime import date, datetime
+from typing import List, NamedTuple, Optional
+
+from Program.ordenacao import ordinal_data
+from Program.texto import (apenas_digitos, digitos_telefone, normalizar, normalizar_placa,
+                           normalizar_repetido)
+
+# Nome do campo na consulta (sem acentos) -> atributo do Cliente
+CAMPOS_CONSULTA = {
+    'nome': 'nome', 'placa': 'placa', 'telefone': 'telefone', 'tel': 'telefone',
+    'cidade': 'cidade', 'cor': 'cor', 'modelo': 'modelo', 'servico': 'servico',
+    'data': 'data_entrada', 'entrada': 'data_entrada',
+}
+
+# Campos com poucos valores distintos, consultados pelo índice de valores
+CAMPOS_CATEGORIA = ('cidade', 'cor', 'modelo', 'servico')
+
+_PARTE = re.compile(r'(?:(\w+):)?(?:"([^"]*)"?|(\S*))')
+_QUALIFICADOR = re.compile(r'(?:^|\s)(\w+):')
+_ULTIMA_DATA = date.max.toordinal()
+
+
+class Criterio(NamedTuple):
+    """Uma condição da consulta.
+
+    `campo` é o atributo do Cliente (None procura em nome, placa e
+    telefone) e `valor`, o texto normalizado procurado. Em data_entrada a
+    condição é a faixa de ordinais de `minimo` a `maximo`, inclusive.
+    """
+    campo: Optional[str]
+    valor: str = ''
+    minimo: int = 0
+    maximo: int = 0
+
+    def aceita(self, cliente) -> bool:
+        """Verifica o cliente sem usar índices"""
+        if self.campo == 'data_entrada':
+            return self.minimo <= ordinal_data(cliente.data_entrada) <= self.maximo
+        if self.campo in CAMPOS_CATEGORIA:
+            return self.valor in normalizar_repetido(getattr(cliente, self.campo))
+        nome = self.campo in (None, 'nome') and self.valor in normalizar(cliente.nome)
+        placa = self.campo in (None, 'placa') and (
+            normalizar_placa(self.valor) in normalizar_placa(cliente.placa))
+        digitos = digitos_telefone(self.valor)
+        telefone = self.campo in (None, 'telefone') and digitos is not None and (
+            digitos in apenas_digitos(cliente.telefone))
+        return nome or placa or telefone
+
+
+def eh_consulta(texto: str) -> bool:
+    """Indica se o texto usa algum campo conhecido (`cidade:...`)"""
+    return any(normalizar(campo) in CAMPOS_CONSULTA for campo in _QUALIFICADOR.findall(texto))
+
+
+def interpretar_consulta(texto: str) -> List[Criterio]:
+    """Converte o texto da consulta em critérios.
+
+    Campos sem valor (`cidade:` ainda sendo digitado) são ignorados.
+    Levanta ValueError para campos desconhecidos e datas inválidas.
+    """
+    criterios = []
+    for nome_campo, entre_aspas, simples in _PARTE.findall(texto):
+        valor = (entre_aspas or simples).strip()
+        if not valor:
+            continue
+        campo = None
+        if nome_campo:
+            campo = CAMPOS_CONSULTA.get(normalizar(nome_campo))
+            if campo is None:
+                raise ValueError(f"Campo desconhecido: {nome_campo}")
+        if campo == 'data_entrada':
+            criterios.append(Criterio(campo, valor, *_faixa_datas(valor)))
+        else:
+            criterios.append(Criterio(campo, normalizar(valor)))
+    return criterios
+
+
+def _faixa_datas(texto: str):
+    """Primeiro e último ordinal aceitos por `data:...`"""
+    if '..' in texto:
+        inicio, fim = texto.split('..', 1)
+        return (_ordinal(inicio) if inicio else 1,
+                _ordinal(fim) if fim else _ULTIMA_DATA)
+    for operador in ('>=', '<=', '>', '<', '='):
+        if texto.startswith(operador):
+            dia = _ordinal(texto[len(operador):])
+            return {
+                '>=': (dia, _ULTIMA_DATA), '<=': (1, dia),
+                '>': (dia + 1, _ULTIMA_DATA), '<': (1, dia - 1), '=': (dia, dia),
+            }[operador]
+    dia = _ordinal(texto)
+    return dia, dia
+
+
+def _ordinal(texto: str) -> int:
+    try:
+        return datetime.strptime(texto.strip(), "%d/%m/%Y").toordinal()
+    except ValueError:
+        raise ValueError(f"Data inválida: {texto} (use DD/MM/AAAA)") from None
@@ -0,0 +1,101 @@
+from collections import Counter
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from Program.ordenacao import ordinal_data
+
+
+class EstatisticasClientes:
+    """Contadores de entradas por dia, mês, serviço e cidade.
+
+    São atualizados a cada inclusão e exclusão, então as consultas não
+    percorrem os clientes. Entradas com data inválida só contam no total e
+    nos contadores de serviço e cidade. As entradas movidas para o histórico
+    (ver incluir_historico) entram nas contagens por mês, serviço e cidade,
+    mas não em `total`.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.por_dia: Counter = Counter()      # ordinal da data -> entradas
+        self.por_mes: Counter = Counter()      # (ano, mês) -> entradas
+        self.por_servico: Counter = Counter()
+        self.por_cidade: Counter = Counter()
+        self.arquivados = 0
+        self.historico_por_mes: Counter = Counter()
+        self.historico_por_servico: Counter = Counter()
+        self.historico_por_cidade: Counter = Counter()
+
+    def incluir_historico(self, por_mes: Counter, por_servico: Counter, por_cidade: Counter):
+        """Define as contagens das entradas que estão no histórico"""
+        self.arquivados = sum(por_mes.values())
+        self.historico_por_mes = por_mes
+        self.historico_por_servico = por_servico
+        self.historico_por_cidade = por_cidade
+
+    def adicionar(self, cliente):
+        self._contar(cliente, 1)
+
+    def remover(self, cliente):
+        self._contar(cliente, -1)
+
+    def _contar(self, cliente, delta: int):
+        self.total += delta
+        self._somar(self.por_servico, cliente.servico, delta)
+        self._somar(self.por_cidade, cliente.cidade, delta)
+        ordinal = ordinal_data(cliente.data_entrada)
+        if ordinal:
+            self._somar(self.por_dia, ordinal, delta)
+            dia = date.fromordinal(ordinal)
+            self._somar(self.por_mes, (dia.year, dia.month), delta)
+
+    @staticmethod
+    def _somar(contador: Counter, chave, delta: int):
+        valor = contador[chave] + delta
+        if valor:
+            contador[chave] = valor
+        else:
+            del contador[chave]
+
+    def limpar(self):
+        self.__init__()
+
+    def entradas_no_dia(self, dia: date) -> int:
+        return self.por_dia.get(dia.toordinal(), 0)
+
+    def entradas_nos_ultimos_dias(self, dias: int, hoje: Optional[date] = None) -> int:
+        """Entradas de hoje e dos dias anteriores, `dias` dias ao todo"""
+        fim = (hoje or date.today()).toordinal()
+        return sum(self.por_dia.get(ordinal, 0) for ordinal in range(fim - dias + 1, fim + 1))
+
+    def entradas_no_mes(self, ano: int, mes: int) -> int:
+        return self.por_mes.get((ano, mes), 0) + self.historico_por_mes.get((ano, mes), 0)
+
+    def todos_por_servico(self) -> Counter:
+        """Entradas por serviço, incluindo as do histórico"""
+        return self.por_servico + self.historico_por_servico
+
+    def todos_por_cidade(self) -> Counter:
+        """Entradas por cidade, incluindo as do histórico"""
+        return self.por_cidade + self.historico_por_cidade
+
+    def ultimos_meses(self, quantidade: int = 12,
+                      hoje: Optional[date] = None) -> List[Tuple[Tuple[int, int], int]]:
+        """Entradas dos últimos meses, do mais antigo ao atual"""
+        hoje = hoje or date.today()
+        meses = []
+        ano, mes = hoje.year, hoje.month
+        for _ in range(quantidade):
+            meses.append(((ano, mes), self.entradas_no_mes(ano, mes)))
+            ano, mes = (ano, mes - 1) if mes > 1 else (ano - 1, 12)
+        return meses[::-1]
+
+    def resumo(self, hoje: Optional[date] = None) -> Dict[str, int]:
+        """Números do cabeçalho: total, hoje, últimos 7 dias e mês atual"""
+        hoje = hoje or date.today()
+        return {
+            'total': self.total,
+            'hoje': self.entradas_no_dia(hoje),
+            'semana': self.entradas_nos_ultimos_dias(7, hoje),
+            'mes': self.entradas_no_mes(hoje.year, hoje.month),
+        }
@@ -0,0 +1,134 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class GravadorEmSegundoPlano:
+    """Grava os dados em uma thread separada, agrupando alterações próximas.
+
+    Cada chamada de agendar() só marca os dados como pendentes. A gravação
+    acontece quando passam `atraso` segundos sem novas alterações, ou no
+    máximo `atraso_maximo` segundos depois da primeira, de modo que uma
+    rajada de alterações vira uma única gravação. Se a gravação falhar, os
+    dados continuam pendentes, a gravação é tentada de novo mais tarde e
+    `ao_falhar`, se informado, é chamado na thread de gravação.
+    """
+
+    def __init__(self, gravar: Callable[[], bool], atraso: float = 0.5,
+                 atraso_maximo: float = 5.0, ao_falhar: Optional[Callable[[], None]] = None):
+        self._gravar = gravar
+        self._ao_falhar = ao_falhar
+        self.atraso = atraso
+        self.atraso_maximo = atraso_maximo
+        self.gravacoes = 0
+        self.falhas = 0
+        self.ultimo_resultado = True
+        self._condicao = threading.Condition()
+        self._pendente_desde: Optional[float] = None
+        self._ultima_alteracao = 0.0
+        self._gravando = False
+        self._tentativas = 0
+        self._urgente_ate = 0
+        self._encerrado = False
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+
+    @property
+    def pendente(self) -> bool:
+        """Indica se há alterações que ainda não foram gravadas"""
+        with self._condicao:
+            return self._pendente_desde is not None or self._gravando
+
+    def agendar(self):
+        """Marca os dados como alterados"""
+        with self._condicao:
+            agora = time.monotonic()
+            if self._pendente_desde is None:
+                self._pendente_desde = agora
+            self._ultima_alteracao = agora
+            self._condicao.notify_all()
+
+    def descarregar(self, timeout: float = None) -> bool:
+        """Grava já o que estiver pendente e espera a gravação terminar.
+
+        Retorna se a gravação deu certo; False também se o tempo acabar.
+        """
+        with self._condicao:
+            if self._pendente_desde is None and not self._gravando:
+                return self.ultimo_resultado
+            # Uma gravação em andamento pode não incluir as últimas alterações
+            alvo = self._tentativas + 1
+            if self._gravando and self._pendente_desde is not None:
+                alvo += 1
+            self._urgente_ate = max(self._urgente_ate, alvo)
+            self._condicao.notify_all()
+
+            limite = None if timeout is None else time.monotonic() + timeout
+            while self._tentativas < alvo:
+                if not self._thread.is_alive():
+                    return False
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._condicao.wait(restante)
+            return self.ultimo_resultado
+
+    def encerrar(self, timeout: float = None) -> bool:
+        """Grava o que estiver pendente e para a thread"""
+        resultado = self.descarregar(timeout)
+        with self._condicao:
+            self._encerrado = True
+            self._condicao.notify_all()
+        self._thread.join(timeout)
+        return resultado
+
+    def _executar(self):
+        with self._condicao:
+            while True:
+                while self._pendente_desde is None:
+                    if self._encerrado:
+                        return
+                    self._condicao.wait()
+
+                if self._tentativas >= self._urgente_ate and not self._encerrado:
+                    prazo = min(self._ultima_alteracao + self.atraso,
+                                self._pendente_desde + self.atraso_maximo)
+                    restante = prazo - time.monotonic()
+                    if restante > 0:
+                        self._condicao.wait(restante)
+                        continue
+
+                self._pendente_desde = None
+                self._gravando = True
+                self._condicao.release()
+                try:
+                    resultado = self._gravar()
+                except Exception as e:
+                    print(f"Erro ao salvar dados: {e}")
+                    resultado = False
+                finally:
+                    self._condicao.acquire()
+
+                self._gravando = False
+                self._tentativas += 1
+                self.ultimo_resultado = resultado
+                self._condicao.notify_all()
+                if resultado:
+                    self.gravacoes += 1
+                else:
+                    self.falhas += 1
+                    if self._encerrado:
+                        return
+                    # Os dados continuam pendentes; tenta de novo após o atraso
+                    agora = time.monotonic()
+                    if self._pendente_desde is None:
+                        self._pendente_desde = agora
+                    self._ultima_alteracao = agora
+                    if self._ao_falhar:
+                        self._condicao.release()
+                        try:
+                            self._ao_falhar()
+                        except Exception as e:
+                            print(f"Erro ao avisar da falha na gravação: {e}")
+                        finally:
+                            self._condicao.acquire()
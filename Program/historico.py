@@ -0,0 +1,497 @@
+import gzip
+import json
+import os
+import re
+import threading
+from calendar import monthrange
+from collections import Counter, OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from Program.arquivos import TravaArquivo, gravar_atomicamente
+from Program.ordenacao import ordinal_data
+from Program.texto import normalizar_repetido
+
+_NOME_SEGMENTO = re.compile(r'^(\d{4})-(\d{2})\.json\.gz$')
+
+
+class IndiceMeses:
+    """Em quais meses do histórico aparece cada trecho do nome, placa e telefone.
+
+    Para cada campo guarda, por n-grama, uma máscara de bits dos meses em
+    que ele aparece, e o maior texto de cada mês. O tamanho depende da
+    quantidade de n-gramas distintos, limitada pelo alfabeto, e não da
+    quantidade de clientes. Nomes e placas usam trigramas; telefones,
+    sequências de 5 dígitos, já que há só mil trigramas de dígitos e quase
+    todos aparecem nos telefones de qualquer mês. Como no IndiceTrigramas,
+    um mês retornado só pode ter o termo; os clientes ainda são conferidos.
+
+    Os ids entram pelos seus primeiros `PREFIXO_ID` caracteres, para saber
+    sem abrir os segmentos se um id pode já estar no histórico.
+    """
+
+    TAMANHOS = {'nome': 3, 'placa': 3, 'telefone': 5}
+    PREFIXO_ID = 5
+
+    def __init__(self):
+        self.bits: Dict[Tuple[int, int], int] = {}
+        # Tamanho e data do arquivo de cada mês quando foi indexado
+        self.arquivos: Dict[Tuple[int, int], Optional[List[int]]] = {}
+        self._mascaras: Dict[str, Dict[str, int]] = {campo: {} for campo in self.TAMANHOS}
+        self._maiores: Dict[str, Dict[Tuple[int, int], int]] = {
+            campo: {} for campo in self.TAMANHOS}
+        self._ids: Dict[str, int] = {}
+
+    @staticmethod
+    def _ngramas(texto: str, n: int) -> Set[str]:
+        return {texto[i:i + n] for i in range(len(texto) - n + 1)}
+
+    def indexar(self, mes: Tuple[int, int], chaves: Iterable[tuple], ids: Iterable[str],
+                arquivo: Optional[List[int]]):
+        """Indexa (ou indexa de novo) o mês pelas chaves (nome, placa, telefone) e ids dos clientes"""
+        self.remover(mes)
+        bit = self.bits[mes] = min(set(range(len(self.bits) + 1)) - set(self.bits.values()))
+        self.arquivos[mes] = arquivo
+        textos = {campo: set() for campo in self.TAMANHOS}
+        for nome, placa, telefone in chaves:
+            textos['nome'].add(nome)
+            textos['placa'].add(placa)
+            textos['telefone'].add(telefone)
+        for campo, n in self.TAMANHOS.items():
+            mascaras = self._mascaras[campo]
+            ngramas = set().union(*(self._ngramas(texto, n) for texto in textos[campo]))
+            for ngrama in ngramas:
+                mascaras[ngrama] = mascaras.get(ngrama, 0) | (1 << bit)
+            self._maiores[campo][mes] = max(map(len, textos[campo]), default=0)
+        for prefixo in {id_cliente[:self.PREFIXO_ID] for id_cliente in ids}:
+            self._ids[prefixo] = self._ids.get(prefixo, 0) | (1 << bit)
+
+    def remover(self, mes: Tuple[int, int]):
+        bit = self.bits.pop(mes, None)
+        self.arquivos.pop(mes, None)
+        if bit is None:
+            return
+        limpar = ~(1 << bit)
+        for campo, mascaras in self._mascaras.items():
+            for ngrama, mascara in list(mascaras.items()):
+                if mascara >> bit & 1:
+                    mascara &= limpar
+                    if mascara:
+                        mascaras[ngrama] = mascara
+                    else:
+                        del mascaras[ngrama]
+            self._maiores[campo].pop(mes, None)
+        for prefixo, mascara in list(self._ids.items()):
+            if mascara >> bit & 1:
+                mascara &= limpar
+                if mascara:
+                    self._ids[prefixo] = mascara
+                else:
+                    del self._ids[prefixo]
+
+    def meses_com_id(self, id_cliente: str) -> Set[Tuple[int, int]]:
+        """Meses que podem ter o id"""
+        mascara = self._ids.get(id_cliente[:self.PREFIXO_ID], 0)
+        return {mes for mes, bit in self.bits.items() if mascara >> bit & 1}
+
+    def meses_com(self, **termos: Optional[str]) -> Optional[Set[Tuple[int, int]]]:
+        """Meses que podem ter algum dos termos no seu campo (nome=, placa=, telefone=).
+
+        Termos None são ignorados. Retorna None quando algum termo é curto
+        demais para o índice.
+        """
+        encontrados = 0
+        for campo, termo in termos.items():
+            if termo is None:
+                continue
+            n = self.TAMANHOS[campo]
+            if len(termo) < n:
+                return None
+            mascara = None
+            for ngrama in self._ngramas(termo, n):
+                outra = self._mascaras[campo].get(ngrama, 0)
+                mascara = outra if mascara is None else mascara & outra
+                if not mascara:
+                    break
+            if mascara:
+                # Sem os meses em que nenhum texto é tão longo quanto o termo
+                # (um telefone não cabe em uma placa, por exemplo)
+                maiores = self._maiores[campo]
+                for mes, bit in self.bits.items():
+                    if mascara >> bit & 1 and maiores[mes] < len(termo):
+                        mascara &= ~(1 << bit)
+                encontrados |= mascara
+        return {mes for mes, bit in self.bits.items() if encontrados >> bit & 1}
+
+    def para_json(self) -> Dict:
+        meses = {}
+        for mes, bit in sorted(self.bits.items()):
+            meses[f"{mes[0]:04d}-{mes[1]:02d}"] = {
+                'bit': bit, 'arquivo': self.arquivos[mes],
+                'maiores': {campo: self._maiores[campo][mes] for campo in self.TAMANHOS},
+            }
+        return {'meses': meses, 'mascaras': self._mascaras, 'ids': self._ids}
+
+    @classmethod
+    def de_json(cls, dados: Dict) -> 'IndiceMeses':
+        indice = cls()
+        for nome, mes in dados['meses'].items():
+            chave = (int(nome[:4]), int(nome[5:7]))
+            indice.bits[chave] = mes['bit']
+            indice.arquivos[chave] = mes['arquivo']
+            for campo in cls.TAMANHOS:
+                indice._maiores[campo][chave] = mes['maiores'][campo]
+        for campo in cls.TAMANHOS:
+            indice._mascaras[campo] = dados['mascaras'][campo]
+        indice._ids = dados['ids']
+        return indice
+
+
+class SegmentoHistorico:
+    """Clientes de um mês no histórico; o arquivo só é lido quando necessário"""
+
+    def __init__(self, caminho: str, mes: Tuple[int, int], resumo: Dict):
+        self.caminho = caminho
+        self.mes = mes
+        self.resumo = resumo
+        ano, numero = mes
+        self.primeiro = date(ano, numero, 1).toordinal()
+        self.ultimo = date(ano, numero, monthrange(ano, numero)[1]).toordinal()
+        self._registros: Optional[List[tuple]] = None
+
+    @property
+    def quantidade(self) -> int:
+        return self.resumo['quantidade']
+
+    @property
+    def carregado(self) -> bool:
+        return self._registros is not None
+
+    def registros(self, fabrica: Callable[[Dict], Any],
+                  chaves: Callable[[Any], tuple]) -> List[tuple]:
+        """(cliente, chaves de busca) de cada cliente do mês, lendo o arquivo na primeira vez"""
+        if self._registros is None:
+            with gzip.open(self.caminho, 'rb') as f:
+                dados = json.loads(f.read().decode('utf-8'))
+            clientes = [fabrica(registro) for registro in dados]
+            self._registros = [(cliente, chaves(cliente)) for cliente in clientes]
+        return self._registros
+
+    def descartar(self):
+        """Libera da memória os clientes lidos; a próxima leitura abre o arquivo de novo"""
+        self._registros = None
+
+
+class HistoricoClientes:
+    """Clientes antigos guardados fora da lista principal, um segmento por mês.
+
+    Cada segmento é um arquivo AAAA-MM.json.gz, somente leitura, com os
+    clientes que deram entrada naquele mês, no mesmo formato do arquivo
+    principal. O manifesto.json guarda o resumo de cada segmento (quantidade
+    e contagens por serviço, cidade, cor e modelo), de modo que contagens e
+    relatórios não precisam abrir os segmentos. O indice.json.gz (ver
+    IndiceMeses) diz em que meses aparece cada trecho de nome, placa e
+    telefone: uma busca só abre os meses que podem ter o termo. Os últimos
+    `MAXIMO_CARREGADOS` segmentos lidos ficam em memória; os usados há mais
+    tempo são descartados. Várias estações podem arquivar na mesma pasta:
+    `arquivar` trava a pasta e relê o que as outras gravaram.
+
+    `fabrica` converte um registro do arquivo em cliente e `chaves` calcula
+    os textos de busca de um cliente: nome e placa normalizados e os dígitos
+    do telefone.
+    """
+
+    VERSAO_MANIFESTO = 1
+    VERSAO_INDICE = 2
+    MAXIMO_CARREGADOS = 12
+
+    def __init__(self, diretorio: str, fabrica: Callable[[Dict], Any],
+                 chaves: Callable[[Any], tuple]):
+        self.diretorio = diretorio
+        self.fabrica = fabrica
+        self.chaves = chaves
+        self.segmentos: Dict[Tuple[int, int], SegmentoHistorico] = {}
+        # Segmentos lidos, do usado há mais tempo ao mais recente; buscas
+        # podem rodar em paralelo (serviço HTTP), daí a trava
+        self._carregados: 'OrderedDict[Tuple[int, int], SegmentoHistorico]' = OrderedDict()
+        self._trava = threading.Lock()
+        # Meses em que aparece cada trecho de nome, placa e telefone, lido
+        # na primeira busca
+        self._indice: Optional[IndiceMeses] = None
+        self._trava_indice = threading.Lock()
+        self._ler_manifesto()
+
+    @property
+    def manifesto(self) -> str:
+        return os.path.join(self.diretorio, 'manifesto.json')
+
+    @property
+    def caminho_indice(self) -> str:
+        return os.path.join(self.diretorio, 'indice.json.gz')
+
+    def _caminho(self, mes: Tuple[int, int]) -> str:
+        return os.path.join(self.diretorio, f"{mes[0]:04d}-{mes[1]:02d}.json.gz")
+
+    def _ler_manifesto(self):
+        """Lê o manifesto e a lista de segmentos do disco, descartando o que estava em memória"""
+        with self._trava:
+            for segmento in self._carregados.values():
+                segmento.descartar()
+            self._carregados.clear()
+        with self._trava_indice:
+            self._indice = None
+        segmentos = {}
+        if not os.path.isdir(self.diretorio):
+            self.segmentos = segmentos
+            return
+        resumos = {}
+        try:
+            with open(self.manifesto, encoding='utf-8') as f:
+                resumos = json.load(f).get('segmentos', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Erro ao ler o manifesto do histórico: {e}")
+
+        for nome in sorted(os.listdir(self.diretorio)):
+            encontrado = _NOME_SEGMENTO.match(nome)
+            if not encontrado:
+                continue
+            mes = (int(encontrado.group(1)), int(encontrado.group(2)))
+            resumo = resumos.get(nome[:7])
+            segmento = SegmentoHistorico(self._caminho(mes), mes, resumo or {})
+            if resumo is None:
+                # Gravado sem o manifesto (gravação interrompida): resume agora
+                segmento.resumo = self._resumir(
+                    [cliente for cliente, _ in self._abrir(segmento)])
+            segmentos[mes] = segmento
+        self.segmentos = segmentos
+
+    @staticmethod
+    def _resumir(clientes: List[Any]) -> Dict:
+        return {
+            'quantidade': len(clientes),
+            'por_servico': dict(Counter(cliente.servico for cliente in clientes)),
+            'por_cidade': dict(Counter(cliente.cidade for cliente in clientes)),
+            'por_cor': dict(Counter(cliente.cor for cliente in clientes)),
+            'por_modelo': dict(Counter(cliente.modelo for cliente in clientes)),
+        }
+
+    def _abrir(self, segmento: SegmentoHistorico) -> List[tuple]:
+        """Registros do segmento, descartando os segmentos usados há mais tempo"""
+        registros = segmento.registros(self.fabrica, self.chaves)
+        self._usado(segmento)
+        return registros
+
+    def _usado(self, segmento: SegmentoHistorico):
+        with self._trava:
+            self._carregados[segmento.mes] = segmento
+            self._carregados.move_to_end(segmento.mes)
+            while len(self._carregados) > self.MAXIMO_CARREGADOS:
+                _, antigo = self._carregados.popitem(last=False)
+                antigo.descartar()
+
+    @staticmethod
+    def _versao_arquivo(segmento: SegmentoHistorico) -> Optional[List[int]]:
+        """Tamanho e data do arquivo do segmento, para notar um índice desatualizado"""
+        try:
+            info = os.stat(segmento.caminho)
+        except OSError:
+            return None
+        return [info.st_size, info.st_mtime_ns]
+
+    def _indexar(self, indice: IndiceMeses, segmento: SegmentoHistorico):
+        registros = self._abrir(segmento)
+        indice.indexar(segmento.mes, (chaves for _, chaves in registros),
+                       (cliente.id for cliente, _ in registros), self._versao_arquivo(segmento))
+
+    def _indice_meses(self) -> IndiceMeses:
+        """Índice dos meses, lido do arquivo na primeira vez que é usado.
+
+        Meses que faltam no arquivo, ou cujo segmento mudou depois dele
+        (histórico gravado por uma versão anterior, gravação interrompida),
+        são indexados agora, abrindo seus segmentos uma única vez.
+        """
+        with self._trava_indice:
+            if self._indice is not None:
+                return self._indice
+            indice = None
+            try:
+                with gzip.open(self.caminho_indice, 'rb') as f:
+                    dados = json.loads(f.read().decode('utf-8'))
+                if dados.get('versao') == self.VERSAO_INDICE:
+                    indice = IndiceMeses.de_json(dados)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Erro ao ler o índice do histórico: {e}")
+            indice = indice or IndiceMeses()
+
+            alterado = False
+            for mes in set(indice.bits) - set(self.segmentos):
+                indice.remover(mes)
+                alterado = True
+            for mes, segmento in self.segmentos.items():
+                if mes not in indice.bits or indice.arquivos[mes] != self._versao_arquivo(segmento):
+                    self._indexar(indice, segmento)
+                    alterado = True
+            self._indice = indice
+            if alterado:
+                try:
+                    self._gravar_indice()
+                except OSError as e:
+                    print(f"Erro ao gravar o índice do histórico: {e}")
+            return indice
+
+    def _gravar_indice(self):
+        dados = {'versao': self.VERSAO_INDICE, **self._indice.para_json()}
+        conteudo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+        gravar_atomicamente(self.caminho_indice, gzip.compress(conteudo, mtime=0))
+
+    def meses_com(self, nome: Optional[str] = None, placa: Optional[str] = None,
+                  telefone: Optional[str] = None) -> Optional[Set[Tuple[int, int]]]:
+        """Meses que podem ter o nome, a placa ou os dígitos do telefone (já normalizados).
+
+        Retorna None quando algum termo é curto demais para o índice (menos
+        de 3 caracteres ou 5 dígitos); a busca comum não procura no
+        histórico nesse caso.
+        """
+        if not self.segmentos:
+            return set()
+        indice = self._indice_meses()
+        with self._trava_indice:
+            return indice.meses_com(nome=nome, placa=placa, telefone=telefone)
+
+    def repetidos(self, placas: Dict[str, str],
+                  ids: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """Quais das placas e dos ids já estão no histórico.
+
+        `placas` leva cada placa à sua forma normalizada, como em meses_com.
+        Só abre os meses que o índice aponta para alguma placa ou id.
+        """
+        if not self.segmentos:
+            return set(), set()
+        ids = set(ids)
+        indice = self._indice_meses()
+        meses = set()
+        with self._trava_indice:
+            for normalizada in placas.values():
+                possiveis = indice.meses_com(placa=normalizada)
+                meses |= set(indice.bits) if possiveis is None else possiveis
+            for id_cliente in ids:
+                meses |= indice.meses_com_id(id_cliente)
+        placas_encontradas, ids_encontrados = set(), set()
+        for cliente, _ in self.registros(meses=meses):
+            if cliente.placa in placas:
+                placas_encontradas.add(cliente.placa)
+            if cliente.id in ids:
+                ids_encontrados.add(cliente.id)
+        return placas_encontradas, ids_encontrados
+
+    def meses_com_valor(self, campo: str, valor: str) -> Set[Tuple[int, int]]:
+        """Meses que podem ter clientes com o valor (normalizado) contido no campo.
+
+        Usa as contagens do manifesto (cidade, serviço, cor e modelo); meses
+        sem a contagem do campo sempre entram.
+        """
+        meses = set()
+        for mes, segmento in self.segmentos.items():
+            contagens = segmento.resumo.get('por_' + campo)
+            if contagens is None or any(valor in normalizar_repetido(texto) for texto in contagens):
+                meses.add(mes)
+        return meses
+
+    @property
+    def total(self) -> int:
+        return sum(segmento.quantidade for segmento in self.segmentos.values())
+
+    def arquivar(self, clientes: List[Any]):
+        """Acrescenta os clientes aos segmentos dos seus meses.
+
+        Os segmentos afetados são regravados (cada um de forma atômica) e o
+        manifesto por último. Um cliente que já estiver no segmento, com o
+        mesmo id, é substituído. A pasta fica travada durante a gravação e o
+        manifesto e os segmentos são relidos antes, para não sobrescrever o
+        que outra estação arquivou. Levanta OSError se a gravação falhar.
+        """
+        por_mes: Dict[Tuple[int, int], List[Any]] = {}
+        for cliente in clientes:
+            dia = date.fromordinal(ordinal_data(cliente.data_entrada))
+            por_mes.setdefault((dia.year, dia.month), []).append(cliente)
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        # A trava fica ao lado da pasta (<pasta>.lock), fora da lista de segmentos
+        with TravaArquivo(self.diretorio):
+            self._ler_manifesto()
+            self._gravar_meses(por_mes)
+
+    def _gravar_meses(self, por_mes: Dict[Tuple[int, int], List[Any]]):
+        indice = self._indice_meses()
+        for mes, novos in sorted(por_mes.items()):
+            existente = self.segmentos.get(mes)
+            anteriores = ([cliente for cliente, _ in self._abrir(existente)]
+                          if existente else [])
+            ids_novos = {cliente.id for cliente in novos}
+            todos = [cliente for cliente in anteriores if cliente.id not in ids_novos] + novos
+            todos.sort(key=lambda cliente: ordinal_data(cliente.data_entrada))
+
+            caminho = self._caminho(mes)
+            conteudo = json.dumps([cliente.to_dict() for cliente in todos],
+                                  ensure_ascii=False).encode('utf-8')
+            gravar_atomicamente(caminho, gzip.compress(conteudo, mtime=0))
+            segmento = SegmentoHistorico(caminho, mes, self._resumir(todos))
+            segmento._registros = [(cliente, self.chaves(cliente)) for cliente in todos]
+            self.segmentos[mes] = segmento
+            self._usado(segmento)
+            with self._trava_indice:
+                self._indexar(indice, segmento)
+
+        self.segmentos = dict(sorted(self.segmentos.items()))
+        # Se a gravação for interrompida antes do índice, os meses cujo
+        # arquivo não confere com o registrado no índice são indexados de novo
+        self._gravar_indice()
+        manifesto = {
+            'versao': self.VERSAO_MANIFESTO,
+            'segmentos': {f"{ano:04d}-{mes:02d}": segmento.resumo
+                          for (ano, mes), segmento in self.segmentos.items()},
+        }
+        gravar_atomicamente(self.manifesto,
+                            json.dumps(manifesto, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    def no_periodo(self, minimo: int, maximo: int) -> List[SegmentoHistorico]:
+        """Segmentos com algum dia entre os ordinais minimo e maximo"""
+        return [segmento for segmento in self.segmentos.values()
+                if segmento.ultimo >= minimo and segmento.primeiro <= maximo]
+
+    def registros(self, minimo: int = 0, maximo: Optional[int] = None,
+                  meses: Optional[Set[Tuple[int, int]]] = None) -> Iterator[tuple]:
+        """(cliente, chaves de busca) dos segmentos no período, abrindo-os sob demanda.
+
+        Com `meses` (ver meses_com), só os segmentos desses meses.
+        """
+        segmentos = (self.segmentos.values() if maximo is None
+                     else self.no_periodo(minimo, maximo))
+        if meses is not None:
+            segmentos = [segmento for segmento in segmentos if segmento.mes in meses]
+        for segmento in list(segmentos):
+            yield from self._abrir(segmento)
+
+    def contar(self, minimo: int, maximo: int) -> int:
+        """Clientes com entrada no período; só abre os meses cobertos em parte"""
+        total = 0
+        for segmento in self.no_periodo(minimo, maximo):
+            if minimo <= segmento.primeiro and segmento.ultimo <= maximo:
+                total += segmento.quantidade
+            else:
+                total += sum(1 for cliente, _ in self._abrir(segmento)
+                             if minimo <= ordinal_data(cliente.data_entrada) <= maximo)
+        return total
+
+    def contadores(self) -> Tuple[Counter, Counter, Counter]:
+        """Entradas por (ano, mês), por serviço e por cidade, lidas do manifesto"""
+        por_mes, por_servico, por_cidade = Counter(), Counter(), Counter()
+        for mes, segmento in self.segmentos.items():
+            por_mes[mes] += segmento.quantidade
+            por_servico.update(segmento.resumo.get('por_servico', {}))
+            por_cidade.update(segmento.resumo.get('por_cidade', {}))
+        return por_mes, por_servico, por_cidade
@@ -0,0 +1,112 @@
+import csv
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from Program.armazenamento import ArmazenamentoClientes
+from Program.carregamento import LeitorIncremental
+from Program.cliente import Cliente
+from Program.validacao import formatar_telefone, validar_dados
+
+
+class RelatorioImportacao:
+    """Resultado de uma importação em lote"""
+
+    def __init__(self):
+        self.total = 0
+        self.adicionados = 0
+        # (número do registro no arquivo, motivos da recusa)
+        self.rejeitados: List[Tuple[int, List[str]]] = []
+        # Motivo de o lote não ter sido gravado, se for o caso
+        self.erro: Optional[str] = None
+
+    def resumo(self) -> str:
+        resumo = (f"{self.total} registros lidos, {self.adicionados} clientes importados, "
+                  f"{len(self.rejeitados)} rejeitados")
+        return f"{resumo}; {self.erro}" if self.erro else resumo
+
+
+def ler_registros(caminho: str) -> Iterator[Dict[str, str]]:
+    """Lê os registros de um arquivo CSV ou JSON, um de cada vez"""
+    if caminho.lower().endswith('.json'):
+        for objetos in LeitorIncremental(caminho):
+            yield from objetos
+        return
+
+    with open(caminho, 'r', encoding='utf-8-sig', newline='') as f:
+        # Planilhas exportadas no Brasil costumam usar ';' como separador
+        try:
+            dialeto = csv.Sniffer().sniff(f.read(4096), delimiters=',;\t')
+        except csv.Error:
+            dialeto = csv.excel
+        f.seek(0)
+        yield from csv.DictReader(f, dialect=dialeto)
+
+
+def importar_registros(gerenciador: ArmazenamentoClientes, registros) -> RelatorioImportacao:
+    """Valida e importa os registros, gravando os dados uma única vez ao final.
+
+    Cada registro passa pelas mesmas regras do formulário. Placas e ids
+    repetidos no próprio arquivo ou já cadastrados são rejeitados. Se a
+    gravação do lote falhar, nenhum cliente é importado e `relatorio.erro`
+    diz o motivo.
+    """
+    relatorio = RelatorioImportacao()
+    # Cliente -> número do registro, para relatar os recusados pelo gerenciador
+    numeros: Dict[Cliente, int] = {}
+
+    def clientes_validos() -> Iterator[Cliente]:
+        placas_vistas = set()
+        ids_vistos = set()
+        for numero, registro in enumerate(registros, 1):
+            relatorio.total = numero
+            dados = {str(campo).strip().lower(): str(valor or '').strip()
+                     for campo, valor in registro.items() if campo}
+
+            erros = validar_dados(dados)
+            if erros:
+                relatorio.rejeitados.append((numero, erros))
+                continue
+
+            placa = dados['placa'].upper()
+            if placa in placas_vistas:
+                relatorio.rejeitados.append((numero, ["Placa repetida no arquivo"]))
+                continue
+            placas_vistas.add(placa)
+
+            cliente = Cliente(
+                nome=dados['nome'],
+                telefone=formatar_telefone(dados['telefone']),
+                cidade=dados['cidade'],
+                placa=placa,
+                cor=dados.get('cor', ''),
+                modelo=dados['modelo'],
+                servico=dados['servico'],
+                data_entrada=dados.get('data_entrada') or None,
+                id=dados.get('id') or None
+            )
+            if cliente.id in ids_vistos:
+                relatorio.rejeitados.append((numero, ["Id repetido no arquivo"]))
+                continue
+            ids_vistos.add(cliente.id)
+            numeros[cliente] = numero
+            yield cliente
+
+    relatorio.adicionados, recusados = gerenciador.adicionar_clientes_em_lote(clientes_validos())
+    for cliente in recusados:
+        if gerenciador.obter_por_id(cliente.id):
+            motivo = "Já existe um cliente com este id"
+        elif gerenciador.obter_por_placa(cliente.placa):
+            motivo = "Já existe um cliente com esta placa"
+        else:
+            motivo = "Já existe um cliente com esta placa ou este id no histórico"
+        relatorio.rejeitados.append((numeros[cliente], [motivo]))
+    if relatorio.adicionados + len(recusados) < len(numeros):
+        # O gerenciador desfaz o lote inteiro quando a gravação falha
+        relatorio.adicionados = 0
+        relatorio.erro = "falha ao gravar os dados; nenhum cliente foi importado"
+    relatorio.rejeitados.sort()
+    return relatorio
+
+
+def importar_arquivo(gerenciador: ArmazenamentoClientes, caminho: str) -> RelatorioImportacao:
+    """Importa os clientes de um arquivo CSV ou JSON"""
+    return importar_registros(gerenciador, ler_registros(caminho))
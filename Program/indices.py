@@ -0,0 +1,535 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+class IndiceTrigramas:
+    """Índice invertido de trigramas para busca por substring.
+
+    Cada chave é associada aos trigramas dos seus textos. Uma busca com três
+    ou mais caracteres só precisa intersectar as listas de cada trigrama do
+    termo; os candidatos ainda devem ser conferidos, pois conter todos os
+    trigramas não garante conter o termo inteiro.
+    """
+
+    TAMANHO = 3
+
+    def __init__(self):
+        self._postings: Dict[str, Set[Hashable]] = {}
+
+    def _trigramas(self, textos: Iterable[str]) -> Set[str]:
+        n = self.TAMANHO
+        return {texto[i:i + n] for texto in textos for i in range(len(texto) - n + 1)}
+
+    def adicionar(self, chave: Hashable, textos: Iterable[str]):
+        """Indexa a chave pelos trigramas dos textos"""
+        postings = self._postings
+        for trigrama in self._trigramas(textos):
+            chaves = postings.get(trigrama)
+            if chaves is None:
+                postings[trigrama] = {chave}
+            else:
+                chaves.add(chave)
+
+    def remover(self, chave: Hashable, textos: Iterable[str]):
+        """Remove a chave, usando os mesmos textos com que foi indexada"""
+        for trigrama in self._trigramas(textos):
+            chaves = self._postings.get(trigrama)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._postings[trigrama]
+
+    def limpar(self):
+        """Remove todas as chaves do índice"""
+        self._postings.clear()
+
+    def estimar(self, termo: str) -> Optional[int]:
+        """Limite para a quantidade de candidatos, sem intersectar as listas.
+
+        Retorna None quando o termo é curto demais para usar o índice.
+        """
+        if len(termo) < self.TAMANHO:
+            return None
+        return min(len(self._postings.get(trigrama, ())) for trigrama in self._trigramas([termo]))
+
+    def candidatos(self, termo: str) -> Optional[Set[Hashable]]:
+        """Retorna as chaves que podem conter o termo.
+
+        Retorna None quando o termo é curto demais para usar o índice.
+        """
+        if len(termo) < self.TAMANHO:
+            return None
+
+        listas = []
+        for trigrama in self._trigramas([termo]):
+            chaves = self._postings.get(trigrama)
+            if not chaves:
+                return set()
+            listas.append(chaves)
+
+        # Intersecta a partir da lista mais seletiva
+        listas.sort(key=len)
+        resultado = set(listas[0])
+        for chaves in listas[1:]:
+            resultado &= chaves
+            if not resultado:
+                break
+        return resultado
+
+
+class IndiceValores:
+    """Índice invertido de um campo: valor -> chaves com aquele valor.
+
+    Os valores distintos também são mantidos em ordem, para consultar uma
+    faixa de valores (datas) sem percorrer todas as chaves.
+    """
+
+    def __init__(self):
+        self._postings: Dict[Hashable, Set[Hashable]] = {}
+        self._ordenados: list = []
+
+    def adicionar(self, valor, chave: Hashable):
+        chaves = self._postings.get(valor)
+        if chaves is None:
+            self._postings[valor] = {chave}
+            insort(self._ordenados, valor)
+        else:
+            chaves.add(chave)
+
+    def remover(self, valor, chave: Hashable):
+        chaves = self._postings.get(valor)
+        if chaves is not None:
+            chaves.discard(chave)
+            if not chaves:
+                del self._postings[valor]
+                del self._ordenados[bisect_left(self._ordenados, valor)]
+
+    def faixa(self, minimo, maximo) -> List[Set[Hashable]]:
+        """Conjuntos de chaves dos valores entre minimo e maximo, inclusive"""
+        ordenados = self._ordenados
+        valores = ordenados[bisect_left(ordenados, minimo):bisect_right(ordenados, maximo)]
+        return [self._postings[valor] for valor in valores]
+
+    def contendo(self, trecho: str) -> List[Set[Hashable]]:
+        """Conjuntos de chaves dos valores (textos) que contêm o trecho"""
+        return [chaves for valor, chaves in list(self._postings.items()) if trecho in valor]
+
+
+class IndiceTelefones:
+    """Telefones só com dígitos, para achar um número sem percorrer os clientes.
+
+    Os números ficam agrupados pelos últimos `FINAL` dígitos, que bastam
+    para identificar um telefone mesmo sem o DDD ou com o código do país.
+    Um número procurado combina com um cadastrado quando um termina com o
+    outro ('999998888' e '5511999998888' combinam com '11999998888'), então
+    a busca só confere os poucos números do mesmo grupo.
+    """
+
+    FINAL = 8
+
+    def __init__(self):
+        # Últimos dígitos -> número completo -> chaves com aquele número
+        self._grupos: Dict[str, Dict[str, Set[Hashable]]] = {}
+
+    def adicionar(self, chave: Hashable, digitos: str):
+        if not digitos:
+            return
+        numeros = self._grupos.setdefault(digitos[-self.FINAL:], {})
+        chaves = numeros.get(digitos)
+        if chaves is None:
+            numeros[digitos] = {chave}
+        else:
+            chaves.add(chave)
+
+    def remover(self, chave: Hashable, digitos: str):
+        final = digitos[-self.FINAL:]
+        numeros = self._grupos.get(final)
+        chaves = numeros.get(digitos) if numeros else None
+        if chaves is not None:
+            chaves.discard(chave)
+            if not chaves:
+                del numeros[digitos]
+                if not numeros:
+                    del self._grupos[final]
+
+    def limpar(self):
+        self._grupos.clear()
+
+    @classmethod
+    def combinam(cls, digitos: str, outro: str) -> bool:
+        """Indica se os dois números são o mesmo telefone, pelo critério da busca"""
+        return (bool(digitos) and digitos[-cls.FINAL:] == outro[-cls.FINAL:]
+                and (digitos.endswith(outro) or outro.endswith(digitos)))
+
+    def buscar(self, digitos: str) -> Set[Hashable]:
+        """Chaves com o número informado, completo ou só com os últimos dígitos.
+
+        Números mais curtos que FINAL só encontram o mesmo número exato.
+        """
+        numeros = self._grupos.get(digitos[-self.FINAL:]) if digitos else None
+        if not numeros:
+            return set()
+        chaves = numeros.get(digitos)
+        if chaves is not None and len(numeros) == 1:
+            return set(chaves)
+        return set().union(*(chaves for numero, chaves in list(numeros.items())
+                             if numero.endswith(digitos) or digitos.endswith(numero)))
+
+    def repetidos(self) -> List[Set[Hashable]]:
+        """Grupos de duas ou mais chaves com o mesmo número.
+
+        Números em que um termina com o outro (com e sem DDD) contam como o
+        mesmo. Cada grupo de finais é conferido uma única vez, então o custo
+        é proporcional à quantidade de números.
+        """
+        repetidos = []
+        for numeros in list(self._grupos.values()):
+            # Do número mais longo ao mais curto: cada um entra no primeiro
+            # conjunto cujo número mais longo termina com ele
+            conjuntos: List[Tuple[str, Set[Hashable]]] = []
+            for numero in sorted(numeros, key=len, reverse=True):
+                for maior, chaves in conjuntos:
+                    if maior.endswith(numero):
+                        chaves.update(numeros[numero])
+                        break
+                else:
+                    conjuntos.append((numero, set(numeros[numero])))
+            repetidos.extend(chaves for _, chaves in conjuntos if len(chaves) > 1)
+        return repetidos
+
+
+class _NoSugestoes:
+    __slots__ = ('filhos', 'melhores')
+
+    def __init__(self):
+        self.filhos: Dict[str, '_NoSugestoes'] = {}
+        # (-frequência, chave) das chaves mais frequentes abaixo do nó, em ordem
+        self.melhores: List[Tuple[int, str]] = []
+
+
+class TrieSugestoes:
+    """Trie de textos ordenados por frequência, para sugerir ao digitar.
+
+    Cada nó guarda as `LIMITE` chaves mais frequentes que começam com o seu
+    prefixo, então uma sugestão só percorre os caracteres do prefixo, sem
+    depender da quantidade de textos. As chaves são as formas normalizadas
+    (sem acentos nem maiúsculas); de cada uma é sugerida a grafia mais usada.
+    Incluir ou remover um texto atualiza só os nós do seu caminho.
+    """
+
+    LIMITE = 10
+
+    def __init__(self):
+        self._raiz = _NoSugestoes()
+        self._frequencias: Dict[str, int] = {}
+        # Chave -> grafia -> frequência
+        self._grafias: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._frequencias)
+
+    def adicionar(self, chave: str, valor: str, quantidade: int = 1):
+        """Conta `quantidade` usos do valor, cuja forma normalizada é a chave"""
+        if chave and quantidade > 0:
+            self._alterar(chave, valor, quantidade)
+
+    def remover(self, chave: str, valor: str, quantidade: int = 1):
+        """Desfaz `quantidade` usos do valor (ver adicionar)"""
+        if chave in self._frequencias and quantidade > 0:
+            self._alterar(chave, valor, -quantidade)
+
+    def _alterar(self, chave: str, valor: str, delta: int):
+        grafias = self._grafias.setdefault(chave, {})
+        usos = grafias.get(valor, 0) + delta
+        if usos > 0:
+            grafias[valor] = usos
+        else:
+            grafias.pop(valor, None)
+        frequencia = self._frequencias.get(chave, 0) + delta
+        if frequencia > 0:
+            self._frequencias[chave] = frequencia
+        else:
+            frequencia = 0
+            self._frequencias.pop(chave, None)
+            del self._grafias[chave]
+
+        caminho = [self._raiz]
+        for caractere in chave:
+            filhos = caminho[-1].filhos
+            no = filhos.get(caractere)
+            if no is None:
+                no = filhos[caractere] = _NoSugestoes()
+            caminho.append(no)
+
+        # Do fim do caminho para a raiz, para que cada nó use os filhos já
+        # atualizados
+        for profundidade in range(len(caminho) - 1, -1, -1):
+            no = caminho[profundidade]
+            melhores = no.melhores
+            anterior = next((i for i, (_, outra) in enumerate(melhores) if outra == chave), None)
+            if delta > 0:
+                # Só a chave subiu: basta reposicioná-la
+                if anterior is not None:
+                    del melhores[anterior]
+                insort(melhores, (-frequencia, chave))
+                del melhores[self.LIMITE:]
+            elif anterior is not None:
+                # A chave desceu e outra, fora da lista, pode passar à frente
+                prefixo = chave[:profundidade]
+                candidatos = [item for filho in no.filhos.values() for item in filho.melhores]
+                if prefixo in self._frequencias:
+                    candidatos.append((-self._frequencias[prefixo], prefixo))
+                no.melhores = sorted(candidatos)[:self.LIMITE]
+            if profundidade and not no.melhores:
+                del caminho[profundidade - 1].filhos[chave[profundidade - 1]]
+
+    def sugerir(self, prefixo: str, limite: int = LIMITE) -> List[str]:
+        """Grafias dos textos mais frequentes que começam com o prefixo (normalizado)"""
+        no = self._raiz
+        for caractere in prefixo:
+            no = no.filhos.get(caractere)
+            if no is None:
+                return []
+        grafias = self._grafias
+        return [max(grafias[chave].items(), key=lambda item: item[1])[0]
+                for _, chave in no.melhores[:limite]]
+
+
+def mascaras_caracteres(padrao: str) -> Dict[str, int]:
+    """Bits das posições de cada caractere no padrão, para distancia_edicao"""
+    mascaras: Dict[str, int] = {}
+    for i, caractere in enumerate(padrao):
+        mascaras[caractere] = mascaras.get(caractere, 0) | (1 << i)
+    return mascaras
+
+
+def distancia_edicao(padrao: str, texto: str, mascaras: Dict[str, int] = None) -> int:
+    """Distância de Levenshtein pelo algoritmo bit a bit de Myers/Hyyrö.
+
+    Processa uma coluna inteira da matriz de programação dinâmica por
+    operação com inteiros, em vez de uma célula por vez. `mascaras` pode
+    ser pré-calculado com mascaras_caracteres(padrao) quando o mesmo padrão
+    é comparado com muitos textos.
+    """
+    m = len(padrao)
+    if not m:
+        return len(texto)
+    if mascaras is None:
+        mascaras = mascaras_caracteres(padrao)
+    todos = (1 << m) - 1
+    ultimo = 1 << (m - 1)
+    positivos, negativos, distancia = todos, 0, m
+    for caractere in texto:
+        iguais = mascaras.get(caractere, 0)
+        xv = iguais | negativos
+        xh = (((iguais & positivos) + positivos) ^ positivos) | iguais
+        ph = negativos | ~(xh | positivos)
+        mh = positivos & xh
+        if ph & ultimo:
+            distancia += 1
+        elif mh & ultimo:
+            distancia -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        positivos = (mh | ~(xv | ph)) & todos
+        negativos = ph & xv
+    return distancia
+
+
+class ArvoreBK:
+    """Árvore BK: encontra as chaves a até k edições de um termo.
+
+    Cada filho fica pendurado na aresta com a distância dele até o pai; pela
+    desigualdade triangular, a busca só desce pelas arestas entre d - k e
+    d + k, sem comparar o termo com todas as chaves. Cada chave guarda o
+    conjunto de valores associados; chaves que ficam sem valores continuam
+    na árvore, apenas ignoradas, até serem usadas de novo.
+    """
+
+    def __init__(self):
+        self._raiz: Optional[list] = None  # [chave, {distância: filho}]
+        self._valores: Dict[str, Set[Hashable]] = {}
+
+    def adicionar(self, chave: str, valor: Hashable):
+        valores = self._valores.get(chave)
+        if valores is not None:
+            valores.add(valor)
+            return
+        self._valores[chave] = {valor}
+
+        no = [chave, {}]
+        if self._raiz is None:
+            self._raiz = no
+            return
+        mascaras = mascaras_caracteres(chave)
+        atual = self._raiz
+        while True:
+            distancia = distancia_edicao(chave, atual[0], mascaras)
+            filho = atual[1].get(distancia)
+            if filho is None:
+                atual[1][distancia] = no
+                return
+            atual = filho
+
+    def remover(self, chave: str, valor: Hashable):
+        valores = self._valores.get(chave)
+        if valores is not None:
+            valores.discard(valor)
+
+    def buscar(self, termo: str, maximo: int) -> List[Tuple[int, str, Set[Hashable]]]:
+        """Chaves com valores a no máximo `maximo` edições: (distância, chave, valores)"""
+        if self._raiz is None:
+            return []
+        mascaras = mascaras_caracteres(termo)
+        encontrados = []
+        pendentes = [self._raiz]
+        while pendentes:
+            chave, filhos = pendentes.pop()
+            distancia = distancia_edicao(termo, chave, mascaras)
+            if distancia <= maximo and self._valores[chave]:
+                encontrados.append((distancia, chave, self._valores[chave]))
+            for aresta, filho in filhos.items():
+                if distancia - maximo <= aresta <= distancia + maximo:
+                    pendentes.append(filho)
+        return encontrados
+
+
+class IndiceSegmentos:
+    """Encontra textos a até k edições de um termo dividindo-os em segmentos.
+
+    Cada texto é dividido em `maximo` + 1 segmentos; com até k edições, pelo
+    menos `maximo` + 1 - k deles continuam intactos e aparecem no termo
+    deslocados de no máximo k posições. A busca procura esses trechos do
+    termo e só calcula a distância dos textos que tiverem segmentos
+    suficientes em comum. Para muitos textos curtos e de tamanho parecido,
+    como placas, sai bem mais barato que uma árvore BK, que acabaria
+    comparando o termo com boa parte dos textos.
+    """
+
+    def __init__(self, maximo: int = 2):
+        self.maximo = maximo
+        self._valores: Dict[str, Set[Hashable]] = {}
+        # (tamanho do texto, número do segmento, trecho) -> textos
+        self._segmentos: Dict[tuple, Set[str]] = {}
+        self._cortes: Dict[int, List[Tuple[int, int]]] = {}
+
+    def _segmentar(self, tamanho: int) -> List[Tuple[int, int]]:
+        """Início e fim de cada segmento de um texto com o tamanho dado"""
+        cortes = self._cortes.get(tamanho)
+        if cortes is None:
+            partes = self.maximo + 1
+            base, resto = divmod(tamanho, partes)
+            cortes, inicio = [], 0
+            for parte in range(partes):
+                fim = inicio + base + (parte < resto)
+                cortes.append((inicio, fim))
+                inicio = fim
+            self._cortes[tamanho] = cortes
+        return cortes
+
+    def _chaves(self, texto: str):
+        tamanho = len(texto)
+        return [(tamanho, parte, texto[inicio:fim])
+                for parte, (inicio, fim) in enumerate(self._segmentar(tamanho))]
+
+    def adicionar(self, texto: str, valor: Hashable):
+        valores = self._valores.get(texto)
+        if valores is not None:
+            valores.add(valor)
+            return
+        self._valores[texto] = {valor}
+        for chave in self._chaves(texto):
+            textos = self._segmentos.get(chave)
+            if textos is None:
+                self._segmentos[chave] = {texto}
+            else:
+                textos.add(texto)
+
+    def remover(self, texto: str, valor: Hashable):
+        valores = self._valores.get(texto)
+        if valores is None:
+            return
+        valores.discard(valor)
+        if not valores:
+            del self._valores[texto]
+            for chave in self._chaves(texto):
+                textos = self._segmentos[chave]
+                textos.discard(texto)
+                if not textos:
+                    del self._segmentos[chave]
+
+    def buscar(self, termo: str, maximo: int = None) -> List[Tuple[int, str, Set[Hashable]]]:
+        """Textos a no máximo `maximo` edições do termo: (distância, texto, valores)"""
+        maximo = self.maximo if maximo is None else min(maximo, self.maximo)
+        intactos = self.maximo + 1 - maximo
+        tamanho_termo = len(termo)
+        coincidencias: Dict[str, int] = {}
+        for tamanho in range(max(tamanho_termo - maximo, 1), tamanho_termo + maximo + 1):
+            for parte, (inicio, fim) in enumerate(self._segmentar(tamanho)):
+                encontrados: Set[str] = set()
+                for posicao in range(max(inicio - maximo, 0),
+                                     min(inicio + maximo, tamanho_termo - (fim - inicio)) + 1):
+                    textos = self._segmentos.get((tamanho, parte, termo[posicao:posicao + fim - inicio]))
+                    if textos:
+                        encontrados |= textos
+                for texto in encontrados:
+                    coincidencias[texto] = coincidencias.get(texto, 0) + 1
+
+        mascaras = mascaras_caracteres(termo)
+        resultado = []
+        for texto, quantidade in coincidencias.items():
+            if quantidade >= intactos:
+                distancia = distancia_edicao(termo, texto, mascaras)
+                if distancia <= maximo:
+                    resultado.append((distancia, texto, self._valores[texto]))
+        return resultado
+
+
+class PosicoesLista:
+    """Posição de cada chave em uma lista que cresce pelo fim e perde itens em qualquer ponto.
+
+    Cada chave recebe, ao entrar, um número de ordem maior que os anteriores,
+    guardado em um array na ordem da lista. A posição de uma chave é a do
+    seu número no array, achada por busca binária: O(log n). Remover não
+    renumera as chaves seguintes; custa apenas o deslocamento do array (um
+    memmove, como o `del` na própria lista), e não um laço em Python sobre
+    as chaves seguintes.
+    """
+
+    def __init__(self, chaves: Iterable[Hashable] = ()):
+        self._numeros = array('q')
+        self._ordem: Dict[Hashable, int] = {}
+        self._proximo = 0
+        for chave in chaves:
+            self.anexar(chave)
+
+    def anexar(self, chave: Hashable):
+        """Registra a chave no fim da lista"""
+        self._ordem[chave] = self._proximo
+        self._numeros.append(self._proximo)
+        self._proximo += 1
+
+    def substituir(self, antiga: Hashable, nova: Hashable):
+        """A nova chave passa a ocupar a posição da antiga"""
+        self._ordem[nova] = self._ordem.pop(antiga)
+
+    def retirar(self, chave: Hashable) -> int:
+        """Remove a chave; retorna a posição que ela ocupava"""
+        posicao = self[chave]
+        del self._numeros[posicao]
+        del self._ordem[chave]
+        return posicao
+
+    def __getitem__(self, chave: Hashable) -> int:
+        return bisect_left(self._numeros, self._ordem[chave])
+
+    def get(self, chave: Hashable, padrao: Optional[int] = None) -> Optional[int]:
+        numero = self._ordem.get(chave)
+        return padrao if numero is None else bisect_left(self._numeros, numero)
+
+    def __contains__(self, chave: Hashable) -> bool:
+        return chave in self._ordem
+
+    def __len__(self) -> int:
+        return len(self._ordem)
@@ -0,0 +1,167 @@
+import bisect
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class Histograma:
+    """Distribuição das latências de uma operação em faixas fixas (em ms)"""
+
+    LIMITES_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+    def __init__(self):
+        self.contagens = [0] * (len(self.LIMITES_MS) + 1)
+        self.total = 0
+        self.soma_ms = 0.0
+        self.maximo_ms = 0.0
+        self.soma_registros = 0
+        self.maximo_registros = 0
+
+    def registrar(self, duracao_ms: float, registros: int):
+        self.contagens[bisect.bisect_left(self.LIMITES_MS, duracao_ms)] += 1
+        self.total += 1
+        self.soma_ms += duracao_ms
+        self.maximo_ms = max(self.maximo_ms, duracao_ms)
+        self.soma_registros += registros
+        self.maximo_registros = max(self.maximo_registros, registros)
+
+    def percentil(self, p: float) -> float:
+        """Limite superior da faixa que contém o percentil p"""
+        alvo = p / 100 * self.total
+        acumulado = 0
+        for i, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if contagem and acumulado >= alvo:
+                return self.LIMITES_MS[i] if i < len(self.LIMITES_MS) else self.maximo_ms
+        return 0.0
+
+    def resumo(self) -> Dict:
+        return {
+            'chamadas': self.total,
+            'media_ms': self.soma_ms / self.total if self.total else 0.0,
+            'p50_ms': self.percentil(50),
+            'p95_ms': self.percentil(95),
+            'p99_ms': self.percentil(99),
+            'maximo_ms': self.maximo_ms,
+            'media_registros': self.soma_registros / self.total if self.total else 0.0,
+            'maximo_registros': self.maximo_registros,
+            'faixas_ms': dict(zip([f"<={limite}" for limite in self.LIMITES_MS] + ['>10000'],
+                                  self.contagens)),
+        }
+
+
+class Instrumentacao:
+    """Mede a duração das operações do gerenciador e da interface.
+
+    É opcional: só as operações envolvidas com `envolver` são medidas. Quando
+    uma operação passa de `limiar_perfil_ms`, a próxima chamada dela é
+    executada sob o cProfile e o perfil é gravado em `diretorio_perfis`.
+    """
+
+    def __init__(self, limiar_perfil_ms: Optional[float] = None,
+                 diretorio_perfis: str = "perfis", maximo_perfis: int = 3):
+        self.limiar_perfil_ms = limiar_perfil_ms
+        self.diretorio_perfis = diretorio_perfis
+        self.maximo_perfis = maximo_perfis
+        self.histogramas: Dict[str, Histograma] = {}
+        self.perfis_gravados: List[str] = []
+        self._trava = threading.Lock()
+        self._perfis_pendentes = set()
+        self._perfis_por_operacao: Dict[str, int] = {}
+        self._perfilando = False
+
+    def envolver(self, objeto, metodos: Iterable[str], contar: Callable[[], int] = None,
+                 prefixo: str = ''):
+        """Substitui os métodos do objeto por versões cronometradas.
+
+        `contar` informa quantos registros a operação envolveu (por exemplo o
+        total de clientes) e é chamado após cada execução.
+        """
+        for nome in metodos:
+            original = getattr(objeto, nome)
+            setattr(objeto, nome, self._cronometrado(prefixo + nome, original, contar))
+
+    def _cronometrado(self, operacao: str, funcao: Callable, contar: Optional[Callable[[], int]]):
+        @functools.wraps(funcao)
+        def cronometrado(*args, **kwargs):
+            perfil = self._iniciar_perfil(operacao)
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                duracao_ms = (time.perf_counter() - inicio) * 1000
+                if perfil is not None:
+                    perfil.disable()
+                    self._gravar_perfil(operacao, perfil, duracao_ms)
+                self.registrar(operacao, duracao_ms, contar() if contar else 0)
+        return cronometrado
+
+    def registrar(self, operacao: str, duracao_ms: float, registros: int = 0):
+        """Acrescenta uma medição ao histograma da operação"""
+        with self._trava:
+            self.histogramas.setdefault(operacao, Histograma()).registrar(duracao_ms, registros)
+            if (self.limiar_perfil_ms is not None and duracao_ms >= self.limiar_perfil_ms and
+                    self._perfis_por_operacao.get(operacao, 0) < self.maximo_perfis):
+                self._perfis_pendentes.add(operacao)
+
+    def _iniciar_perfil(self, operacao: str) -> Optional[cProfile.Profile]:
+        # Só um perfil por vez: o cProfile não aceita dois ativos ao mesmo tempo
+        with self._trava:
+            if operacao not in self._perfis_pendentes or self._perfilando:
+                return None
+            self._perfis_pendentes.discard(operacao)
+            self._perfilando = True
+        try:
+            perfil = cProfile.Profile()
+            perfil.enable()
+        except ValueError as e:
+            # Outro profiler já está ativo na thread
+            print(f"Erro ao iniciar o perfil de {operacao}: {e}")
+            with self._trava:
+                self._perfilando = False
+            return None
+        return perfil
+
+    def _gravar_perfil(self, operacao: str, perfil: cProfile.Profile, duracao_ms: float):
+        # O próximo perfil pode começar mesmo que este não seja gravado
+        caminho = None
+        try:
+            os.makedirs(self.diretorio_perfis, exist_ok=True)
+            carimbo = datetime.now().strftime("%Y%m%d-%H%M%S")
+            caminho = os.path.join(self.diretorio_perfis,
+                                   f"{operacao}-{carimbo}-{duracao_ms:.0f}ms.prof")
+            perfil.dump_stats(caminho)
+        except OSError as e:
+            print(f"Erro ao gravar o perfil de {operacao}: {e}")
+            caminho = None
+        finally:
+            with self._trava:
+                self._perfilando = False
+                if caminho is not None:
+                    self._perfis_por_operacao[operacao] = self._perfis_por_operacao.get(operacao, 0) + 1
+                    self.perfis_gravados.append(caminho)
+
+    def relatorio(self) -> Dict:
+        """Resumo de todas as operações medidas"""
+        with self._trava:
+            return {
+                'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                'operacoes': {nome: histograma.resumo()
+                              for nome, histograma in sorted(self.histogramas.items())},
+                'perfis': list(self.perfis_gravados),
+            }
+
+    def gravar(self, caminho: str):
+        """Grava o relatório em JSON"""
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(self.relatorio(), f, ensure_ascii=False, indent=2)
+
+    def limpar(self):
+        """Descarta as medições acumuladas"""
+        with self._trava:
+            self.histogramas.clear()
@@ -0,0 +1,82 @@
+import json
+import os
+from typing import Dict, List
+
+from Program.arquivos import gravar_atomicamente
+
+
+def assinatura_snapshot(tamanho: int, crc: int) -> str:
+    """Identifica o conteúdo de um snapshot pelo tamanho e CRC32"""
+    return f"{tamanho}:{crc:08x}"
+
+
+class Journal:
+    """Diário de operações gravado em modo append, uma operação por linha.
+
+    A primeira linha identifica o snapshot sobre o qual as operações devem ser
+    reaplicadas. Se o snapshot mudar (por exemplo após uma compactação), o
+    diário antigo é descartado em vez de ser aplicado duas vezes.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.total_operacoes = 0
+
+    def ler(self, assinatura_base: str) -> List[Dict]:
+        """Lê as operações válidas para o snapshot informado"""
+        if not os.path.exists(self.caminho):
+            self.iniciar(assinatura_base)
+            return []
+
+        with open(self.caminho, 'rb') as f:
+            linhas = f.read().split(b'\n')
+
+        try:
+            cabecalho = json.loads(linhas[0])
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            cabecalho = {}
+        if cabecalho.get('base') != assinatura_base:
+            self.iniciar(assinatura_base)
+            return []
+
+        # Toda operação termina com '\n'; o último pedaço sem quebra de linha
+        # é resto de uma gravação interrompida e é descartado.
+        operacoes = []
+        tamanho_valido = len(linhas[0]) + 1
+        for linha in linhas[1:-1]:
+            if linha:
+                try:
+                    operacoes.append(json.loads(linha))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+            tamanho_valido += len(linha) + 1
+
+        if tamanho_valido < os.path.getsize(self.caminho):
+            with open(self.caminho, 'r+b') as f:
+                f.truncate(tamanho_valido)
+
+        self.total_operacoes = len(operacoes)
+        return operacoes
+
+    def iniciar(self, assinatura_base: str):
+        """Cria um diário vazio associado ao snapshot informado"""
+        cabecalho = json.dumps({'base': assinatura_base}) + '\n'
+        gravar_atomicamente(self.caminho, cabecalho.encode('utf-8'))
+        self.total_operacoes = 0
+
+    def remover(self):
+        """Apaga o diário, cujas operações já estão no snapshot"""
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
+        self.total_operacoes = 0
+
+    def registrar(self, operacao: Dict):
+        """Acrescenta uma operação ao final do diário"""
+        linha = json.dumps(operacao, ensure_ascii=False) + '\n'
+        with open(self.caminho, 'ab') as f:
+            f.write(linha.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        self.total_operacoes += 1
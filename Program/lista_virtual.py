@@ -0,0 +1,294 @@
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class SequenciaIndexada(Sequence):
+    """Lista de registros que sabe a posição de cada um, para resultados que mudam aos poucos.
+
+    Os registros ficam em blocos de até 2 * TAMANHO_BLOCO, e uma árvore de
+    Fenwick guarda o tamanho dos blocos. Ler, trocar, incluir ou remover na
+    posição i custa O(log n) para achar o bloco mais o deslocamento dentro
+    dele; a posição de um registro sai do bloco em que ele está (um dict) e
+    da soma dos blocos anteriores, sem percorrer a sequência. Os registros
+    são identificados pelo próprio objeto (Cliente não define __eq__).
+    """
+
+    TAMANHO_BLOCO = 512
+
+    def __init__(self, registros: Iterable = ()):
+        registros = list(registros)
+        tamanho = self.TAMANHO_BLOCO
+        self._blocos: List[list] = [registros[i:i + tamanho]
+                                    for i in range(0, len(registros), tamanho)]
+        self._total = len(registros)
+        self._bloco_de: Dict[Any, list] = {}
+        for bloco in self._blocos:
+            self._bloco_de.update(dict.fromkeys(bloco, bloco))
+        self._reconstruir()
+
+    def _reconstruir(self):
+        """Refaz a árvore e o número de cada bloco, depois de dividir ou retirar um bloco"""
+        self._numero = {id(bloco): j for j, bloco in enumerate(self._blocos)}
+        arvore = [0] + [len(bloco) for bloco in self._blocos]
+        for k in range(1, len(arvore)):
+            pai = k + (k & -k)
+            if pai < len(arvore):
+                arvore[pai] += arvore[k]
+        self._arvore = arvore
+
+    def _somar(self, j: int, delta: int):
+        k = j + 1
+        while k < len(self._arvore):
+            self._arvore[k] += delta
+            k += k & -k
+
+    def _antes(self, j: int) -> int:
+        """Quantidade de registros nos blocos anteriores ao bloco j"""
+        total = 0
+        while j > 0:
+            total += self._arvore[j]
+            j -= j & -j
+        return total
+
+    def _achar(self, posicao: int) -> Tuple[int, int]:
+        """Bloco e posição dentro dele do registro na posição dada"""
+        j, restante = 0, posicao
+        passo = 1 << (len(self._arvore) - 1).bit_length()
+        while passo:
+            proximo = j + passo
+            if proximo < len(self._arvore) and self._arvore[proximo] <= restante:
+                j = proximo
+                restante -= self._arvore[proximo]
+            passo >>= 1
+        return j, restante
+
+    def _normalizar(self, posicao: int) -> int:
+        if posicao < 0:
+            posicao += self._total
+        if not 0 <= posicao < self._total:
+            raise IndexError(posicao)
+        return posicao
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __iter__(self):
+        return chain.from_iterable(self._blocos)
+
+    def __getitem__(self, posicao):
+        if isinstance(posicao, slice):
+            return [self[i] for i in range(*posicao.indices(self._total))]
+        j, i = self._achar(self._normalizar(posicao))
+        return self._blocos[j][i]
+
+    def __setitem__(self, posicao: int, registro):
+        j, i = self._achar(self._normalizar(posicao))
+        bloco = self._blocos[j]
+        del self._bloco_de[bloco[i]]
+        bloco[i] = registro
+        self._bloco_de[registro] = bloco
+
+    def __delitem__(self, posicao: int):
+        j, i = self._achar(self._normalizar(posicao))
+        bloco = self._blocos[j]
+        del self._bloco_de[bloco.pop(i)]
+        self._total -= 1
+        if bloco:
+            self._somar(j, -1)
+        else:
+            del self._blocos[j]
+            self._reconstruir()
+
+    def insert(self, posicao: int, registro):
+        """Inclui o registro antes da posição dada (no fim, se ela for len())"""
+        posicao = max(0, min(posicao, self._total))
+        if not self._blocos:
+            self._blocos.append([])
+            self._reconstruir()
+        if posicao == self._total:
+            j, i = len(self._blocos) - 1, len(self._blocos[-1])
+        else:
+            j, i = self._achar(posicao)
+        bloco = self._blocos[j]
+        bloco.insert(i, registro)
+        self._bloco_de[registro] = bloco
+        self._total += 1
+        if len(bloco) <= 2 * self.TAMANHO_BLOCO:
+            self._somar(j, 1)
+            return
+        # Bloco cheio: divide ao meio
+        metade = bloco[self.TAMANHO_BLOCO:]
+        del bloco[self.TAMANHO_BLOCO:]
+        self._blocos.insert(j + 1, metade)
+        self._bloco_de.update(dict.fromkeys(metade, metade))
+        self._reconstruir()
+
+    def posicao(self, registro) -> Optional[int]:
+        """Posição do registro (o mesmo objeto), ou None se não estiver na sequência"""
+        bloco = self._bloco_de.get(registro)
+        if bloco is None:
+            return None
+        return self._antes(self._numero[id(bloco)]) + bloco.index(registro)
+
+    def __contains__(self, registro) -> bool:
+        return registro in self._bloco_de
+
+
+class ListaVirtual:
+    """Exibe uma sequência de registros em um Treeview sem criar um item por registro.
+
+    Apenas as linhas que cabem na área visível existem no Treeview. A barra de
+    rolagem trabalha sobre a posição na sequência de registros e cada rolagem
+    apenas troca os valores dessas linhas, então o custo de atualizar a lista
+    depende do tamanho da janela e não da quantidade de registros. O iid de
+    cada linha é dado por `identificar(registro)`.
+
+    Ao renderizar de novo, as linhas que continuam na janela são mantidas e
+    só recebem novos valores se eles mudaram. Depois de incluir, trocar ou
+    remover um registro da sequência basta chamar renderizar(): o Treeview
+    só é alterado nas linhas afetadas.
+    """
+
+    ALTURA_CABECALHO = 28
+
+    def __init__(self, tree, scrollbar, formatar: Callable[[Any], tuple],
+                 identificar: Callable[[Any], str], altura_linha: int = 25):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.formatar = formatar
+        self.identificar = identificar
+        self.altura_linha = altura_linha
+
+        self.registros: Sequence = []
+        self.inicio = 0
+        # iid -> posição na sequência, apenas para as linhas materializadas
+        self._posicoes: Dict[str, int] = {}
+        # iids das linhas no Treeview, em ordem, e os valores exibidos em cada uma
+        self._linhas: List[str] = []
+        self._valores: Dict[str, tuple] = {}
+        self.linhas_visiveis = int(tree.cget('height'))
+        self.selecionado: Optional[Any] = None
+
+        scrollbar.configure(command=self.rolar)
+        tree.configure(yscrollcommand='')
+        tree.bind('<Configure>', self._ao_redimensionar)
+        tree.bind('<MouseWheel>', self._ao_rolar_mouse)
+        tree.bind('<Button-4>', lambda e: self.rolar('scroll', -3, 'units'))
+        tree.bind('<Button-5>', lambda e: self.rolar('scroll', 3, 'units'))
+        tree.bind('<<TreeviewSelect>>', self._ao_selecionar, add='+')
+        for tecla, passo in (('<Up>', -1), ('<Down>', 1), ('<Prior>', None), ('<Next>', None)):
+            tree.bind(tecla, lambda e, t=tecla, p=passo: self._ao_navegar(t, p))
+
+    def definir_registros(self, registros: Sequence):
+        """Troca a sequência exibida, mantendo a posição de rolagem quando possível"""
+        self.registros = registros
+        self.renderizar()
+
+    def renderizar(self):
+        """Materializa somente as linhas da janela visível, reaproveitando as que já existem"""
+        total = len(self.registros)
+        self.inicio = max(0, min(self.inicio, total - self.linhas_visiveis))
+        fim = min(total, self.inicio + self.linhas_visiveis)
+
+        janela = [self.registros[posicao] for posicao in range(self.inicio, fim)]
+        iids = [self.identificar(registro) for registro in janela]
+        na_janela = set(iids)
+        existentes = set(self._linhas)
+        ficam = [iid for iid in self._linhas if iid in na_janela]
+        if ficam != [iid for iid in iids if iid in existentes]:
+            # A ordem entre as linhas mudou (outra ordenação): recria todas
+            ficam = []
+        mantidas = set(ficam)
+        saem = [iid for iid in self._linhas if iid not in mantidas]
+        if saem:
+            self.tree.delete(*saem)
+
+        selecionado = None if self.selecionado is None else self.identificar(self.selecionado)
+        valores_anteriores = self._valores
+        self._valores = {}
+        self._posicoes = {}
+        for indice, (registro, iid) in enumerate(zip(janela, iids)):
+            valores = self.formatar(registro)
+            if iid not in mantidas:
+                # As linhas anteriores já estão no lugar, então esta entra em `indice`
+                self.tree.insert('', indice, iid=iid, values=valores)
+            elif valores_anteriores[iid] != valores:
+                self.tree.item(iid, values=valores)
+            self._valores[iid] = valores
+            self._posicoes[iid] = self.inicio + indice
+            if iid == selecionado:
+                # O registro pode ter sido trocado por uma versão editada
+                self.selecionado = registro
+                if self.tree.selection() != (iid,):
+                    self.tree.selection_set(iid)
+        self._linhas = iids
+
+        if total:
+            self.scrollbar.set(self.inicio / total, fim / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def localizar(self, registro: Any) -> Optional[int]:
+        """Posição do registro na sequência, ou None se não estiver nela.
+
+        Rápido para as linhas visíveis e para uma SequenciaIndexada; em
+        outras sequências percorre os registros.
+        """
+        posicao = self._posicoes.get(self.identificar(registro))
+        if posicao is not None and self.registros[posicao] is registro:
+            return posicao
+        if isinstance(self.registros, SequenciaIndexada):
+            return self.registros.posicao(registro)
+        try:
+            return self.registros.index(registro)
+        except ValueError:
+            return None
+
+    def registro_selecionado(self) -> Optional[Any]:
+        """Retorna o registro selecionado na lista"""
+        return self.selecionado
+
+    def rolar(self, acao: str, quantidade, unidade: str = 'units'):
+        """Trata os comandos da barra de rolagem ('moveto' e 'scroll')"""
+        if acao == 'moveto':
+            inicio = int(float(quantidade) * len(self.registros))
+        else:
+            passo = self.linhas_visiveis if unidade == 'pages' else 1
+            inicio = self.inicio + int(quantidade) * passo
+        if inicio != self.inicio:
+            self.inicio = inicio
+            self.renderizar()
+
+    def _ao_redimensionar(self, event):
+        linhas = max(1, (event.height - self.ALTURA_CABECALHO) // self.altura_linha)
+        if linhas != self.linhas_visiveis:
+            self.linhas_visiveis = linhas
+            self.renderizar()
+
+    def _ao_rolar_mouse(self, event):
+        self.rolar('scroll', -3 if event.delta > 0 else 3, 'units')
+
+    def _ao_selecionar(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._posicoes:
+            self.selecionado = self.registros[self._posicoes[selection[0]]]
+
+    def _ao_navegar(self, tecla: str, passo: Optional[int]):
+        """Move a seleção pela sequência, rolando a janela quando necessário"""
+        if not self.registros:
+            return "break"
+        selection = self.tree.selection()
+        atual = self._posicoes.get(selection[0], self.inicio - 1) if selection else self.inicio - 1
+        if passo is None:
+            passo = -self.linhas_visiveis if tecla == '<Prior>' else self.linhas_visiveis
+        destino = max(0, min(len(self.registros) - 1, atual + passo))
+
+        if destino < self.inicio:
+            self.inicio = destino
+        elif destino >= self.inicio + self.linhas_visiveis:
+            self.inicio = destino - self.linhas_visiveis + 1
+        self.selecionado = self.registros[destino]
+        # renderizar() seleciona a linha e dispara <<TreeviewSelect>>
+        self.renderizar()
+        self.tree.focus(self.identificar(self.selecionado))
+        return "break"
@@ -0,0 +1,162 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from datetime import date
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple
+
+from Program.texto import apenas_digitos, normalizar, normalizar_repetido
+
+
+@lru_cache(maxsize=4096)
+def ordinal_data(data: str) -> int:
+    """Converte 'DD/MM/AAAA' em um número que ordena as datas corretamente.
+
+    Datas inválidas ficam antes de todas as outras.
+    """
+    try:
+        dia, mes, ano = data.split('/')
+        return date(int(ano), int(mes), int(dia)).toordinal()
+    except ValueError:
+        return 0
+
+
+# Campo -> função que calcula a chave de ordenação a partir do valor
+CHAVES_ORDENACAO: Dict[str, Callable[[str], Any]] = {
+    'nome': normalizar,
+    'data_entrada': ordinal_data,
+    'telefone': apenas_digitos,
+    'cidade': normalizar_repetido,
+    'placa': str,
+    'cor': normalizar_repetido,
+    'modelo': normalizar_repetido,
+    'servico': normalizar_repetido,
+}
+
+
+def chave_ordenacao(campo: str) -> Callable[[Any], Any]:
+    """Função que calcula a chave de um cliente para o campo informado"""
+    converter = CHAVES_ORDENACAO[campo]
+    return lambda cliente: converter(getattr(cliente, campo))
+
+
+def posicao_na_ordem(clientes: Sequence, cliente, campo: str, decrescente: bool = False) -> int:
+    """Onde o cliente entra em uma lista já ordenada pelo campo (busca binária).
+
+    Na ordem crescente ele fica depois dos clientes com a mesma chave; na
+    decrescente, antes deles, como na lista invertida.
+    """
+    chave = chave_ordenacao(campo)
+    alvo = chave(cliente)
+    inicio, fim = 0, len(clientes)
+    while inicio < fim:
+        meio = (inicio + fim) // 2
+        atual = chave(clientes[meio])
+        if (atual > alvo) if decrescente else (atual <= alvo):
+            inicio = meio + 1
+        else:
+            fim = meio
+    return inicio
+
+
+class OrdemCampo:
+    """Clientes mantidos em ordem por um campo.
+
+    A chave de cada cliente é calculada uma única vez, quando ele entra na
+    ordem, e fica em uma lista paralela à dos clientes. Clientes com a mesma
+    chave ficam na ordem em que entraram. Inclusões ficam pendentes e são
+    incorporadas de uma vez no próximo acesso: poucas por inserção binária,
+    muitas (como no carregamento) com uma única ordenação estável, que
+    aproveita a parte já ordenada.
+    """
+
+    def __init__(self, campo: str, clientes=()):
+        self.campo = campo
+        self._chave = chave_ordenacao(campo)
+        self._chaves: List = []
+        self._clientes: List = []
+        self._novos: Dict[Any, None] = dict.fromkeys(clientes)
+
+    def adicionar(self, cliente):
+        self._novos[cliente] = None
+
+    def remover(self, cliente):
+        if cliente in self._novos:
+            del self._novos[cliente]
+            return
+        chave = self._chave(cliente)
+        inicio = bisect_left(self._chaves, chave)
+        fim = bisect_right(self._chaves, chave, inicio)
+        try:
+            # list.index compara por identidade, pois Cliente não define __eq__
+            i = self._clientes.index(cliente, inicio, fim)
+        except ValueError:
+            return
+        del self._chaves[i]
+        del self._clientes[i]
+
+    def _incorporar(self):
+        novos = list(self._novos)
+        self._novos = {}
+        if len(novos) <= 8:
+            for cliente in novos:
+                chave = self._chave(cliente)
+                i = bisect_right(self._chaves, chave)
+                self._chaves.insert(i, chave)
+                self._clientes.insert(i, cliente)
+            return
+        # Ordena índices em vez de tuplas (chave, cliente): evita criar um
+        # objeto rastreado pelo coletor de lixo por cliente
+        chaves = self._chaves + [self._chave(cliente) for cliente in novos]
+        clientes = self._clientes + novos
+        ordem = sorted(range(len(chaves)), key=chaves.__getitem__)
+        self._chaves = [chaves[i] for i in ordem]
+        self._clientes = [clientes[i] for i in ordem]
+
+    def __len__(self) -> int:
+        return len(self._clientes) + len(self._novos)
+
+    def clientes(self) -> List:
+        """Clientes em ordem"""
+        if self._novos:
+            self._incorporar()
+        return self._clientes
+
+    def cliente(self, posicao: int):
+        return self.clientes()[posicao]
+
+    def faixa(self, minimo, maximo) -> Tuple[int, int]:
+        """Posições [início, fim) dos clientes com chave entre minimo e maximo"""
+        self.clientes()  # incorpora as inclusões pendentes
+        inicio = bisect_left(self._chaves, minimo)
+        return inicio, bisect_right(self._chaves, maximo, inicio)
+
+
+class VisaoOrdenada(Sequence):
+    """Sequência de clientes na ordem de um campo, crescente ou decrescente.
+
+    Não copia nada: lê direto da OrdemCampo, então continua válida depois
+    de inclusões e exclusões.
+    """
+
+    def __init__(self, ordem: OrdemCampo, decrescente: bool = False):
+        self.ordem = ordem
+        self.decrescente = decrescente
+
+    def __len__(self) -> int:
+        return len(self.ordem)
+
+    def __getitem__(self, posicao):
+        if isinstance(posicao, slice):
+            return [self[i] for i in range(*posicao.indices(len(self)))]
+        total = len(self.ordem)
+        if posicao < 0:
+            posicao += total
+        if not 0 <= posicao < total:
+            raise IndexError(posicao)
+        if self.decrescente:
+            posicao = total - 1 - posicao
+        return self.ordem.cliente(posicao)
+
+    def __iter__(self):
+        clientes = self.ordem.clientes()
+        return reversed(clientes) if self.decrescente else iter(clientes)
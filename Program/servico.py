@@ -0,0 +1,336 @@
+"""Serviço HTTP/JSON com as operações de clientes, sem interface gráfica.
+
+Permite que outros aparelhos (tablets nos boxes, outras estações) usem o
+mesmo cadastro em memória. Usa apenas a biblioteca padrão.
+
+Uso: python -m Program.servico [--dados clientes.json] [--porta 8080]
+
+    GET    /clientes?busca=termo&inicio=0&limite=100
+    GET    /clientes?consulta=cidade:Campinas servico:Freios (ver Program.consulta)
+    GET    /clientes/<id>
+    GET    /clientes/placa/<placa>
+    GET    /clientes/telefone/<numero>  (todos os veículos do número)
+    POST   /clientes            (corpo: campos do cliente em JSON)
+    PUT    /clientes/<id>
+    DELETE /clientes/<id>
+    GET    /estatisticas
+"""
+import argparse
+import json
+import signal
+import socket
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from Program.armazenamento import ArmazenamentoClientes, criar_gerenciador
+from Program.cliente import Cliente
+from Program.validacao import formatar_telefone, validar_dados
+
+
+class TravaLeituraEscrita:
+    """Permite várias leituras simultâneas ou uma única escrita.
+
+    Escritores esperando têm preferência sobre novos leitores, para que uma
+    sequência contínua de buscas não impeça as alterações.
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._leitores = 0
+        self._escrevendo = False
+        self._escritores_esperando = 0
+
+    @contextmanager
+    def leitura(self):
+        with self._condicao:
+            while self._escrevendo or self._escritores_esperando:
+                self._condicao.wait()
+            self._leitores += 1
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._leitores -= 1
+                if not self._leitores:
+                    self._condicao.notify_all()
+
+    @contextmanager
+    def escrita(self):
+        with self._condicao:
+            self._escritores_esperando += 1
+            while self._escrevendo or self._leitores:
+                self._condicao.wait()
+            self._escritores_esperando -= 1
+            self._escrevendo = True
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._escrevendo = False
+                self._condicao.notify_all()
+
+
+class ManipuladorClientes(BaseHTTPRequestHandler):
+    """Atende as requisições de uma conexão; HTTP/1.1 mantém a conexão aberta"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'AutoMaster'
+    # Libera o trabalhador de uma conexão ociosa
+    timeout = 30
+    # Cabeçalho e corpo saem em escritas separadas; sem isso o Nagle somado
+    # ao ACK atrasado do cliente acrescenta ~40 ms a cada resposta
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._despachar('GET')
+
+    def do_POST(self):
+        self._despachar('POST')
+
+    def do_PUT(self):
+        self._despachar('PUT')
+
+    def do_DELETE(self):
+        self._despachar('DELETE')
+
+    def _despachar(self, metodo: str):
+        url = urlsplit(self.path)
+        partes = [unquote(parte) for parte in url.path.strip('/').split('/')]
+        consulta = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+        servidor: ServidorClientes = self.server
+        try:
+            if partes == ['estatisticas'] and metodo == 'GET':
+                with servidor.trava.leitura():
+                    self._responder(200, {'total': servidor.gerenciador.total_clientes()})
+            elif partes == ['clientes'] and metodo == 'GET':
+                self._listar(consulta)
+            elif partes == ['clientes'] and metodo == 'POST':
+                self._adicionar()
+            elif len(partes) == 3 and partes[:2] == ['clientes', 'placa'] and metodo == 'GET':
+                with servidor.trava.leitura():
+                    cliente = servidor.gerenciador.obter_por_placa(partes[2])
+                self._responder_cliente(cliente)
+            elif len(partes) == 3 and partes[:2] == ['clientes', 'telefone'] and metodo == 'GET':
+                with servidor.trava.leitura():
+                    encontrados = servidor.gerenciador.buscar_telefone(partes[2])
+                    clientes = [cliente.to_dict() for _, cliente in encontrados]
+                self._responder(200, {'total': len(clientes), 'clientes': clientes})
+            elif len(partes) == 2 and partes[0] == 'clientes':
+                if metodo == 'GET':
+                    with servidor.trava.leitura():
+                        cliente = servidor.gerenciador.obter_por_id(partes[1])
+                    self._responder_cliente(cliente)
+                elif metodo == 'PUT':
+                    self._editar(partes[1])
+                elif metodo == 'DELETE':
+                    with servidor.trava.escrita():
+                        removido = servidor.gerenciador.remover_cliente_por_id(partes[1])
+                    self._responder(204 if removido else 404,
+                                    None if removido else {'erro': "Cliente não encontrado"})
+                else:
+                    self._responder(405, {'erro': "Método não permitido"})
+            else:
+                self._responder(404, {'erro': "Recurso não encontrado"})
+        except ValueError as e:
+            self._responder(400, {'erro': str(e)})
+        except ConnectionError:
+            raise  # O cliente desconectou; não há a quem responder
+        except Exception:
+            # Registra o erro (com o traceback) e responde, em vez de fechar
+            # a conexão sem resposta
+            servidor.handle_error(self.request, self.client_address)
+            self.close_connection = True
+            self._responder(500, {'erro': "Erro interno do servidor"})
+
+    def _listar(self, consulta: Dict[str, str]):
+        inicio = int(consulta.get('inicio', 0))
+        limite = int(consulta.get('limite', 100))
+        if inicio < 0 or limite < 0:
+            raise ValueError("inicio e limite não podem ser negativos")
+        termo = consulta.get('busca', '')
+        gerenciador = self.server.gerenciador
+        with self.server.trava.leitura():
+            # Monta só a página pedida
+            if 'consulta' in consulta:
+                resultados = gerenciador.consultar(consulta['consulta'])
+                total, pagina = len(resultados), resultados[inicio:inicio + limite]
+            elif termo:
+                total = gerenciador.contar_busca(termo)
+                pagina = gerenciador.buscar_pagina(termo, inicio, limite)
+            else:
+                total = gerenciador.total_clientes()
+                pagina = gerenciador.pagina_clientes(inicio, limite)
+            pagina = [cliente.to_dict() for _, cliente in pagina]
+        self._responder(200, {'total': total, 'clientes': pagina})
+
+    def _adicionar(self):
+        cliente = self._ler_cliente()
+        if cliente is None:
+            return
+        with self.server.trava.escrita():
+            adicionado = self.server.gerenciador.adicionar_cliente(cliente)
+        if adicionado:
+            self._responder(201, cliente.to_dict())
+        else:
+            self._responder(409, {'erro': "Já existe um cliente com esta placa"})
+
+    def _editar(self, id_cliente: str):
+        cliente = self._ler_cliente()
+        if cliente is None:
+            return
+        gerenciador = self.server.gerenciador
+        with self.server.trava.escrita():
+            if gerenciador.obter_por_id(id_cliente) is None:
+                self._responder(404, {'erro': "Cliente não encontrado"})
+                return
+            editado = gerenciador.editar_cliente_por_id(id_cliente, cliente)
+            cliente = gerenciador.obter_por_id(id_cliente)
+        if editado:
+            self._responder(200, cliente.to_dict())
+        else:
+            self._responder(409, {'erro': "Já existe um cliente com esta placa"})
+
+    def _ler_cliente(self) -> Optional[Cliente]:
+        """Lê e valida o cliente do corpo; responde 400 se for inválido"""
+        tamanho = int(self.headers.get('Content-Length', 0))
+        try:
+            dados = json.loads(self.rfile.read(tamanho).decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self._responder(400, {'erro': "Corpo JSON inválido"})
+            return None
+        if not isinstance(dados, dict):
+            self._responder(400, {'erro': "Esperado um objeto JSON"})
+            return None
+
+        dados = {campo: str(valor or '').strip() for campo, valor in dados.items()}
+        erros = validar_dados(dados)
+        if erros:
+            self._responder(400, {'erro': "Dados inválidos", 'detalhes': erros})
+            return None
+        return Cliente(
+            nome=dados['nome'],
+            telefone=formatar_telefone(dados['telefone']),
+            cidade=dados['cidade'],
+            placa=dados['placa'],
+            cor=dados.get('cor', ''),
+            modelo=dados['modelo'],
+            servico=dados['servico'],
+            data_entrada=dados.get('data_entrada') or None
+        )
+
+    def _responder_cliente(self, cliente: Optional[Cliente]):
+        if cliente is None:
+            self._responder(404, {'erro': "Cliente não encontrado"})
+        else:
+            self._responder(200, cliente.to_dict())
+
+    def _responder(self, status: int, dados=None):
+        corpo = b'' if dados is None else json.dumps(dados, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        if corpo:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        if self.server.registrar_requisicoes:
+            super().log_message(formato, *args)
+
+
+class ServidorClientes(HTTPServer):
+    """Servidor HTTP que atende as conexões em um conjunto fixo de threads.
+
+    Cada conexão ocupa um trabalhador enquanto estiver aberta, então
+    `trabalhadores` deve ser pelo menos o número de clientes simultâneos.
+    Buscas e consultas rodam em paralelo; alterações são exclusivas.
+    """
+
+    def __init__(self, endereco, gerenciador: ArmazenamentoClientes, trabalhadores: int = 16,
+                 intervalo_sincronizacao: float = 2.0, registrar_requisicoes: bool = False):
+        super().__init__(endereco, ManipuladorClientes)
+        self.gerenciador = gerenciador
+        self.trava = TravaLeituraEscrita()
+        self.registrar_requisicoes = registrar_requisicoes
+        self._trabalhadores = ThreadPoolExecutor(trabalhadores, thread_name_prefix='servico')
+        self._conexoes = set()
+        self._trava_conexoes = threading.Lock()
+        self._parar = threading.Event()
+        self._sincronizador = threading.Thread(
+            target=self._sincronizar, args=(intervalo_sincronizacao,), daemon=True)
+        self._sincronizador.start()
+
+    def process_request(self, request, client_address):
+        self._trabalhadores.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        with self._trava_conexoes:
+            self._conexoes.add(request)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._trava_conexoes:
+                self._conexoes.discard(request)
+            self.shutdown_request(request)
+
+    def _sincronizar(self, intervalo: float):
+        """Traz as alterações que outras estações gravaram no arquivo"""
+        while not self._parar.wait(intervalo):
+            with self.trava.escrita():
+                self.gerenciador.sincronizar()
+
+    def server_close(self):
+        self._parar.set()
+        super().server_close()
+        # Encerra as conexões mantidas abertas para não esperar o timeout
+        with self._trava_conexoes:
+            for conexao in self._conexoes:
+                try:
+                    conexao.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        self._trabalhadores.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON de clientes")
+    parser.add_argument("--dados", default="clientes.json",
+                        help="arquivo de dados do sistema (.json ou .db)")
+    parser.add_argument("--endereco", default="127.0.0.1",
+                        help="endereço de escuta (0.0.0.0 para aceitar outros aparelhos)")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--trabalhadores", type=int, default=16,
+                        help="conexões atendidas ao mesmo tempo")
+    parser.add_argument("--log", action="store_true", help="mostra cada requisição")
+    parser.add_argument("--arquivar-apos-dias", type=int, default=0,
+                        help="move para o histórico as entradas mais antigas (0 desativa)")
+    args = parser.parse_args()
+
+    opcoes = {'gravacao_adiada': True}
+    if args.arquivar_apos_dias:
+        opcoes['idade_arquivamento'] = args.arquivar_apos_dias
+    gerenciador = criar_gerenciador(args.dados, **opcoes)
+    servidor = ServidorClientes((args.endereco, args.porta), gerenciador,
+                                args.trabalhadores, registrar_requisicoes=args.log)
+    # Encerra gravando as alterações pendentes também ao receber SIGTERM
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Atendendo em http://{args.endereco}:{servidor.server_port} "
+          f"({gerenciador.total_clientes()} clientes)", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        gerenciador.fechar()
+
+
+if __name__ == "__main__":
+    main()
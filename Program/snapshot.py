@@ -0,0 +1,142 @@
+"""Formato binário do arquivo de dados, mais compacto e rápido de abrir que o JSON.
+
+Layout (inteiros little-endian):
+
+    cabeçalho   mágico b'AMCB', versão (u16), campos por registro (u16),
+                separador (u8), registros (u32), textos (u32),
+                bytes da tabela de textos (u32), CRC32 do restante (u32)
+    tabela      todos os textos distintos em UTF-8, separados pelo caractere
+                `separador`; os primeiros são os nomes dos campos
+    registros   para cada registro, um u32 por campo com a posição do valor
+                na tabela
+
+Valores repetidos (cidade, serviço, modelo, cor, data) aparecem uma única
+vez na tabela. Como todo registro tem o mesmo tamanho, declarado no
+cabeçalho, a leitura decodifica a tabela de uma vez e monta cada campo como
+uma coluna, sem um laço em Python por registro. O separador é um caractere
+de controle que não aparece em nenhum valor, escolhido na gravação.
+
+Uso: python -m Program.snapshot clientes.json clientes.bin (ou o contrário)
+"""
+import sys
+import zlib
+from array import array
+from struct import Struct
+from typing import Dict, Iterable, List, Sequence
+
+MAGICO = b'AMCB'
+VERSAO = 1
+
+_CABECALHO = Struct('<4sHHBIIII')
+# Posições na tabela sempre com 4 bytes, em little-endian no arquivo
+_TIPO_POSICAO = 'I' if array('I').itemsize == 4 else 'L'
+_INVERTER_BYTES = sys.byteorder == 'big'
+
+
+def eh_snapshot(conteudo: bytes) -> bool:
+    """Indica se o conteúdo está no formato binário"""
+    return conteudo[:len(MAGICO)] == MAGICO
+
+
+def codificar_snapshot(campos: Sequence[str], registros: Iterable[Sequence[str]]) -> bytes:
+    """Gera o snapshot de registros com os valores na ordem de `campos`"""
+    tabela: Dict[str, int] = {campo: i for i, campo in enumerate(campos)}
+    if len(tabela) != len(campos):
+        raise ValueError("Campos repetidos")
+    posicoes = array(_TIPO_POSICAO)
+    quantidade = 0
+    for registro in registros:
+        for valor in registro:
+            posicao = tabela.get(valor)
+            if posicao is None:
+                posicao = tabela[valor] = len(tabela)
+            posicoes.append(posicao)
+        quantidade += 1
+    if len(posicoes) != quantidade * len(campos):
+        raise ValueError("Registro com número de campos diferente dos campos")
+
+    textos = list(tabela)
+    separador = _escolher_separador(textos)
+    dados_tabela = separador.join(textos).encode('utf-8')
+    if _INVERTER_BYTES:
+        posicoes.byteswap()
+    corpo = dados_tabela + posicoes.tobytes()
+    cabecalho = _CABECALHO.pack(MAGICO, VERSAO, len(campos), ord(separador), quantidade,
+                                len(textos), len(dados_tabela), zlib.crc32(corpo))
+    return cabecalho + corpo
+
+
+def _escolher_separador(textos: List[str]) -> str:
+    """Primeiro caractere de controle que não aparece em nenhum texto"""
+    for codigo in range(32):
+        separador = chr(codigo)
+        if not any(separador in texto for texto in textos):
+            return separador
+    raise ValueError("Os valores usam todos os caracteres de controle")
+
+
+def decodificar_snapshot(conteudo: bytes, internar: Iterable[str] = ()) -> Dict[str, list]:
+    """Valores de cada campo, na ordem dos registros.
+
+    Os textos dos campos em `internar` passam por sys.intern, como os
+    campos repetidos do Cliente. Levanta ValueError se o conteúdo não for
+    um snapshot, for de uma versão mais nova ou estiver corrompido.
+    """
+    if len(conteudo) < _CABECALHO.size or not eh_snapshot(conteudo):
+        raise ValueError("O arquivo não é um snapshot binário")
+    (_, versao, total_campos, separador, quantidade, total_textos,
+     tamanho_tabela, crc) = _CABECALHO.unpack_from(conteudo)
+    if versao > VERSAO:
+        raise ValueError(f"Snapshot da versão {versao}, mais nova que a suportada ({VERSAO})")
+    corpo = memoryview(conteudo)[_CABECALHO.size:]
+    if (len(corpo) != tamanho_tabela + 4 * quantidade * total_campos
+            or zlib.crc32(corpo) != crc):
+        raise ValueError("Snapshot corrompido (tamanho ou CRC32 não conferem)")
+
+    textos = str(corpo[:tamanho_tabela], 'utf-8').split(chr(separador))
+    if len(textos) != total_textos or total_textos < total_campos:
+        raise ValueError("Snapshot corrompido (tabela de textos)")
+    posicoes = array(_TIPO_POSICAO)
+    posicoes.frombytes(corpo[tamanho_tabela:])
+    if _INVERTER_BYTES:
+        posicoes.byteswap()
+    if quantidade and max(posicoes) >= total_textos:
+        raise ValueError("Snapshot corrompido (posição fora da tabela)")
+
+    campos = textos[:total_campos]
+    for campo in internar:
+        if campo in campos:
+            # Só os valores distintos do campo, não um por registro
+            for posicao in set(posicoes[campos.index(campo)::total_campos]):
+                textos[posicao] = sys.intern(textos[posicao])
+    valor = textos.__getitem__
+    return {campo: list(map(valor, posicoes[i::total_campos])) for i, campo in enumerate(campos)}
+
+
+def converter_arquivo(origem: str, destino: str) -> int:
+    """Grava os clientes da origem (JSON ou binário) no destino, no formato da sua extensão.
+
+    Retorna quantos clientes foram gravados.
+    """
+    from Program.arquivos import gravar_atomicamente
+    from Program.cliente import clientes_do_arquivo, formato_do_arquivo, serializar_clientes
+    with open(origem, 'rb') as f:
+        conteudo = f.read()
+    clientes, _ = clientes_do_arquivo(conteudo)
+    gravar_atomicamente(destino, serializar_clientes(clientes, formato_do_arquivo(destino)))
+    return len(clientes)
+
+
+def main():
+    """Converte o arquivo de dados entre JSON e o formato binário"""
+    if len(sys.argv) != 3:
+        print("Uso: python -m Program.snapshot clientes.json clientes.bin (ou o contrário)")
+        sys.exit(1)
+
+    origem, destino = sys.argv[1:]
+    total = converter_arquivo(origem, destino)
+    print(f"{total} clientes gravados em {destino}")
+
+
+if __name__ == "__main__":
+    main()
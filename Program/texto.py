@@ -0,0 +1,50 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Optional
+
+
+def remover_acentos(texto: str) -> str:
+    """Remove acentos e cedilha: 'São João' -> 'Sao Joao'"""
+    if texto.isascii():
+        return texto
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def normalizar(texto: str) -> str:
+    """Forma usada para comparar textos sem diferenciar acentos e maiúsculas"""
+    return remover_acentos(texto).casefold()
+
+
+# Campos com poucos valores distintos (cidade, cor, modelo...) repetem as
+# mesmas strings; o cache evita normalizá-las de novo a cada cliente
+normalizar_repetido = lru_cache(maxsize=4096)(normalizar)
+
+
+def apenas_digitos(texto: str) -> str:
+    """Mantém só os dígitos: '(11) 99999-8888' -> '11999998888'"""
+    return ''.join(filter(str.isdigit, texto))
+
+
+# Dígitos e a pontuação das máscaras de telefone, com ao menos um dígito
+_TERMO_TELEFONE = re.compile(r'[\d\s()+.-]*\d[\d\s()+.-]*')
+
+
+def digitos_telefone(termo: str) -> Optional[str]:
+    """Dígitos de um termo que pode ser (parte de) um telefone: '(11) 9999' -> '119999'.
+
+    Retorna None se o termo tiver letras ou outros sinais, ou nenhum dígito.
+    """
+    if _TERMO_TELEFONE.fullmatch(termo):
+        return apenas_digitos(termo)
+    return None
+
+
+# Na placa, O e 0 e I e 1 são confundidos com frequência
+_TROCAS_PLACA = str.maketrans('oi', '01')
+
+
+def normalizar_placa(texto: str) -> str:
+    """Forma normalizada de uma placa (ou de um termo buscado em placas)"""
+    return normalizar(texto).translate(_TROCAS_PLACA)
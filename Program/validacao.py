@@ -0,0 +1,42 @@
+import re
+from typing import Dict, List
+
+CAMPOS_OBRIGATORIOS = ['nome', 'telefone', 'cidade', 'placa', 'modelo', 'servico']
+
+
+def validar_dados(dados: Dict[str, str]) -> List[str]:
+    """Valida os campos de um cliente; usado pelo formulário e pela importação"""
+    erros = []
+
+    for campo in CAMPOS_OBRIGATORIOS:
+        if not (dados.get(campo) or '').strip():
+            erros.append(f"O campo {campo.replace('_', ' ').title()} é obrigatório")
+
+    data = (dados.get('data_entrada') or '').strip()
+    if data and not re.match(r'\d{2}/\d{2}/\d{4}', data):
+        erros.append("Data deve estar no formato DD/MM/AAAA")
+
+    placa = (dados.get('placa') or '').strip().upper()
+    if placa and not re.match(r'^[A-Z]{3}[0-9][A-Z0-9][0-9]{2}$', placa):
+        erros.append("Placa deve estar no formato ABC1234 ou ABC1D23")
+
+    telefone = (dados.get('telefone') or '').strip()
+    # Remove formatação para validar
+    telefone_limpo = telefone.replace('(', '').replace(')', '').replace(' ', '').replace('-', '')
+    if telefone_limpo and not re.match(r'^\d{10,11}$', telefone_limpo):
+        erros.append("Telefone deve ter 10 ou 11 dígitos (com DDD)")
+
+    return erros
+
+
+def formatar_telefone(texto: str) -> str:
+    """Formata os dígitos do telefone como (11) 99999-9999"""
+    texto = ''.join(filter(str.isdigit, texto))[:11]
+
+    if len(texto) == 0:
+        return ''
+    if len(texto) <= 2:
+        return f"({texto}"
+    if len(texto) <= 7:
+        return f"({texto[:2]}) {texto[2:]}"
+    return f"({texto[:2]}) {texto[2:7]}-{texto[7:]}"
@@ -0,0 +1,203 @@
+"""Teste de carga do serviço HTTP (Program.servico) em localhost.
+
+Sobe o serviço em outro processo com uma base sintética (ou usa um serviço
+já em execução com --url), abre conexões keep-alive em várias threads e
+mede requisições por segundo e latência por tipo de operação.
+
+Uso:
+    python -m benchmarks.carga_http --clientes 100000 --conexoes 8 --duracao 10
+    python -m benchmarks.carga_http --url http://127.0.0.1:8080 --saida carga.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import quote, urlsplit
+
+from benchmarks.executar import metadados, percentil
+from benchmarks.gerador import gerar_clientes, gravar_json
+
+# Resposta esperada de cada operação; 409 é uma placa repetida, não uma falha
+STATUS_ESPERADOS = {
+    'busca': {200}, 'consulta': {200}, 'inclusao': {201, 409}, 'exclusao': {204, 404},
+}
+
+
+def iniciar_servico(clientes: int, trabalhadores: int, diretorio: str):
+    """Sobe o serviço com uma base sintética e retorna (processo, url)"""
+    arquivo = os.path.join(diretorio, 'clientes.json')
+    gravar_json(arquivo, clientes)
+    processo = subprocess.Popen(
+        [sys.executable, '-m', 'Program.servico', '--dados', arquivo, '--porta', '0',
+         '--trabalhadores', str(trabalhadores)],
+        stdout=subprocess.PIPE, text=True)
+    linha = processo.stdout.readline()
+    if not linha.startswith('Atendendo em '):
+        processo.kill()
+        raise RuntimeError(f"O serviço não iniciou: {linha!r}")
+    return processo, linha.split()[2]
+
+
+class Trabalhador(threading.Thread):
+    """Envia requisições por uma conexão keep-alive até o fim do teste"""
+
+    def __init__(self, url: str, fim: float, mistura: Dict[str, int], termos: List[str],
+                 ids: List[str], semente: int):
+        super().__init__(daemon=True)
+        endereco = urlsplit(url)
+        self.conexao = http.client.HTTPConnection(endereco.hostname, endereco.port, timeout=30)
+        self.fim = fim
+        self.mistura = mistura
+        self.termos = termos
+        self.ids = ids
+        self.aleatorio = random.Random(semente)
+        self.novos = gerar_clientes(10 ** 6, semente=semente + 1000)
+        self.criados: List[str] = []
+        self.latencias: Dict[str, List[float]] = {operacao: [] for operacao in mistura}
+        self.erros = 0
+
+    def run(self):
+        operacoes = list(self.mistura)
+        pesos = list(self.mistura.values())
+        while time.perf_counter() < self.fim:
+            operacao = self.aleatorio.choices(operacoes, pesos)[0]
+            metodo, caminho, corpo = self._requisicao(operacao)
+            inicio = time.perf_counter()
+            try:
+                self.conexao.request(metodo, caminho, body=corpo,
+                                     headers={'Content-Type': 'application/json'})
+                resposta = self.conexao.getresponse()
+                dados = resposta.read()
+            except (OSError, http.client.HTTPException):
+                self.erros += 1
+                self.conexao.close()
+                continue
+            self.latencias[operacao].append(time.perf_counter() - inicio)
+            if resposta.status not in STATUS_ESPERADOS[operacao]:
+                self.erros += 1
+            elif operacao == 'inclusao' and resposta.status == 201:
+                self.criados.append(json.loads(dados)['id'])
+        self.conexao.close()
+
+    def _requisicao(self, operacao: str):
+        if operacao == 'busca':
+            termo = quote(self.aleatorio.choice(self.termos))
+            return 'GET', f'/clientes?busca={termo}&limite=50', None
+        if operacao == 'consulta':
+            return 'GET', f'/clientes/{self.aleatorio.choice(self.ids)}', None
+        if operacao == 'inclusao':
+            dados = next(self.novos).to_dict()
+            del dados['id']
+            return 'POST', '/clientes', json.dumps(dados).encode('utf-8')
+        # Exclui os próprios clientes incluídos, para a base não crescer
+        id_cliente = self.criados.pop() if self.criados else 'inexistente'
+        return 'DELETE', f'/clientes/{id_cliente}', None
+
+
+def amostrar(url: str, quantidade: int, semente: int):
+    """Busca clientes do serviço para montar termos de busca e ids"""
+    endereco = urlsplit(url)
+    conexao = http.client.HTTPConnection(endereco.hostname, endereco.port)
+    conexao.request('GET', f'/clientes?limite={quantidade}')
+    clientes = json.loads(conexao.getresponse().read())['clientes']
+    conexao.close()
+    if not clientes:
+        raise RuntimeError("O serviço não tem clientes para o teste")
+
+    aleatorio = random.Random(semente)
+    termos = []
+    for cliente in clientes:
+        campo = aleatorio.choice((cliente['nome'], cliente['placa'], cliente['telefone']))
+        tamanho = aleatorio.choice((3, 4, 5, 7))
+        inicio = aleatorio.randint(0, max(0, len(campo) - tamanho))
+        termos.append(campo[inicio:inicio + tamanho])
+    return termos, [cliente['id'] for cliente in clientes]
+
+
+def resumir(latencias: List[float], duracao: float) -> Dict:
+    if not latencias:
+        return {'requisicoes': 0}
+    return {
+        'requisicoes': len(latencias),
+        'requisicoes_por_s': len(latencias) / duracao,
+        'p50_ms': percentil(latencias, 50) * 1000,
+        'p95_ms': percentil(latencias, 95) * 1000,
+        'p99_ms': percentil(latencias, 99) * 1000,
+        'max_ms': max(latencias) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço HTTP")
+    parser.add_argument('--url', help="serviço já em execução (senão sobe um local)")
+    parser.add_argument('--clientes', type=int, default=100000,
+                        help="tamanho da base sintética do serviço local")
+    parser.add_argument('--conexoes', type=int, default=8, help="conexões simultâneas")
+    parser.add_argument('--duracao', type=float, default=10, help="duração em segundos")
+    parser.add_argument('--mistura', default='busca=70,consulta=20,inclusao=5,exclusao=5',
+                        help="peso de cada operação")
+    parser.add_argument('--saida', help="grava os resultados neste arquivo JSON")
+    args = parser.parse_args()
+
+    mistura = {nome: int(peso) for nome, peso in
+               (item.split('=') for item in args.mistura.split(','))}
+    desconhecidas = set(mistura) - set(STATUS_ESPERADOS)
+    if desconhecidas:
+        parser.error(f"operações desconhecidas: {', '.join(sorted(desconhecidas))}")
+
+    processo = diretorio = None
+    url = args.url
+    try:
+        if not url:
+            diretorio = tempfile.mkdtemp(prefix='automaster-carga-')
+            print(f"Iniciando o serviço com {args.clientes} clientes...", file=sys.stderr)
+            processo, url = iniciar_servico(args.clientes, args.conexoes, diretorio)
+
+        termos, ids = amostrar(url, 1000, semente=42)
+        fim = time.perf_counter() + args.duracao
+        trabalhadores = [Trabalhador(url, fim, mistura, termos, ids, semente=i)
+                         for i in range(args.conexoes)]
+        inicio = time.perf_counter()
+        for trabalhador in trabalhadores:
+            trabalhador.start()
+        for trabalhador in trabalhadores:
+            trabalhador.join()
+        duracao = time.perf_counter() - inicio
+    finally:
+        if processo:
+            processo.terminate()
+            processo.wait()
+        if diretorio:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+    resultados = {operacao: resumir([latencia for t in trabalhadores
+                                     for latencia in t.latencias[operacao]], duracao)
+                  for operacao in mistura}
+    resultados['total'] = resumir([latencia for t in trabalhadores
+                                   for lista in t.latencias.values() for latencia in lista],
+                                  duracao)
+    resultados['total']['erros'] = sum(t.erros for t in trabalhadores)
+
+    print(f"{'operação':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'máx ms':>10}")
+    for operacao, r in resultados.items():
+        if r['requisicoes']:
+            print(f"{operacao:<12}{r['requisicoes_por_s']:>10.1f}{r['p50_ms']:>10.2f}"
+                  f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}")
+    print(f"erros: {resultados['total']['erros']}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({'metadados': metadados(), 'conexoes': args.conexoes,
+                       'resultados': resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
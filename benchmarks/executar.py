@@ -0,0 +1,230 @@
+"""Benchmarks do GerenciadorClientes, sem interface gráfica.
+
+Mede carregar_dados, salvar_dados, adicionar_cliente, buscar_cliente (também
+paginada e só contando), obter_todos_clientes e a leitura do arquivo em JSON
+e no formato binário com bases sintéticas de vários tamanhos e grava o resultado em JSON para comparar versões.
+
+Uso:
+    python -m benchmarks.executar --tamanhos 1000,100000,1000000 --saida atual.json
+    python -m benchmarks.executar --tamanhos 1000,100000 --comparar atual.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from Program.cliente import (CAMPOS_SUGESTAO, GerenciadorClientes, clientes_do_arquivo,
+                             serializar_clientes)
+from benchmarks.gerador import gerar_clientes
+
+
+def percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def estatisticas(latencias: List[float], registros: int) -> Dict:
+    """Resumo das latências (em segundos) de uma operação"""
+    total = sum(latencias)
+    return {
+        'operacoes': len(latencias),
+        'registros': registros,
+        'total_s': total,
+        'operacoes_por_s': len(latencias) / total if total else None,
+        'registros_por_s': registros * len(latencias) / total if total else None,
+        'p50_ms': percentil(latencias, 50) * 1000,
+        'p90_ms': percentil(latencias, 90) * 1000,
+        'p99_ms': percentil(latencias, 99) * 1000,
+        'max_ms': max(latencias) * 1000,
+    }
+
+
+def cronometrar(funcao: Callable, argumentos: List) -> List[float]:
+    latencias = []
+    for argumento in argumentos:
+        inicio = time.perf_counter()
+        funcao(*argumento)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+def pico_memoria(funcao: Callable) -> int:
+    """Maior memória alocada durante a chamada, em bytes"""
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def gerar_termos(gerenciador: GerenciadorClientes, quantidade: int, semente: int) -> List[str]:
+    """Termos de busca variados: trechos de nome, placa e telefone, curtos e longos"""
+    aleatorio = random.Random(semente)
+    termos = set()
+    while len(termos) < quantidade:
+        cliente = aleatorio.choice(gerenciador.clientes)
+        campo = aleatorio.choice((cliente.nome, cliente.placa, cliente.telefone))
+        tamanho = aleatorio.choice((2, 3, 4, 5, 7))
+        inicio = aleatorio.randint(0, max(0, len(campo) - tamanho))
+        termos.add(campo[inicio:inicio + tamanho])
+    return list(termos)
+
+
+def buscar_sem_cache(gerenciador: GerenciadorClientes, termos: List[str]):
+    for termo in termos:
+        gerenciador._invalidar_cache()
+        gerenciador.buscar_cliente(termo)
+
+
+def sem_cache(gerenciador: GerenciadorClientes, operacao):
+    """Executa a operação sem aproveitar buscas anteriores em cache"""
+    def executar(*args):
+        gerenciador._invalidar_cache()
+        return operacao(*args)
+    return executar
+
+
+def executar_tamanho(tamanho: int, diretorio: str, args) -> Dict:
+    arquivo = os.path.join(diretorio, f"clientes_{tamanho}.json")
+    repeticoes = [()] * args.repeticoes
+
+    gerenciador = GerenciadorClientes(arquivo, modo_journal=True, carregar=False)
+    gerenciador.incorporar_lote(list(gerar_clientes(tamanho)))
+
+    resultados = {}
+    resultados['salvar_dados'] = estatisticas(
+        cronometrar(gerenciador.salvar_dados, repeticoes), tamanho)
+    resultados['carregar_dados'] = estatisticas(
+        cronometrar(lambda: GerenciadorClientes(arquivo, modo_journal=True), repeticoes), tamanho)
+    # Só a conversão do conteúdo em clientes, sem montar os índices
+    for formato in ('json', 'binario'):
+        conteudo = serializar_clientes(gerenciador.clientes, formato)
+        resultados[f'ler_arquivo_{formato}'] = estatisticas(
+            cronometrar(lambda: clientes_do_arquivo(conteudo), repeticoes), tamanho)
+        resultados[f'ler_arquivo_{formato}']['bytes'] = len(conteudo)
+    resultados['obter_todos_clientes'] = estatisticas(
+        cronometrar(gerenciador.obter_todos_clientes, repeticoes), tamanho)
+
+    termos = gerar_termos(gerenciador, args.buscas, semente=tamanho)
+    resultados['buscar_cliente'] = estatisticas(
+        cronometrar(gerenciador.buscar_cliente, [(termo,) for termo in termos]), tamanho)
+    # Primeira página e total, como na listagem paginada do serviço HTTP
+    resultados['buscar_pagina'] = estatisticas(
+        cronometrar(sem_cache(gerenciador, gerenciador.buscar_pagina),
+                    [(termo, 0, 50) for termo in termos]), tamanho)
+    resultados['contar_busca'] = estatisticas(
+        cronometrar(sem_cache(gerenciador, gerenciador.contar_busca),
+                    [(termo,) for termo in termos]), tamanho)
+
+    # Sugestões ao digitar: prefixos curtos de cidade, modelo e cor (a
+    # primeira chamada de cada campo, que conta os valores, fica de fora)
+    aleatorio = random.Random(tamanho)
+    prefixos = []
+    for campo in CAMPOS_SUGESTAO:
+        gerenciador.sugerir(campo, '')
+        for _ in range(args.buscas):
+            valor = getattr(aleatorio.choice(gerenciador.clientes), campo)
+            prefixos.append((campo, valor[:aleatorio.randint(1, 3)]))
+    resultados['sugerir'] = estatisticas(cronometrar(gerenciador.sugerir, prefixos), tamanho)
+
+    novos = list(gerar_clientes(args.insercoes, semente=tamanho + 1))
+    resultados['adicionar_cliente'] = estatisticas(
+        cronometrar(gerenciador.adicionar_cliente, [(cliente,) for cliente in novos]), tamanho)
+
+    if args.memoria:
+        gerenciador.salvar_dados()
+        picos = {
+            'salvar_dados': pico_memoria(gerenciador.salvar_dados),
+            'carregar_dados': pico_memoria(lambda: GerenciadorClientes(arquivo, modo_journal=True)),
+            'obter_todos_clientes': pico_memoria(gerenciador.obter_todos_clientes),
+            'buscar_cliente': pico_memoria(lambda: buscar_sem_cache(gerenciador, termos)),
+        }
+        for operacao, pico in picos.items():
+            resultados[operacao]['pico_memoria_bytes'] = pico
+
+    return resultados
+
+
+def metadados() -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    dados = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+    }
+    try:
+        import resource
+        # ru_maxrss é em KiB no Linux e em bytes no macOS
+        fator = 1 if sys.platform == 'darwin' else 1024
+        dados['pico_rss_bytes'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * fator
+    except ImportError:
+        pass
+    return dados
+
+
+def imprimir(resultados: Dict, base: Dict = None):
+    print(f"{'tamanho':>9} {'operação':<22}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}"
+          f"{'pico MB':>10}{'p50 vs base':>13}")
+    for tamanho, operacoes in resultados.items():
+        for operacao, r in operacoes.items():
+            pico = r.get('pico_memoria_bytes')
+            comparacao = ''
+            anterior = (base or {}).get(tamanho, {}).get(operacao)
+            if anterior and anterior['p50_ms']:
+                comparacao = f"{r['p50_ms'] / anterior['p50_ms']:.2f}x"
+            print(f"{tamanho:>9} {operacao:<22}{r['operacoes_por_s'] or 0:>12.1f}"
+                  f"{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}"
+                  f"{(pico / 2**20 if pico is not None else float('nan')):>10.1f}{comparacao:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do GerenciadorClientes")
+    parser.add_argument('--tamanhos', default='1000,100000,1000000',
+                        help="quantidades de clientes, separadas por vírgula")
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help="repetições de carregar/salvar/obter_todos")
+    parser.add_argument('--buscas', type=int, default=200, help="termos de busca distintos")
+    parser.add_argument('--insercoes', type=int, default=200, help="clientes adicionados")
+    parser.add_argument('--sem-memoria', dest='memoria', action='store_false',
+                        help="não mede o pico de memória (mais rápido)")
+    parser.add_argument('--saida', help="grava os resultados neste arquivo JSON")
+    parser.add_argument('--comparar', help="resultado anterior (JSON) para comparação")
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='automaster-bench-')
+    resultados = {}
+    try:
+        for tamanho in (int(t) for t in args.tamanhos.split(',')):
+            print(f"Executando com {tamanho} clientes...", file=sys.stderr)
+            resultados[str(tamanho)] = executar_tamanho(tamanho, diretorio, args)
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)['resultados']
+    imprimir(resultados, base)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({'metadados': metadados(), 'resultados': resultados}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Gerador de clientes sintéticos para benchmarks e testes de carga.
+
+Uso: python -m benchmarks.gerador 100000 clientes_100k.json
+"""
+import json
+import random
+import sys
+from datetime import date, timedelta
+from typing import Iterator
+
+from Program.cliente import SERVICOS, Cliente
+from Program.validacao import formatar_telefone
+
+# Cidade -> DDD
+CIDADES = {
+    "São Paulo": "11", "Guarulhos": "11", "Osasco": "11", "Santo André": "11",
+    "Campinas": "19", "Piracicaba": "19", "Jundiaí": "11", "Sorocaba": "15",
+    "Santos": "13", "São José dos Campos": "12", "Ribeirão Preto": "16",
+    "Rio de Janeiro": "21", "Niterói": "21", "Belo Horizonte": "31",
+    "Uberlândia": "34", "Curitiba": "41", "Londrina": "43", "Porto Alegre": "51",
+    "Florianópolis": "48", "Goiânia": "62", "Brasília": "61", "Salvador": "71",
+    "Recife": "81", "Fortaleza": "85", "Belém": "91", "Manaus": "92",
+}
+NOMES = [
+    "João", "Maria", "José", "Ana", "Antônio", "Francisca", "Carlos", "Adriana",
+    "Paulo", "Juliana", "Pedro", "Márcia", "Lucas", "Fernanda", "Luiz", "Patrícia",
+    "Marcos", "Aline", "Luís", "Sandra", "Gabriel", "Camila", "Rafael", "Amanda",
+    "Daniel", "Bruna", "Marcelo", "Jéssica", "Bruno", "Letícia", "Eduardo", "Júlia",
+    "Felipe", "Luciana", "Raimundo", "Vanessa", "Rodrigo", "Mariana", "Sérgio", "Gabriela",
+]
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves",
+    "Pereira", "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho",
+    "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa", "Rocha",
+    "Dias", "Nascimento", "Andrade", "Moreira", "Nunes", "Marques", "Machado",
+    "Mendes", "Freitas", "Cardoso", "Ramos", "Gonçalves", "Santana", "Teixeira",
+]
+CORES = ["Preto", "Branco", "Prata", "Cinza", "Vermelho", "Azul", "Verde", "Marrom", "Bege"]
+MODELOS = [
+    "Fiat Uno", "Fiat Palio", "Fiat Argo", "Fiat Mobi", "Fiat Strada", "VW Gol",
+    "VW Polo", "VW Fox", "VW Voyage", "VW T-Cross", "Chevrolet Onix", "Chevrolet Prisma",
+    "Chevrolet Celta", "Chevrolet S10", "Ford Ka", "Ford Fiesta", "Ford EcoSport",
+    "Hyundai HB20", "Hyundai Creta", "Renault Sandero", "Renault Kwid", "Toyota Corolla",
+    "Toyota Hilux", "Toyota Etios", "Honda Civic", "Honda Fit", "Jeep Renegade", "Nissan Kicks",
+]
+LETRAS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def gerar_placa(aleatorio: random.Random) -> str:
+    """Placa no formato Mercosul (ABC1D23) ou antigo (ABC1234)"""
+    letras = ''.join(aleatorio.choice(LETRAS) for _ in range(3))
+    if aleatorio.random() < 0.5:
+        return f"{letras}{aleatorio.randint(0, 9)}{aleatorio.choice(LETRAS)}{aleatorio.randint(0, 99):02d}"
+    return f"{letras}{aleatorio.randint(0, 9999):04d}"
+
+
+def gerar_telefone(aleatorio: random.Random, ddd: str) -> str:
+    """Celular (11 dígitos) ou fixo (10 dígitos), com a máscara do formulário"""
+    if aleatorio.random() < 0.8:
+        digitos = f"{ddd}9{aleatorio.randint(0, 99999999):08d}"
+    else:
+        digitos = f"{ddd}{aleatorio.randint(2, 5)}{aleatorio.randint(0, 9999999):07d}"
+    return formatar_telefone(digitos)
+
+
+def gerar_clientes(quantidade: int, semente: int = 42, dias: int = 3 * 365) -> Iterator[Cliente]:
+    """Gera clientes válidos com placas únicas e entradas nos últimos `dias` dias"""
+    aleatorio = random.Random(semente)
+    cidades = list(CIDADES)
+    hoje = date.today()
+    placas = set()
+
+    for _ in range(quantidade):
+        placa = gerar_placa(aleatorio)
+        while placa in placas:
+            placa = gerar_placa(aleatorio)
+        placas.add(placa)
+
+        cidade = aleatorio.choice(cidades)
+        entrada = hoje - timedelta(days=aleatorio.randint(0, dias))
+        yield Cliente(
+            nome=f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {aleatorio.choice(SOBRENOMES)}",
+            telefone=gerar_telefone(aleatorio, CIDADES[cidade]),
+            cidade=cidade,
+            placa=placa,
+            cor=aleatorio.choice(CORES),
+            modelo=aleatorio.choice(MODELOS),
+            servico=aleatorio.choice(SERVICOS),
+            data_entrada=entrada.strftime("%d/%m/%Y"),
+            id=f"{aleatorio.getrandbits(128):032x}"
+        )
+
+
+def gravar_json(caminho: str, quantidade: int, semente: int = 42):
+    """Grava um arquivo no mesmo formato do clientes.json"""
+    dados = [cliente.to_dict() for cliente in gerar_clientes(quantidade, semente)]
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Uso: python -m benchmarks.gerador QUANTIDADE ARQUIVO.json")
+        sys.exit(1)
+    gravar_json(sys.argv[2], int(sys.argv[1]))
+
+
+if __name__ == "__main__":
+    main()
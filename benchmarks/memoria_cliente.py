@@ -0,0 +1,83 @@
+"""Compara a memória ocupada por Cliente com a da classe original, baseada em __dict__.
+
+Uso: python -m benchmarks.memoria_cliente [quantidade]   (padrão: 1.000.000)
+"""
+import gc
+import random
+import sys
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from Program.cliente import Cliente
+
+CIDADES = ["São Paulo", "Campinas", "Santos", "Sorocaba", "Ribeirão Preto", "Jundiaí"]
+CORES = ["Preto", "Branco", "Prata", "Vermelho", "Azul", "Cinza"]
+MODELOS = ["Fiat Uno", "VW Gol", "Chevrolet Onix", "Hyundai HB20", "Fiat Argo", "Toyota Corolla"]
+SERVICOS = ["Troca de óleo", "Revisão geral", "Freios", "Suspensão", "Motor", "Pneus"]
+
+
+class ClienteOriginal:
+    """Cliente como era antes de __slots__ e sys.intern, com o mesmo id permanente de Cliente"""
+
+    def __init__(self, nome, telefone, cidade, placa, cor, modelo, servico, data_entrada=None,
+                 id=None):
+        self.id = id or uuid.uuid4().hex
+        self.nome = nome
+        self.telefone = telefone
+        self.cidade = cidade
+        self.placa = placa.upper()
+        self.cor = cor
+        self.modelo = modelo
+        self.servico = servico
+        self.data_entrada = data_entrada or datetime.now().strftime("%d/%m/%Y")
+
+
+def copia(texto: str) -> str:
+    """Cria um novo objeto str, como o json.load faz para cada valor lido"""
+    return texto.encode('utf-8').decode('utf-8')
+
+
+def gerar_campos(quantidade: int):
+    """Gera os campos de cada cliente como strings novas"""
+    aleatorio = random.Random(42)
+    for i in range(quantidade):
+        yield dict(
+            nome=f"Cliente {i}",
+            telefone=f"(11) 9{i % 10000:04d}-{i // 10000 % 10000:04d}",
+            cidade=copia(aleatorio.choice(CIDADES)),
+            placa=f"ABC{i % 10}{chr(65 + i % 26)}{i % 100:02d}",
+            cor=copia(aleatorio.choice(CORES)),
+            modelo=copia(aleatorio.choice(MODELOS)),
+            servico=copia(aleatorio.choice(SERVICOS)),
+            data_entrada=f"{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/2025",
+        )
+
+
+def medir(classe, quantidade: int) -> int:
+    """Memória retida por `quantidade` instâncias da classe, em bytes"""
+    gc.collect()
+    tracemalloc.start()
+    registros = [classe(**campos) for campos in gerar_campos(quantidade)]
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del registros
+    return atual
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    original = medir(ClienteOriginal, quantidade)
+    compacto = medir(Cliente, quantidade)
+
+    print(f"Registros: {quantidade}")
+    print(f"{'Classe':<20}{'Total (MB)':>12}{'Bytes/registro':>18}")
+    for nome, total in (("ClienteOriginal", original), ("Cliente", compacto)):
+        print(f"{nome:<20}{total / 2**20:>12.1f}{total / quantidade:>18.1f}")
+    print(f"Economia: {(original - compacto) / quantidade:.1f} bytes por registro "
+          f"({100 * (1 - compacto / original):.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
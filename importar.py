@@ -0,0 +1,46 @@
+"""Importação de clientes em lote, sem interface gráfica.
+
+Uso: python importar.py clientes.csv [--dados clientes.json] [--rejeitados rejeitados.csv]
+"""
+import argparse
+import csv
+import sys
+import time
+
+from Program.armazenamento import criar_gerenciador
+from Program.importacao import importar_arquivo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa clientes de um arquivo CSV ou JSON")
+    parser.add_argument("arquivo", help="arquivo CSV ou JSON com os clientes")
+    parser.add_argument("--dados", default="clientes.json",
+                        help="arquivo de dados do sistema (.json ou .db)")
+    parser.add_argument("--rejeitados", help="grava os registros rejeitados neste CSV")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    gerenciador = criar_gerenciador(args.dados, modo_journal=True)
+    relatorio = importar_arquivo(gerenciador, args.arquivo)
+    duracao = time.perf_counter() - inicio
+
+    print(f"{relatorio.resumo()} em {duracao:.1f}s")
+    for numero, motivos in relatorio.rejeitados[:20]:
+        print(f"  registro {numero}: {'; '.join(motivos)}")
+    if len(relatorio.rejeitados) > 20:
+        print(f"  ... e mais {len(relatorio.rejeitados) - 20}")
+
+    if args.rejeitados:
+        with open(args.rejeitados, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['registro', 'motivos'])
+            for numero, motivos in relatorio.rejeitados:
+                writer.writerow([numero, '; '.join(motivos)])
+
+    if relatorio.erro:
+        sys.exit(1)
+    sys.exit(0 if not relatorio.rejeitados else 2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,73 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from Program.cliente import Cliente, GerenciadorClientes
-import re
+from tkinter import ttk, messagebox, filedialog
+from Program.cliente import CAMPOS_SUGESTAO, SERVICOS, Cliente, GerenciadorClientes
+from Program.lista_virtual import ListaVirtual, SequenciaIndexada
+from Program.busca_assincrona import BuscaAssincrona
+from Program.consulta import eh_consulta
+from Program.ordenacao import posicao_na_ordem
+from Program.texto import digitos_telefone, normalizar
+from Program.carregamento import CarregadorEmSegundoPlano
+from Program.validacao import formatar_telefone, validar_dados
+from Program.instrumentacao import Instrumentacao
+from Program.snapshot import converter_arquivo
+from datetime import date, timedelta
+import os
+import sys
+import time
+import queue
+
+
+def numero_do_ambiente(nome, padrao, tipo=int):
+    """Número não negativo de uma variável de ambiente; se inválido, avisa e usa o padrão"""
+    texto = os.environ.get(nome)
+    if not texto:
+        return padrao
+    try:
+        valor = tipo(texto)
+        if valor < 0:
+            raise ValueError
+        return valor
+    except ValueError:
+        print(f"Valor inválido em {nome}: {texto!r}; usando {padrao}")
+        return padrao
+
+
+# Arquivo de dados de cada valor de AUTOMASTER_FORMATO_DADOS
+ARQUIVOS_DADOS = {'json': 'clientes.json', 'binario': 'clientes.bin'}
+
+
+def arquivo_de_dados():
+    """Arquivo de dados do formato escolhido no ambiente; se inválido, avisa e usa o JSON.
+    
+    Na primeira vez com o formato binário, o clientes.bin é criado a partir
+    do clientes.json, que deixa de ser usado, e o histórico passa para o
+    clientes.bin.historico.
+    """
+    formato = os.environ.get('AUTOMASTER_FORMATO_DADOS') or 'json'
+    if formato not in ARQUIVOS_DADOS:
+        print(f"Valor inválido em AUTOMASTER_FORMATO_DADOS: {formato!r}; usando json")
+        formato = 'json'
+    arquivo = ARQUIVOS_DADOS[formato]
+    origem = ARQUIVOS_DADOS['json']
+    if formato == 'binario' and not os.path.exists(arquivo):
+        # O diário deixado por uma importação entra no clientes.json antes
+        if os.path.exists(origem + '.journal'):
+            GerenciadorClientes(origem, modo_journal=True).compactar()
+        if os.path.exists(origem):
+            converter_arquivo(origem, arquivo)
+        if os.path.isdir(origem + '.historico') and not os.path.exists(arquivo + '.historico'):
+            os.rename(origem + '.historico', arquivo + '.historico')
+    return arquivo
+
 
 class ModernOficinaApp:
-    def __init__(self, root):
+    # Coluna da lista -> campo do cliente usado na ordenação
+    CAMPOS_COLUNAS = {
+        'Nome': 'nome', 'Data': 'data_entrada', 'Telefone': 'telefone', 'Cidade': 'cidade',
+        'Placa': 'placa', 'Cor': 'cor', 'Modelo': 'modelo', 'Serviço': 'servico',
+    }
+    
+    def __init__(self, root, diagnostico: bool = False):
         self.root = root
         self.root.title("AutoMaster - Sistema de Controle")
         self.root.geometry("1200x800")
@@ -14,14 +77,157 @@ class ModernOficinaApp:
         self.setup_styles()
         
         # Inicializa o gerenciador de clientes
-        self.gerenciador = GerenciadorClientes()
+        # Os dados são carregados em segundo plano depois que a janela aparece
+        # e gravados por uma thread, sem travar a janela a cada alteração
+        # Entradas mais antigas que isso vão para o histórico (0 desativa)
+        idade_arquivamento = numero_do_ambiente('AUTOMASTER_ARQUIVAR_APOS_DIAS', 730)
+        # AUTOMASTER_FORMATO_DADOS=binario usa o clientes.bin (ver Program.snapshot)
+        arquivo_dados = arquivo_de_dados()
+        # A interface usa a lista em memória, as ordens, as estatísticas e os
+        # observadores do GerenciadorClientes, e não só ArmazenamentoClientes;
+        # o SQLite fica para o serviço e a importação
+        self.gerenciador = GerenciadorClientes(arquivo_dados, carregar=False,
+                                               gravacao_adiada=True,
+                                               idade_arquivamento=idade_arquivamento,
+                                               ao_falhar_gravacao=self.ao_falhar_gravacao)
+        self.avisando_falha = False
+        
+        # Medição de desempenho opcional; precisa envolver os métodos antes
+        # que eles sejam associados aos widgets
+        self.instrumentacao = None
+        if diagnostico:
+            self.ativar_diagnostico()
+        
+        # Busca com debounce executada fora da thread da interface
+        self.busca = BuscaAssincrona(self.root, self.gerenciador, self.exibir_resultados,
+                                     buscar=self.executar_busca)
         
         # Cliente selecionado para edição
         self.cliente_selecionado = None
-        self.indice_selecionado = -1
+        self.id_selecionado = None
+        # Se a linha selecionada é de um cliente do histórico (somente leitura)
+        self.historico_selecionado = False
+        # Coluna da ordenação atual e se é decrescente (None: ordem de cadastro)
+        self.ordem = None
+        self.carregando = False
+        # Resultado de busca exibido (None quando a lista mostra todos), o
+        # termo que o gerou e quantos clientes dele não são do histórico (os
+        # do histórico ficam no fim quando não há ordenação)
+        self.resultado_busca = None
+        self.termo_exibido = ''
+        self.modo_exibido = 'comum'
+        self.ativos_exibidos = 0
         
         self.criar_interface()
         self.atualizar_lista()
+        # Cada alteração atualiza só a linha afetada
+        self.gerenciador.observar(self.ao_alterar_clientes)
+        self.iniciar_carregamento()
+        
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar)
+        self.root.after(2000, self.verificar_alteracoes_externas)
+    
+    def ativar_diagnostico(self):
+        """Passa a medir as operações do gerenciador e as atualizações da lista"""
+        limiar = numero_do_ambiente('AUTOMASTER_LIMIAR_PERFIL_MS', 500.0, float)
+        self.instrumentacao = Instrumentacao(limiar_perfil_ms=limiar)
+        self.instrumentacao.envolver(
+            self.gerenciador,
+            ['carregar_dados', 'salvar_dados', 'adicionar_cliente', 'editar_cliente_por_id',
+             'remover_cliente_por_id', 'buscar_cliente', 'buscar_aproximado', 'consultar',
+             'obter_todos_clientes', 'sugerir',
+             'incorporar_lote', 'concluir_carregamento', 'sincronizar'],
+            contar=self.gerenciador.total_clientes, prefixo='gerenciador.')
+        self.instrumentacao.envolver(
+            self, ['atualizar_lista', 'buscar_clientes', 'exibir_resultados',
+                   'ao_alterar_clientes'],
+            contar=lambda: len(self.lista.registros), prefixo='interface.')
+    
+    def iniciar_carregamento(self):
+        """Começa a leitura do arquivo de dados em segundo plano"""
+        self.carregando = True
+        self.carregador = CarregadorEmSegundoPlano(self.gerenciador.arquivo_dados)
+        self.carregador.iniciar()
+        self.root.after(50, self.receber_clientes_carregados)
+    
+    def receber_clientes_carregados(self):
+        """Incorpora os lotes já lidos, sem travar a interface por muito tempo"""
+        recebidos = 0
+        limite = time.perf_counter() + 0.03
+        while time.perf_counter() < limite:
+            try:
+                tipo, conteudo = self.carregador.fila.get_nowait()
+            except queue.Empty:
+                break
+            
+            recebidos += 1
+            if tipo == 'lote':
+                self.gerenciador.incorporar_lote(conteudo)
+            else:
+                if tipo == 'erro':
+                    # Recarrega de forma síncrona para manter o tratamento de erro original
+                    self.gerenciador.carregar_dados()
+                else:
+                    self.gerenciador.concluir_carregamento(*conteudo)
+                self.carregando = False
+                break
+        
+        if recebidos:
+            if not self.search_var.get():
+                self.atualizar_lista()
+            elif not self.carregando:
+                self.buscar_clientes()
+            self.atualizar_estatisticas()
+        
+        if self.carregando:
+            self.root.after(50, self.receber_clientes_carregados)
+    
+    def ao_falhar_gravacao(self):
+        """Chamado pela thread de gravação quando uma gravação falha"""
+        # Os widgets só podem ser usados na thread da janela
+        self.root.after(0, self.avisar_falha_gravacao)
+    
+    def avisar_falha_gravacao(self):
+        """Avisa que a gravação em segundo plano falhou"""
+        # As novas tentativas que falharem com o aviso aberto não repetem o aviso
+        if self.avisando_falha or not self.gerenciador.gravador.pendente:
+            return
+        self.avisando_falha = True
+        try:
+            messagebox.showerror("Erro", "❌ Não foi possível salvar os dados! "
+                                 "Uma nova tentativa será feita em instantes.")
+        finally:
+            self.avisando_falha = False
+    
+    def verificar_alteracoes_externas(self):
+        """Incorpora periodicamente o que outras estações gravaram no arquivo"""
+        # As alterações trazidas chegam à lista por ao_alterar_clientes
+        if not self.carregando:
+            self.gerenciador.sincronizar(esperar=False)
+        self.root.after(2000, self.verificar_alteracoes_externas)
+    
+    def recarregar_lista(self):
+        """Traz as alterações de outras estações e atualiza a lista"""
+        if not self.carregando:
+            self.gerenciador.sincronizar()
+        self.buscar_clientes()
+    
+    def fechar(self):
+        """Grava as alterações pendentes antes de fechar a janela"""
+        if not self.gerenciador.descarregar():
+            if not messagebox.askyesno("Erro ao salvar",
+                                       "❌ Não foi possível salvar as últimas alterações.\n"
+                                       "Fechar mesmo assim e perdê-las?"):
+                return
+        self.busca.encerrar()
+        self.gerenciador.fechar()
+        self.root.destroy()
+    
+    def aguardar_carregamento(self):
+        """Avisa que alterações só são permitidas após o carregamento"""
+        if self.carregando:
+            messagebox.showinfo("Aguarde", "⏳ Os clientes ainda estão sendo carregados.")
+        return self.carregando
     
     def setup_styles(self):
         """Configura estilos modernos para a aplicação"""
@@ -82,29 +288,14 @@ class ModernOficinaApp:
     def formatar_telefone(self, event=None):
         """Formata o telefone automaticamente durante a digitação"""
         entry = self.entries['telefone']
-        texto = entry.get().replace('(', '').replace(')', '').replace(' ', '').replace('-', '')
         
-        # Remove qualquer caractere não numérico, exceto o +
-        texto = ''.join(filter(str.isdigit, texto))
+        # Mantém só os dígitos (até 11, DDD + 9 dígitos) e aplica a máscara
+        formato = formatar_telefone(entry.get())
         
-        if len(texto) == 0:
+        if not formato:
             entry.delete(0, tk.END)
             return
         
-        # Limita a 11 dígitos (DDD + 9 dígitos)
-        if len(texto) > 11:
-            texto = texto[:11]
-        
-        # Formatação baseada no tamanho
-        if len(texto) <= 2:
-            formato = f"({texto}"
-        elif len(texto) <= 7:
-            formato = f"({texto[:2]}) {texto[2:]}"
-        elif len(texto) <= 11:
-            formato = f"({texto[:2]}) {texto[2:7]}-{texto[7:]}"
-        else:
-            formato = f"({texto[:2]}) {texto[2:7]}-{texto[7:11]}"
-        
         # Atualiza o campo sem trigger recursivo
         entry.unbind('<KeyRelease>')
         entry.delete(0, tk.END)
@@ -114,6 +305,27 @@ class ModernOficinaApp:
         # Posiciona o cursor no final
         entry.icursor(tk.END)
     
+    def sugerir_valores(self, event, campo):
+        """Sugere e completa cidade, modelo e cor durante a digitação"""
+        if not event.char and event.keysym not in ('BackSpace', 'Delete'):
+            return  # Setas, Tab, Shift...
+        entry = self.entries[campo]
+        cursor = entry.index(tk.INSERT)
+        digitado = entry.get()[:cursor]
+        sugestoes = self.gerenciador.sugerir(campo, digitado) if digitado.strip() else []
+        entry['values'] = sugestoes  # Seta para baixo abre a lista
+        
+        if not (event.char.isprintable() and sugestoes and cursor == len(entry.get())):
+            return
+        # Completa com a sugestão mais usada, já na grafia cadastrada, e
+        # seleciona o trecho completado: continuar digitando o substitui
+        sugestao = sugestoes[0]
+        if len(sugestao) > len(digitado) and normalizar(sugestao[:len(digitado)]) == normalizar(digitado):
+            entry.delete(0, tk.END)
+            entry.insert(0, sugestao)
+            entry.select_range(len(digitado), tk.END)
+            entry.icursor(len(digitado))
+    
     def validar_tecla_telefone(self, event):
         """Valida as teclas pressionadas no campo de telefone"""
         # Permite: números, backspace, delete, tab, setas
@@ -206,11 +418,7 @@ class ModernOficinaApp:
                 entry.insert(0, datetime.now().strftime("%d/%m/%Y"))
             elif campo == "servico":
                 entry = ttk.Combobox(field_frame, width=28, font=('Arial', 11),
-                                   values=[
-                    "Troca de óleo", "Revisão geral", "Freios", "Suspensão",
-                    "Motor", "Transmissão", "Ar condicionado", "Elétrica",
-                    "Pintura", "Funilaria", "Pneus", "Outros"
-                ])
+                                   values=SERVICOS)
                 entry.set("Selecione o serviço")
             elif campo == "telefone":
                 # Campo de telefone com formatação automática
@@ -220,6 +428,11 @@ class ModernOficinaApp:
                 entry.bind('<KeyPress>', self.validar_tecla_telefone)
                 # Tooltip de ajuda
                 self.criar_tooltip(entry, "Digite o telefone com DDD. Ex: 11999999999")
+            elif campo in CAMPOS_SUGESTAO:
+                # Sugere os valores já cadastrados, dos mais usados aos menos
+                entry = ttk.Combobox(field_frame, width=28, font=('Arial', 11))
+                entry.bind('<KeyRelease>',
+                           lambda event, campo=campo: self.sugerir_valores(event, campo))
             else:
                 entry = ttk.Entry(field_frame, width=30, font=('Arial', 11))
             
@@ -290,16 +503,20 @@ class ModernOficinaApp:
         self.tree = ttk.Treeview(list_frame, columns=columns, show='headings', 
                                 height=18, style='Modern.Treeview')
         
-        # Configurar colunas com larguras otimizadas
+        # Configurar colunas com larguras otimizadas; clicar no título ordena
         column_widths = [140, 90, 110, 110, 90, 80, 120, 130]
         for i, (col, width) in enumerate(zip(columns, column_widths)):
-            self.tree.heading(col, text=col)
+            self.tree.heading(col, text=col, command=lambda c=col: self.ordenar_por(c))
             self.tree.column(col, width=width, minwidth=60)
         
-        # Scrollbars modernas
-        v_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        # Scrollbars modernas (a vertical é controlada pela lista virtual)
+        v_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL)
         h_scrollbar = ttk.Scrollbar(list_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+        
+        # Só as linhas visíveis são criadas no Treeview
+        self.lista = ListaVirtual(self.tree, v_scrollbar, self.formatar_linha,
+                                  lambda cliente: cliente.id)
         
         # Grid da treeview e scrollbars
         self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -307,7 +524,7 @@ class ModernOficinaApp:
         h_scrollbar.grid(row=2, column=0, sticky=(tk.W, tk.E))
         
         # Bind para seleção
-        self.tree.bind('<<TreeviewSelect>>', self.selecionar_cliente)
+        self.tree.bind('<<TreeviewSelect>>', self.selecionar_cliente, add='+')
         
         # Frame dos botões de ação
         action_frame = ttk.Frame(list_frame, style='Card.TFrame')
@@ -318,40 +535,150 @@ class ModernOficinaApp:
         ttk.Button(action_frame, text="🗑️ Excluir Selecionado", 
                   command=self.excluir_cliente, style='Danger.TButton').pack(side=tk.LEFT, padx=5)
         ttk.Button(action_frame, text="🔄 Atualizar Lista", 
-                  command=self.atualizar_lista, style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+                  command=self.recarregar_lista, style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(action_frame, text="📈 Relatórios", 
+                  command=self.abrir_relatorios, style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+        if self.instrumentacao:
+            ttk.Button(action_frame, text="📊 Diagnóstico", 
+                      command=self.abrir_diagnostico, style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+    
+    def abrir_relatorios(self):
+        """Entradas por período, serviço, cidade e mês"""
+        if self.aguardar_carregamento():
+            return
+        janela = tk.Toplevel(self.root)
+        janela.title("Relatórios")
+        janela.geometry("1000x600")
+        janela.configure(bg=self.colors['light'])
+        estatisticas = self.gerenciador.estatisticas
+        
+        # Resumos por serviço, cidade e mês, lidos dos contadores (incluindo
+        # o resumo do histórico, sem abrir os segmentos)
+        resumo_frame = ttk.Frame(janela, style='Card.TFrame', padding=10)
+        resumo_frame.pack(fill=tk.X, padx=10, pady=10)
+        tabelas = [
+            ("Serviço", estatisticas.todos_por_servico().most_common()),
+            ("Cidade", estatisticas.todos_por_cidade().most_common(12)),
+            ("Mês", [(f"{mes:02d}/{ano}", total)
+                     for (ano, mes), total in estatisticas.ultimos_meses(12)]),
+        ]
+        for titulo, linhas in tabelas:
+            tree = ttk.Treeview(resumo_frame, columns=(titulo, 'Entradas'), show='headings',
+                                height=8, style='Modern.Treeview')
+            tree.heading(titulo, text=titulo)
+            tree.heading('Entradas', text='Entradas')
+            tree.column(titulo, width=180)
+            tree.column('Entradas', width=90, anchor=tk.E)
+            for linha in linhas:
+                tree.insert('', 'end', values=linha)
+            tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
+        
+        # Consulta por período
+        periodo_frame = ttk.Frame(janela, style='Card.TFrame', padding=10)
+        periodo_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        filtro = ttk.Frame(periodo_frame, style='Card.TFrame')
+        filtro.pack(fill=tk.X, pady=(0, 10))
+        
+        hoje = date.today()
+        inicio_var = tk.StringVar(value=(hoje - timedelta(days=6)).strftime("%d/%m/%Y"))
+        fim_var = tk.StringVar(value=hoje.strftime("%d/%m/%Y"))
+        ttk.Label(filtro, text="De:", style='Section.TLabel').pack(side=tk.LEFT)
+        ttk.Entry(filtro, textvariable=inicio_var, width=12).pack(side=tk.LEFT, padx=5)
+        ttk.Label(filtro, text="Até:", style='Section.TLabel').pack(side=tk.LEFT)
+        ttk.Entry(filtro, textvariable=fim_var, width=12).pack(side=tk.LEFT, padx=5)
+        total_label = ttk.Label(filtro, text="", style='Section.TLabel')
+        
+        colunas = tuple(self.CAMPOS_COLUNAS)
+        tree = ttk.Treeview(periodo_frame, columns=colunas, show='headings',
+                            height=10, style='Modern.Treeview')
+        for col in colunas:
+            tree.heading(col, text=col)
+            tree.column(col, width=110, minwidth=60)
+        scrollbar = ttk.Scrollbar(periodo_frame, orient=tk.VERTICAL)
+        lista = ListaVirtual(tree, scrollbar, self.formatar_linha, lambda cliente: cliente.id)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+        
+        def consultar():
+            try:
+                clientes = self.gerenciador.clientes_no_periodo(inicio_var.get(), fim_var.get())
+            except ValueError:
+                messagebox.showerror("Erro", "Datas devem estar no formato DD/MM/AAAA",
+                                     parent=janela)
+                return
+            total_label.config(text=f"{len(clientes)} entradas no período")
+            lista.definir_registros(clientes)
+        
+        ttk.Button(filtro, text="🔍 Consultar", command=consultar,
+                  style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+        total_label.pack(side=tk.LEFT, padx=10)
+        consultar()
+    
+    def abrir_diagnostico(self):
+        """Mostra os tempos medidos de cada operação"""
+        janela = tk.Toplevel(self.root)
+        janela.title("Diagnóstico de desempenho")
+        janela.geometry("900x400")
+        
+        colunas = ('Operação', 'Chamadas', 'Média ms', 'p50 ms', 'p95 ms', 'Máx ms', 'Registros')
+        tree = ttk.Treeview(janela, columns=colunas, show='headings', style='Modern.Treeview')
+        for col, width in zip(colunas, [260, 80, 90, 90, 90, 90, 90]):
+            tree.heading(col, text=col)
+            tree.column(col, width=width, minwidth=60)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        def preencher():
+            tree.delete(*tree.get_children())
+            for nome, r in self.instrumentacao.relatorio()['operacoes'].items():
+                tree.insert('', 'end', values=(
+                    nome, r['chamadas'], f"{r['media_ms']:.2f}", r['p50_ms'], r['p95_ms'],
+                    f"{r['maximo_ms']:.2f}", f"{r['media_registros']:.0f}"
+                ))
+        
+        def salvar():
+            caminho = filedialog.asksaveasfilename(parent=janela, defaultextension='.json',
+                                                   initialfile='diagnostico.json')
+            if caminho:
+                self.instrumentacao.gravar(caminho)
+        
+        def limpar():
+            self.instrumentacao.limpar()
+            preencher()
+        
+        botoes = ttk.Frame(janela)
+        botoes.pack(pady=(0, 10))
+        ttk.Button(botoes, text="🔄 Atualizar", command=preencher,
+                  style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(botoes, text="💾 Salvar relatório", command=salvar,
+                  style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(botoes, text="🧹 Limpar", command=limpar,
+                  style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+        preencher()
     
     def atualizar_estatisticas(self):
         """Atualiza as estatísticas no header"""
-        total_clientes = len(self.gerenciador.clientes)
-        self.stats_label.config(text=f"Clientes: {total_clientes}")
+        total_clientes = self.gerenciador.total_clientes()
+        if self.carregando:
+            self.stats_label.config(text=f"Clientes: {total_clientes} (carregando...)")
+        else:
+            resumo = self.gerenciador.estatisticas.resumo()
+            texto = (f"Clientes: {total_clientes}  |  Hoje: {resumo['hoje']}  |  "
+                     f"7 dias: {resumo['semana']}  |  Mês: {resumo['mes']}")
+            arquivados = self.gerenciador.estatisticas.arquivados
+            if arquivados:
+                texto += f"  |  Histórico: {arquivados}"
+            self.stats_label.config(text=texto)
     
     def validar_campos(self):
         """Valida os campos do formulário"""
-        erros = []
-        
-        campos_obrigatorios = ['nome', 'telefone', 'cidade', 'placa', 'modelo', 'servico']
-        for campo in campos_obrigatorios:
-            if not self.entries[campo].get().strip():
-                erros.append(f"O campo {campo.replace('_', ' ').title()} é obrigatório")
-        
-        data = self.entries['data_entrada'].get().strip()
-        if data and not re.match(r'\d{2}/\d{2}/\d{4}', data):
-            erros.append("Data deve estar no formato DD/MM/AAAA")
-        
-        placa = self.entries['placa'].get().strip().upper()
-        if placa and not re.match(r'^[A-Z]{3}[0-9][A-Z0-9][0-9]{2}$', placa):
-            erros.append("Placa deve estar no formato ABC1234 ou ABC1D23")
-        
-        telefone = self.entries['telefone'].get().strip()
-        # Remove formatação para validar
-        telefone_limpo = telefone.replace('(', '').replace(')', '').replace(' ', '').replace('-', '')
-        if telefone_limpo and not re.match(r'^\d{10,11}$', telefone_limpo):
-            erros.append("Telefone deve ter 10 ou 11 dígitos (com DDD)")
-        
-        return erros
+        # As mesmas regras são usadas na importação em lote
+        return validar_dados({campo: entry.get() for campo, entry in self.entries.items()})
     
     def adicionar_cliente(self):
         """Adiciona um novo cliente"""
+        if self.aguardar_carregamento():
+            return
+        
         erros = self.validar_campos()
         if erros:
             messagebox.showerror("Erro de Validação", "\n".join(erros))
@@ -375,18 +702,20 @@ class ModernOficinaApp:
             if self.gerenciador.adicionar_cliente(cliente):
                 messagebox.showinfo("Sucesso", "✅ Cliente adicionado com sucesso!")
                 self.limpar_campos()
-                self.atualizar_lista()
-                self.atualizar_estatisticas()
             else:
-                messagebox.showerror("Erro", "❌ Já existe um cliente com esta placa!")
+                messagebox.showerror("Erro", "❌ Já existe um cliente com esta placa "
+                                             "(também entre os do histórico)!")
         
         except Exception as e:
             messagebox.showerror("Erro", f"❌ Erro ao adicionar cliente: {str(e)}")
     
     def atualizar_cliente(self):
         """Atualiza o cliente selecionado"""
-        if self.indice_selecionado == -1:
-            messagebox.showwarning("Aviso", "⚠️ Selecione um cliente para atualizar!")
+        if self.aguardar_carregamento():
+            return
+        
+        if self.id_selecionado is None:
+            self.avisar_sem_selecao("atualizar")
             return
         
         erros = self.validar_campos()
@@ -408,12 +737,10 @@ class ModernOficinaApp:
                 data_entrada=self.entries['data_entrada'].get().strip()
             )
             
-            if self.gerenciador.editar_cliente(self.indice_selecionado, cliente_atualizado):
+            if self.gerenciador.editar_cliente_por_id(self.id_selecionado, cliente_atualizado):
                 messagebox.showinfo("Sucesso", "✅ Cliente atualizado com sucesso!")
                 self.limpar_campos()
-                self.atualizar_lista()
-                self.atualizar_estatisticas()
-                self.indice_selecionado = -1
+                self.id_selecionado = None
             else:
                 messagebox.showerror("Erro", "❌ Erro ao atualizar cliente ou placa já existe!")
         
@@ -424,25 +751,38 @@ class ModernOficinaApp:
         """Seleciona um cliente da lista"""
         selection = self.tree.selection()
         if selection:
-            item = self.tree.item(selection[0])
-            values = item['values']
-            
-            nome = values[0]
-            placa = values[4]
-            
-            for i, cliente in enumerate(self.gerenciador.clientes):
-                if cliente.nome == nome and cliente.placa == placa:
-                    self.indice_selecionado = i
-                    self.cliente_selecionado = cliente
-                    break
+            # O iid da linha é o id do cliente
+            cliente = self.gerenciador.obter_por_id(selection[0])
+            if cliente is not None:
+                self.id_selecionado = cliente.id
+                self.cliente_selecionado = cliente
+                self.historico_selecionado = False
+            else:
+                # Cliente do histórico: não pode ser editado nem excluído, e a
+                # seleção anterior não deve continuar valendo
+                self.id_selecionado = None
+                self.cliente_selecionado = None
+                self.historico_selecionado = True
+    
+    def avisar_sem_selecao(self, acao):
+        """Avisa que não há cliente selecionado para a ação, ou que ele é do histórico"""
+        if self.historico_selecionado:
+            messagebox.showinfo("Histórico", "🗄️ Este cliente está no histórico, que é somente "
+                                             f"leitura: não é possível {acao}.")
+        else:
+            messagebox.showwarning("Aviso", f"⚠️ Selecione um cliente para {acao}!")
     
     def editar_cliente(self):
         """Carrega os dados do cliente selecionado no formulário"""
-        if self.indice_selecionado == -1:
-            messagebox.showwarning("Aviso", "⚠️ Selecione um cliente para editar!")
+        if self.id_selecionado is None:
+            self.avisar_sem_selecao("editar")
             return
         
-        cliente = self.cliente_selecionado
+        # Busca pelo id: os dados podem ter mudado desde a seleção
+        cliente = self.gerenciador.obter_por_id(self.id_selecionado)
+        if cliente is None:
+            messagebox.showwarning("Aviso", "⚠️ O cliente selecionado não existe mais!")
+            return
         
         self.entries['nome'].delete(0, tk.END)
         self.entries['nome'].insert(0, cliente.nome)
@@ -471,21 +811,26 @@ class ModernOficinaApp:
     
     def excluir_cliente(self):
         """Exclui o cliente selecionado"""
-        if self.indice_selecionado == -1:
-            messagebox.showwarning("Aviso", "⚠️ Selecione um cliente para excluir!")
+        if self.aguardar_carregamento():
             return
         
-        cliente = self.cliente_selecionado
+        if self.id_selecionado is None:
+            self.avisar_sem_selecao("excluir")
+            return
+        
+        # Busca pelo id: os dados podem ter mudado desde a seleção
+        cliente = self.gerenciador.obter_por_id(self.id_selecionado)
+        if cliente is None:
+            messagebox.showwarning("Aviso", "⚠️ O cliente selecionado não existe mais!")
+            return
         resposta = messagebox.askyesno("Confirmar Exclusão", 
                                      f"🗑️ Deseja realmente excluir o cliente {cliente.nome}?")
         
         if resposta:
-            if self.gerenciador.remover_cliente(self.indice_selecionado):
+            if self.gerenciador.remover_cliente_por_id(self.id_selecionado):
                 messagebox.showinfo("Sucesso", "✅ Cliente excluído com sucesso!")
                 self.limpar_campos()
-                self.atualizar_lista()
-                self.atualizar_estatisticas()
-                self.indice_selecionado = -1
+                self.id_selecionado = None
             else:
                 messagebox.showerror("Erro", "❌ Erro ao excluir cliente!")
     
@@ -499,45 +844,156 @@ class ModernOficinaApp:
             elif campo == 'servico':
                 entry.set("Selecione o serviço")
         
-        self.indice_selecionado = -1
+        self.id_selecionado = None
         self.cliente_selecionado = None
+        self.historico_selecionado = False
     
     def buscar_clientes(self, *args):
         """Busca clientes conforme o texto digitado"""
         termo = self.search_var.get()
         
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
         if termo:
-            resultados = self.gerenciador.buscar_cliente(termo)
-            for indice, cliente in resultados:
-                self.tree.insert('', 'end', values=(
-                    cliente.nome, cliente.data_entrada, cliente.telefone,
-                    cliente.cidade, cliente.placa, cliente.cor,
-                    cliente.modelo, cliente.servico
-                ))
+            self.busca.agendar(termo)
         else:
+            self.busca.cancelar()
             self.atualizar_lista()
     
+    def executar_busca(self, termo):
+        """Executada na thread da busca: consulta por campos ou busca comum.
+        
+        Retorna o modo que produziu os resultados ('consulta', 'comum',
+        'aproximada' ou 'telefone') junto com eles, para que as alterações
+        seguintes sejam conferidas pelo mesmo critério (ver corresponde_exibido).
+        """
+        if eh_consulta(termo):
+            try:
+                return 'consulta', self.gerenciador.consultar(termo)
+            except ValueError:
+                return 'consulta', []  # Consulta incompleta ou inválida
+        resultados = self.gerenciador.buscar_cliente(termo)
+        if resultados or not termo.strip():
+            return 'comum', resultados
+        # Se nada for encontrado, procura nomes e placas parecidos
+        resultados = self.gerenciador.buscar_aproximado(termo)
+        digitos = digitos_telefone(termo)
+        if not resultados and digitos and len(digitos) >= 8:
+            # Número com o código do país, por exemplo: procura pelo final
+            return 'telefone', self.gerenciador.buscar_telefone(digitos)
+        return 'aproximada', resultados
+    
+    def exibir_resultados(self, termo, busca):
+        """Exibe o resultado de uma busca concluída em segundo plano"""
+        modo, resultados = busca
+        if termo == self.search_var.get():
+            clientes = [cliente for indice, cliente in resultados]
+            if self.ordem:
+                coluna, decrescente = self.ordem
+                clientes = self.gerenciador.ordenar_resultados(
+                    clientes, self.CAMPOS_COLUNAS[coluna], decrescente)
+            # Recebe inclusões e remoções sem percorrer o resultado (ver atualizar_resultado)
+            self.resultado_busca = SequenciaIndexada(clientes)
+            self.termo_exibido = termo
+            self.modo_exibido = modo
+            self.ativos_exibidos = sum(1 for indice, _ in resultados if indice is not None)
+            self.lista.definir_registros(self.resultado_busca)
+    
+    def ao_alterar_clientes(self, alteracao):
+        """Leva à lista uma inclusão, edição ou remoção, sem refazer a busca"""
+        if self.carregando:
+            return  # A lista é montada ao final do carregamento
+        if alteracao.tipo == 'recarregado':
+            self.buscar_clientes()
+            return
+        # Sem busca, a lista exibe a lista do gerenciador (ou a ordem mantida
+        # por ele), que já tem a alteração; com busca, o resultado é uma
+        # cópia e recebe só este cliente
+        if self.resultado_busca is not None:
+            self.atualizar_resultado(alteracao)
+        self.lista.renderizar()
+        self.atualizar_estatisticas()
+    
+    def corresponde_exibido(self, cliente):
+        """Indica se o cliente atende à busca exibida, no modo que a produziu"""
+        termo = self.termo_exibido
+        if self.modo_exibido == 'telefone':
+            return self.gerenciador.corresponde_telefone(digitos_telefone(termo), cliente)
+        if self.modo_exibido == 'aproximada':
+            # Um cliente que atenda à busca comum também é mostrado
+            return (self.gerenciador.corresponde_aproximado(termo, cliente)
+                    or self.gerenciador.corresponde_busca(termo, cliente))
+        return self.gerenciador.corresponde_busca(termo, cliente)
+    
+    def atualizar_resultado(self, alteracao):
+        """Inclui, troca ou retira o cliente do resultado exibido, conforme a busca"""
+        registros = self.resultado_busca
+        try:
+            atende = alteracao.cliente is not None and self.corresponde_exibido(alteracao.cliente)
+        except ValueError:
+            atende = False  # Consulta incompleta: o resultado exibido é de outra
+        posicao = None
+        if alteracao.anterior is not None:
+            posicao = self.lista.localizar(alteracao.anterior)
+        
+        if posicao is not None and atende and not self.ordem:
+            registros[posicao] = alteracao.cliente
+            return
+        if posicao is not None:
+            del registros[posicao]
+            self.ativos_exibidos -= 1
+        if atende:
+            if self.ordem:
+                coluna, decrescente = self.ordem
+                posicao = posicao_na_ordem(registros, alteracao.cliente,
+                                           self.CAMPOS_COLUNAS[coluna], decrescente)
+            else:
+                posicao = self.ativos_exibidos
+            registros.insert(posicao, alteracao.cliente)
+            self.ativos_exibidos += 1
+    
+    def ordenar_por(self, coluna):
+        """Ordena pela coluna clicada; um novo clique inverte a ordem"""
+        if self.ordem and self.ordem[0] == coluna:
+            self.ordem = (coluna, not self.ordem[1])
+        else:
+            self.ordem = (coluna, False)
+        
+        for col in self.CAMPOS_COLUNAS:
+            seta = (' ▼' if self.ordem[1] else ' ▲') if col == coluna else ''
+            self.tree.heading(col, text=col + seta)
+        self.lista.inicio = 0
+        self.buscar_clientes()
+    
+    def formatar_linha(self, cliente):
+        """Valores exibidos na linha do cliente"""
+        return (
+            cliente.nome, cliente.data_entrada, cliente.telefone,
+            cliente.cidade, cliente.placa, cliente.cor,
+            cliente.modelo, cliente.servico
+        )
+    
     def atualizar_lista(self):
         """Atualiza a lista de clientes"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        for indice, cliente in self.gerenciador.obter_todos_clientes():
-            self.tree.insert('', 'end', values=(
-                cliente.nome, cliente.data_entrada, cliente.telefone,
-                cliente.cidade, cliente.placa, cliente.cor,
-                cliente.modelo, cliente.servico
-            ))
+        # A lista virtual lê direto da lista do gerenciador, sem copiá-la
+        if self.ordem:
+            coluna, decrescente = self.ordem
+            registros = self.gerenciador.ordenados_por(self.CAMPOS_COLUNAS[coluna], decrescente)
+        else:
+            registros = self.gerenciador.clientes
+        self.resultado_busca = None
+        self.lista.definir_registros(registros)
         
         self.atualizar_estatisticas()
 
 def main():
+    # Diagnóstico: python main.py --diagnostico (ou AUTOMASTER_DIAGNOSTICO=1)
+    diagnostico = '--diagnostico' in sys.argv or bool(os.environ.get('AUTOMASTER_DIAGNOSTICO'))
+    
     root = tk.Tk()
-    app = ModernOficinaApp(root)
+    app = ModernOficinaApp(root, diagnostico=diagnostico)
     root.mainloop()
+    
+    if app.instrumentacao:
+        app.instrumentacao.gravar('diagnostico.json')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""Funções comuns aos testes"""
+import shutil
+import tempfile
+import unittest
+
+from Program.cliente import Cliente
+
+
+def novo_cliente(nome: str, placa: str, telefone: str = "(11) 99999-8888",
+                 cidade: str = "Campinas", data_entrada: str = "15/01/2026", **campos) -> Cliente:
+    """Cliente válido com os campos não informados preenchidos"""
+    return Cliente(nome=nome, telefone=telefone, cidade=cidade, placa=placa,
+                   cor=campos.get('cor', "Preto"), modelo=campos.get('modelo', "VW Gol"),
+                   servico=campos.get('servico', "Freios"), data_entrada=data_entrada,
+                   id=campos.get('id'))
+
+
+class TesteComDiretorio(unittest.TestCase):
+    """Caso de teste com um diretório temporário, apagado ao final"""
+
+    def setUp(self):
+        self.diretorio = tempfile.mkdtemp(prefix='automaster-')
+        self.addCleanup(shutil.rmtree, self.diretorio, ignore_errors=True)
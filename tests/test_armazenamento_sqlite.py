@@ -0,0 +1,55 @@
+import os
+
+from Program.armazenamento_sqlite import GerenciadorClientesSQLite
+from Program.cliente import GerenciadorClientes
+from tests.auxiliares import TesteComDiretorio, novo_cliente
+
+CLIENTES = [
+    ("João Conceição", "ABC1I23", "(11) 98765-4321"),
+    ("Joana Lima", "XYZ0O99", "(19) 3232-1010"),
+    ("Ênio Araújo", "OIO1234", "(11) 3333-4444"),
+    ("Maria 50%_x", "MAR5000", "(21) 99999-0000"),
+]
+
+TERMOS = ["joao", "JOÃO", "conceicao", "abc1123", "abci", "xyz00", "xyzoo", "oio",
+          "enio", "Araujo", "98765", "(11) 9876", "987654321", "11", "4", "(19",
+          "50%", "%", "_x", "a", "", "lima 19"]
+
+
+class TesteBuscaSQLite(TesteComDiretorio):
+    """A busca no SQLite encontra os mesmos clientes que a do GerenciadorClientes"""
+
+    def setUp(self):
+        super().setUp()
+        self.memoria = GerenciadorClientes(os.path.join(self.diretorio, 'clientes.json'))
+        self.sqlite = GerenciadorClientesSQLite(os.path.join(self.diretorio, 'clientes.db'))
+        self.addCleanup(self.sqlite.fechar)
+        for nome, placa, telefone in CLIENTES:
+            cliente = novo_cliente(nome, placa, telefone=telefone)
+            self.assertTrue(self.memoria.adicionar_cliente(cliente))
+            self.assertTrue(self.sqlite.adicionar_cliente(cliente))
+
+    @staticmethod
+    def ids(resultados):
+        return sorted(cliente.id for _, cliente in resultados)
+
+    def conferir(self):
+        for termo in TERMOS:
+            with self.subTest(termo=termo):
+                esperado = self.ids(self.memoria.buscar_cliente(termo))
+                self.assertEqual(self.ids(self.sqlite.buscar_cliente(termo)), esperado)
+                self.assertEqual(self.sqlite.contar_busca(termo), len(esperado))
+
+    def test_mesmos_resultados_com_indice_textual(self):
+        self.conferir()
+
+    def test_mesmos_resultados_sem_indice_textual(self):
+        self.sqlite.busca_textual = False
+        self.conferir()
+
+    def test_edicao_atualiza_a_busca(self):
+        cliente = self.sqlite.obter_por_placa("XYZ0O99")
+        editado = novo_cliente("Joana Conceição", cliente.placa, id=cliente.id)
+        self.assertTrue(self.sqlite.editar_cliente_por_id(cliente.id, editado))
+        self.assertTrue(self.memoria.editar_cliente_por_id(cliente.id, editado))
+        self.conferir()
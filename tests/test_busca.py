@@ -0,0 +1,195 @@
+import os
+import random
+import unittest
+
+from Program.cliente import GerenciadorClientes
+from Program.consulta import interpretar_consulta
+from Program.texto import apenas_digitos, normalizar
+from tests.auxiliares import TesteComDiretorio, novo_cliente
+
+
+class TesteCorrespondencia(TesteComDiretorio):
+    """corresponde_* confere um cliente pelo mesmo critério da busca correspondente"""
+
+    def setUp(self):
+        super().setUp()
+        self.gerenciador = GerenciadorClientes(os.path.join(self.diretorio, 'clientes.json'))
+        for nome, placa, telefone in [
+                ("João Silva", "ABC1D23", "(11) 98765-4321"),
+                ("Joana Souza", "ABD1D23", "(19) 98765-4321"),
+                ("Maria Oliveira", "XYZ9O87", "(11) 3333-2222"),
+                ("Marta Olivera", "XYZ9087", "+55 11 3333-2222"),
+                ("Ana", "QWE1234", "")]:
+            self.gerenciador.adicionar_cliente(novo_cliente(nome, placa, telefone))
+
+    def conferir(self):
+        for termo in ("joao", "jaoo silva", "mraia", "oliveira", "abc1d2e", "xyz9o8",
+                      "an", "ane", "qwe1235 ana"):
+            with self.subTest(termo=termo):
+                encontrados = {cliente for _, cliente in self.gerenciador.buscar_aproximado(termo)}
+                self.assertEqual({cliente for cliente in self.gerenciador.clientes
+                                  if self.gerenciador.corresponde_aproximado(termo, cliente)},
+                                 encontrados)
+        for telefone in ("11987654321", "987654321", "5511987654321", "33332222", "3333222"):
+            with self.subTest(telefone=telefone):
+                encontrados = {cliente for _, cliente in self.gerenciador.buscar_telefone(telefone)}
+                self.assertEqual({cliente for cliente in self.gerenciador.clientes
+                                  if self.gerenciador.corresponde_telefone(telefone, cliente)},
+                                 encontrados)
+
+    def test_mesmos_clientes_que_a_busca(self):
+        self.conferir()
+
+    def test_mesmos_clientes_depois_de_editar_e_remover(self):
+        self.gerenciador.buscar_aproximado("joao")  # Cria os índices antes das alterações
+        joana = self.gerenciador.obter_por_placa("ABD1D23")
+        self.gerenciador.editar_cliente_por_id(
+            joana.id, novo_cliente("Joaquim", "ABC1D24", "(11) 3333-2222", id=joana.id))
+        self.gerenciador.remover_cliente_por_id(self.gerenciador.obter_por_placa("XYZ9O87").id)
+        self.conferir()
+
+
+class TesteConsultaForcaBruta(TesteComDiretorio):
+    """consultar comparado com os critérios verificados cliente a cliente"""
+
+    CONSULTAS = ("cidade:campinas", "cidade:\"sao paulo\" cor:pre",
+                 "servico:oleo data:>=01/02/2026",
+                 "data:01/01/2026..31/03/2026 modelo:gol", "nome:jo placa:ab", "placa:0i",
+                 "tel:9876", "telefone:abc", "jo", "abc0", "9876 cidade:campinas",
+                 "data:<15/02/2026 servico:freios nome:silva", "entrada:10/01/2026")
+
+    def setUp(self):
+        super().setUp()
+        self.sorteio = random.Random(19)
+        self.gerenciador = GerenciadorClientes(os.path.join(self.diretorio, 'clientes.json'))
+        for numero in range(150):
+            self.assertTrue(self.gerenciador.adicionar_cliente(self.sortear(numero)))
+
+    def sortear(self, numero, id=None):
+        sorteio = self.sorteio
+        return novo_cliente(
+            f"{sorteio.choice(['João', 'Joana', 'Maria', 'José'])} "
+            f"{sorteio.choice(['Silva', 'Souza', 'Conceição'])}",
+            f"{sorteio.choice(['ABC', 'ABD', 'XOI'])}{numero // 100}"
+            f"{sorteio.choice('A0I')}{numero % 100:02d}",
+            f"(11) 9{sorteio.randint(8000, 9999)}-{sorteio.randint(1000, 9999)}",
+            sorteio.choice(["Campinas", "São Paulo", "Sumaré"]),
+            f"{sorteio.randint(1, 28):02d}/{sorteio.randint(1, 4):02d}/2026",
+            cor=sorteio.choice(["Preto", "Prata", "Branco"]),
+            modelo=sorteio.choice(["VW Gol", "Fiat Uno", "Gol G5"]),
+            servico=sorteio.choice(["Freios", "Troca de Óleo", "Suspensão"]), id=id)
+
+    def conferir(self):
+        for consulta in self.CONSULTAS:
+            with self.subTest(consulta=consulta):
+                criterios = interpretar_consulta(consulta)
+                esperado = [(posicao, cliente)
+                            for posicao, cliente in enumerate(self.gerenciador.clientes)
+                            if all(criterio.aceita(cliente) for criterio in criterios)]
+                self.assertEqual(self.gerenciador.consultar(consulta), esperado)
+
+    def test_mesmos_clientes_que_a_verificacao_direta(self):
+        self.conferir()
+
+    def test_mesmos_clientes_depois_de_incluir_editar_e_remover(self):
+        self.conferir()  # Cria os índices dos campos antes das alterações
+        for cliente in self.sorteio.sample(self.gerenciador.clientes, 40):
+            self.gerenciador.remover_cliente_por_id(cliente.id)
+        for numero, cliente in enumerate(self.sorteio.sample(self.gerenciador.clientes, 40)):
+            editado = self.sortear(200 + numero, id=cliente.id)
+            self.assertTrue(self.gerenciador.editar_cliente_por_id(cliente.id, editado))
+        for numero in range(300, 320):
+            self.assertTrue(self.gerenciador.adicionar_cliente(self.sortear(numero)))
+        self.conferir()
+
+
+class TesteTelefoneForcaBruta(TesteComDiretorio):
+    """buscar_telefone comparado com os telefones conferidos cliente a cliente"""
+
+    TELEFONES = ("(11) 98765-4321", "98765-4321", "+55 11 98765-4321", "(21) 98765-4321",
+                 "(11) 3333-2222", "3333-2222", "(19) 3333-2222", "8765-4321", "")
+
+    def setUp(self):
+        super().setUp()
+        self.sorteio = random.Random(24)
+        self.gerenciador = GerenciadorClientes(os.path.join(self.diretorio, 'clientes.json'))
+        for numero in range(60):
+            self.assertTrue(self.gerenciador.adicionar_cliente(self.sortear(numero)))
+
+    def sortear(self, numero, id=None):
+        return novo_cliente(f"Cliente {numero}", f"ABC{numero:04d}",
+                            self.sorteio.choice(self.TELEFONES), id=id)
+
+    def conferir(self):
+        for telefone in self.TELEFONES + ("11987654321", "4321"):
+            procurado = apenas_digitos(telefone)
+            esperado = []
+            for posicao, cliente in enumerate(self.gerenciador.clientes):
+                numero = apenas_digitos(cliente.telefone)
+                if not procurado or not numero:
+                    continue
+                if len(procurado) < 8 or len(numero) < 8:
+                    mesmo = procurado == numero
+                else:
+                    mesmo = numero.endswith(procurado) or procurado.endswith(numero)
+                if mesmo:
+                    esperado.append((posicao, cliente))
+            with self.subTest(telefone=telefone):
+                self.assertEqual(self.gerenciador.buscar_telefone(telefone), esperado)
+
+    def test_mesmos_clientes_depois_de_editar_e_remover(self):
+        self.conferir()
+        for cliente in self.sorteio.sample(self.gerenciador.clientes, 20):
+            self.gerenciador.remover_cliente_por_id(cliente.id)
+        for numero, cliente in enumerate(self.sorteio.sample(self.gerenciador.clientes, 20)):
+            editado = self.sortear(100 + numero, id=cliente.id)
+            self.assertTrue(self.gerenciador.editar_cliente_por_id(cliente.id, editado))
+        self.conferir()
+
+
+class TesteSugestoesForcaBruta(TesteComDiretorio):
+    """sugerir comparado com a contagem das cidades de todos os clientes"""
+
+    CIDADES = ("Campinas", "campinas", "Campo Limpo", "Camaçari", "Cambé", "Cajamar",
+               "Caieiras", "Cabo Frio", "Cachoeira", "Caçapava", "Cássia", "Canoas",
+               "São Paulo", "Santos", "Sumaré", "sao paulo")
+
+    def setUp(self):
+        super().setUp()
+        self.sorteio = random.Random(25)
+        self.gerenciador = GerenciadorClientes(os.path.join(self.diretorio, 'clientes.json'))
+        for numero in range(120):
+            self.assertTrue(self.gerenciador.adicionar_cliente(self.sortear(numero)))
+
+    def sortear(self, numero, id=None):
+        return novo_cliente(f"Cliente {numero}", f"ABC{numero:04d}",
+                            cidade=self.sorteio.choice(self.CIDADES), id=id)
+
+    def conferir(self):
+        usos = {}
+        for cliente in self.gerenciador.clientes:
+            grafias = usos.setdefault(normalizar(cliente.cidade), {})
+            grafias[cliente.cidade] = grafias.get(cliente.cidade, 0) + 1
+        for prefixo in ("", "c", "Ca", "cam", "ca", "SÃO", "s", "x"):
+            with self.subTest(prefixo=prefixo):
+                esperado = sorted((-sum(grafias.values()), chave) for chave, grafias in usos.items()
+                                  if chave.startswith(normalizar(prefixo)))[:10]
+                sugeridas = self.gerenciador.sugerir('cidade', prefixo)
+                self.assertEqual([normalizar(sugerida) for sugerida in sugeridas],
+                                 [chave for _, chave in esperado])
+                for sugerida in sugeridas:
+                    grafias = usos[normalizar(sugerida)]
+                    self.assertEqual(grafias[sugerida], max(grafias.values()))
+
+    def test_mesmas_sugestoes_depois_de_editar_e_remover(self):
+        self.conferir()  # Cria as sugestões antes das alterações
+        for cliente in self.sorteio.sample(self.gerenciador.clientes, 50):
+            self.gerenciador.remover_cliente_por_id(cliente.id)
+        for numero, cliente in enumerate(self.sorteio.sample(self.gerenciador.clientes, 40)):
+            editado = self.sortear(200 + numero, id=cliente.id)
+            self.assertTrue(self.gerenciador.editar_cliente_por_id(cliente.id, editado))
+        self.conferir()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import json
+import os
+
+from Program.cliente import Cliente, GerenciadorClientes
+from tests.auxiliares import TesteComDiretorio
+
+REGISTRO = {"id": "a1", "nome": "Ana", "telefone": "(11) 99999-8888", "cidade": None,
+            "placa": "aaa1111", "cor": None, "modelo": "Uno", "servico": "Freios",
+            "data_entrada": "15/01/2026"}
+
+
+class TesteCamposNulos(TesteComDiretorio):
+    """Arquivos editados à mão, com campos nulos ou numéricos"""
+
+    def test_from_dict_converte_nulos_e_numeros_em_texto(self):
+        cliente = Cliente.from_dict(dict(REGISTRO, telefone=11999998888))
+        self.assertEqual((cliente.cidade, cliente.cor, cliente.telefone, cliente.placa),
+                         ("", "", "11999998888", "AAA1111"))
+
+    def test_construtor_aceita_valores_que_nao_sao_texto(self):
+        cliente = Cliente("Ana", "1", None, "AAA1111", None, "Uno", "Freios", "15/01/2026")
+        self.assertIsNone(cliente.cidade)
+
+    def test_arquivo_com_campos_nulos_abre(self):
+        arquivo = os.path.join(self.diretorio, 'clientes.json')
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            json.dump([REGISTRO], f)
+        gerenciador = GerenciadorClientes(arquivo)
+        self.assertEqual(gerenciador.total_clientes(), 1)
+        self.assertEqual(len(gerenciador.buscar_cliente("ana")), 1)
+        self.assertEqual(gerenciador.consultar("cidade:campinas"), [])
+        self.assertTrue(gerenciador.salvar_dados())
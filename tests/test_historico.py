@@ -0,0 +1,142 @@
+import os
+from datetime import date
+
+from Program.cliente import GerenciadorClientes
+from Program.historico import HistoricoClientes
+from tests.auxiliares import TesteComDiretorio, novo_cliente
+
+HOJE = date(2026, 1, 31)
+
+
+class TesteHistorico(TesteComDiretorio):
+
+    def setUp(self):
+        super().setUp()
+        self.arquivo = os.path.join(self.diretorio, 'clientes.json')
+        gerenciador = GerenciadorClientes(self.arquivo)
+        clientes = [
+            novo_cliente("Ana Antiga", "ANA1A11", telefone="(11) 91111-1111",
+                         data_entrada="10/01/2020"),
+            novo_cliente("Bruno Antigo", "BRU2B22", telefone="(19) 92222-2222",
+                         cidade="Santos", data_entrada="20/02/2020"),
+            novo_cliente("Carla Antiga", "CAR3C33", data_entrada="05/03/2021"),
+            novo_cliente("Daniel Atual", "DAN4D44", data_entrada="15/01/2026"),
+        ]
+        for cliente in clientes:
+            self.assertTrue(gerenciador.adicionar_cliente(cliente))
+        self.assertEqual(gerenciador.arquivar_antigos(365, hoje=HOJE), 3)
+        self.gerenciador = GerenciadorClientes(self.arquivo)
+
+    def placas(self, resultados):
+        return [(indice, cliente.placa) for indice, cliente in resultados]
+
+    def test_antigos_saem_do_arquivo_principal(self):
+        self.assertEqual([c.nome for c in self.gerenciador.clientes], ["Daniel Atual"])
+        self.assertEqual(sorted(os.listdir(self.arquivo + '.historico')),
+                         ['2020-01.json.gz', '2020-02.json.gz', '2021-03.json.gz',
+                          'indice.json.gz', 'manifesto.json'])
+        self.assertEqual(self.gerenciador.historico.total, 3)
+
+    def test_busca_encontra_arquivados_depois_dos_ativos(self):
+        self.assertEqual(self.placas(self.gerenciador.buscar_cliente("antig")),
+                         [(None, "ANA1A11"), (None, "BRU2B22"), (None, "CAR3C33")])
+        self.assertEqual(self.placas(self.gerenciador.buscar_cliente("a")),
+                         [(0, "DAN4D44")])  # Curto demais: só a lista principal
+        self.assertEqual(self.placas(self.gerenciador.buscar_cliente("92222")),
+                         [(None, "BRU2B22")])
+
+    def test_busca_so_abre_os_meses_com_o_termo(self):
+        historico = self.gerenciador.historico
+        self.gerenciador.buscar_cliente("bruno")
+        self.assertEqual([mes for mes, segmento in historico.segmentos.items()
+                          if segmento.carregado], [(2020, 2)])
+        self.gerenciador.buscar_cliente("xyzw")
+        self.assertEqual(sum(s.carregado for s in historico.segmentos.values()), 1)
+
+    def test_prefixo_curto_em_cache_nao_esconde_o_historico(self):
+        self.gerenciador.buscar_cliente("an")
+        self.assertEqual(self.placas(self.gerenciador.buscar_cliente("ana")),
+                         [(None, "ANA1A11")])
+
+    def test_consulta_usa_resumo_e_datas(self):
+        historico = self.gerenciador.historico
+        self.assertEqual(self.placas(self.gerenciador.consultar("cidade:santos")),
+                         [(None, "BRU2B22")])
+        self.assertEqual([mes for mes, s in historico.segmentos.items() if s.carregado],
+                         [(2020, 2)])
+        self.assertEqual(self.placas(self.gerenciador.consultar("data:01/03/2021..31/03/2021")),
+                         [(None, "CAR3C33")])
+        self.assertEqual(self.gerenciador.contar_no_periodo("01/01/2020", "31/12/2020"), 2)
+
+    def test_segmentos_usados_ha_mais_tempo_sao_descartados(self):
+        historico = self.gerenciador.historico
+        historico.MAXIMO_CARREGADOS = 2
+        self.gerenciador.buscar_cliente("antig")
+        self.assertEqual([mes for mes, s in historico.segmentos.items() if s.carregado],
+                         [(2020, 2), (2021, 3)])
+        # Um segmento descartado é lido de novo quando preciso
+        self.assertEqual(self.placas(self.gerenciador.buscar_cliente("ana antiga")),
+                         [(None, "ANA1A11")])
+
+    def test_estatisticas_incluem_o_historico_sem_abrir_segmentos(self):
+        estatisticas = self.gerenciador.estatisticas
+        self.assertEqual(estatisticas.entradas_no_mes(2020, 2), 1)
+        self.assertEqual(estatisticas.todos_por_cidade()["Campinas"], 3)
+        self.assertFalse(any(s.carregado for s in self.gerenciador.historico.segmentos.values()))
+
+    def test_indice_e_refeito_se_estiver_faltando_ou_desatualizado(self):
+        diretorio = self.arquivo + '.historico'
+        os.remove(os.path.join(diretorio, 'indice.json.gz'))
+        historico = HistoricoClientes(diretorio, self.gerenciador.historico.fabrica,
+                                      self.gerenciador.historico.chaves)
+        self.assertEqual(historico.meses_com(nome="bruno"), {(2020, 2)})
+        self.assertTrue(os.path.exists(os.path.join(diretorio, 'indice.json.gz')))
+
+        # Segmento regravado sem atualizar o índice (gravação interrompida)
+        historico.arquivar([novo_cliente("Bruna Nova", "BRN5E55", data_entrada="01/01/2020")])
+        os.utime(os.path.join(diretorio, '2020-01.json.gz'), ns=(0, 0))
+        reaberto = HistoricoClientes(diretorio, historico.fabrica, historico.chaves)
+        self.assertEqual(reaberto.meses_com(nome="brun"), {(2020, 1), (2020, 2)})
+
+    def test_arquivar_de_novo_substitui_pelo_id(self):
+        ana = next(cliente for cliente, _ in self.gerenciador.historico.registros()
+                   if cliente.placa == "ANA1A11")
+        editada = novo_cliente("Ana Editada", "ANA1A11", data_entrada="10/01/2020", id=ana.id)
+        self.gerenciador.historico.arquivar([editada])
+        self.assertEqual(self.placas(self.gerenciador.buscar_cliente("ana antiga")), [])
+        self.assertEqual(self.placas(self.gerenciador.buscar_cliente("ana editada")),
+                         [(None, "ANA1A11")])
+        self.assertEqual(self.gerenciador.historico.total, 3)
+
+    def test_placa_arquivada_nao_e_cadastrada_de_novo(self):
+        self.assertFalse(self.gerenciador.adicionar_cliente(novo_cliente("Outra", "ANA1A11")))
+        daniel = self.gerenciador.obter_por_placa("DAN4D44")
+        editado = novo_cliente("Daniel", "BRU2B22", id=daniel.id)
+        self.assertFalse(self.gerenciador.editar_cliente_por_id(daniel.id, editado))
+        self.assertTrue(self.gerenciador.adicionar_cliente(novo_cliente("Nova", "NOV9N99")))
+        self.assertEqual(self.gerenciador.total_clientes(), 2)
+
+    def test_lote_recusa_placas_e_ids_arquivados(self):
+        carla = next(cliente for cliente, _ in self.gerenciador.historico.registros()
+                     if cliente.placa == "CAR3C33")
+        lote = [novo_cliente("Placa antiga", "BRU2B22"),
+                novo_cliente("Id antigo", "IDA7I77", id=carla.id),
+                novo_cliente("Nova", "NOV9N99")]
+        adicionados, recusados = self.gerenciador.adicionar_clientes_em_lote(lote)
+        self.assertEqual(adicionados, 1)
+        self.assertEqual([cliente.nome for cliente in recusados], ["Placa antiga", "Id antigo"])
+
+    def test_duas_estacoes_arquivando_nao_perdem_clientes(self):
+        diretorio = self.arquivo + '.historico'
+        historico = self.gerenciador.historico
+        self.gerenciador.buscar_cliente("bruno")  # deixa 2020-02 em memória
+        outra = HistoricoClientes(diretorio, historico.fabrica, historico.chaves)
+        outra.arquivar([novo_cliente("Eva Outra", "EVA5E55", data_entrada="12/02/2020")])
+        historico.arquivar([novo_cliente("Fabio Este", "FAB6F66", data_entrada="13/02/2020")])
+
+        reaberto = HistoricoClientes(diretorio, historico.fabrica, historico.chaves)
+        self.assertEqual(reaberto.total, 5)
+        self.assertEqual(sorted(cliente.nome for cliente, _ in reaberto.registros()),
+                         ["Ana Antiga", "Bruno Antigo", "Carla Antiga", "Eva Outra",
+                          "Fabio Este"])
+        self.assertEqual(reaberto.meses_com(nome="eva outra"), {(2020, 2)})
@@ -0,0 +1,50 @@
+import os
+from unittest import mock
+
+from Program.cliente import GerenciadorClientes
+from Program.importacao import importar_registros
+from tests.auxiliares import TesteComDiretorio
+
+
+def registro(nome, placa, **campos):
+    dados = dict(nome=nome, telefone="(11) 99999-8888", cidade="Campinas", placa=placa,
+                 cor="Preto", modelo="Fiat Uno", servico="Freios", data_entrada="15/01/2026")
+    dados.update(campos)
+    return dados
+
+
+class TesteImportacao(TesteComDiretorio):
+
+    def setUp(self):
+        super().setUp()
+        self.gerenciador = GerenciadorClientes(os.path.join(self.diretorio, 'clientes.json'))
+
+    def test_ids_repetidos_sao_relatados_na_linha_certa(self):
+        relatorio = importar_registros(self.gerenciador, [
+            registro("Ana", "AAA1111", id="x1"),
+            registro("Bruno", "BBB2222", id="x1"),
+            registro("Carla", "AAA1111"),
+        ])
+        self.assertEqual(relatorio.adicionados, 1)
+        self.assertEqual(relatorio.rejeitados, [(2, ["Id repetido no arquivo"]),
+                                                (3, ["Placa repetida no arquivo"])])
+        self.assertIsNone(relatorio.erro)
+
+    def test_recusados_pelo_gerenciador_com_o_motivo(self):
+        importar_registros(self.gerenciador, [registro("Ana", "AAA1111", id="x1")])
+        relatorio = importar_registros(self.gerenciador, [
+            registro("Bruno", "BBB2222"),
+            registro("Ana de novo", "CCC3333", id="x1"),
+            registro("Outra Ana", "AAA1111"),
+        ])
+        self.assertEqual(relatorio.adicionados, 1)
+        self.assertEqual(relatorio.rejeitados, [(2, ["Já existe um cliente com este id"]),
+                                                (3, ["Já existe um cliente com esta placa"])])
+
+    def test_falha_na_gravacao_e_relatada(self):
+        with mock.patch.object(self.gerenciador, 'salvar_dados', return_value=False):
+            relatorio = importar_registros(self.gerenciador, [registro("Ana", "AAA1111")])
+        self.assertEqual(relatorio.adicionados, 0)
+        self.assertIsNotNone(relatorio.erro)
+        self.assertIn(relatorio.erro, relatorio.resumo())
+        self.assertEqual(self.gerenciador.total_clientes(), 0)
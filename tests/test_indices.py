@@ -0,0 +1,239 @@
+import random
+import unittest
+
+from Program.indices import (ArvoreBK, IndiceSegmentos, IndiceTelefones, IndiceValores,
+                              TrieSugestoes, distancia_edicao)
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Distância de edição pela tabela de programação dinâmica, célula a célula"""
+    anterior = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        atual = [i]
+        for j, y in enumerate(b, 1):
+            atual.append(min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (x != y)))
+        anterior = atual
+    return anterior[-1]
+
+
+def textos_aleatorios(sorteio: random.Random, quantidade: int, letras: str = "abcde",
+                      minimo: int = 1, maximo: int = 8):
+    return [''.join(sorteio.choice(letras) for _ in range(sorteio.randint(minimo, maximo)))
+            for _ in range(quantidade)]
+
+
+class TesteIndicesAproximados(unittest.TestCase):
+    """ArvoreBK e IndiceSegmentos comparados com a distância calculada texto a texto"""
+
+    def setUp(self):
+        self.sorteio = random.Random(18)
+
+    def test_distancia_edicao(self):
+        textos = textos_aleatorios(self.sorteio, 60, maximo=12) + ['']
+        for a in textos:
+            for b in textos:
+                self.assertEqual(distancia_edicao(a, b), levenshtein(a, b), (a, b))
+
+    def conferir(self, indice, valores, termos, maximos):
+        """Compara o índice com o texto a texto; valores: valor -> texto atual"""
+        for termo in termos:
+            for maximo in maximos:
+                esperado = {}
+                for valor, texto in valores.items():
+                    distancia = levenshtein(termo, texto)
+                    if distancia <= maximo:
+                        esperado.setdefault(texto, (distancia, set()))[1].add(valor)
+                encontrado = {texto: (distancia, set(chaves))
+                              for distancia, texto, chaves in indice.buscar(termo, maximo)}
+                self.assertEqual(encontrado, esperado, (termo, maximo))
+
+    def alterar(self, indice, valores, textos):
+        """Remove alguns valores e troca o texto de outros, como numa edição"""
+        for valor in self.sorteio.sample(sorted(valores), len(valores) // 3):
+            indice.remover(valores.pop(valor), valor)
+        for valor in self.sorteio.sample(sorted(valores), len(valores) // 3):
+            indice.remover(valores[valor], valor)
+            valores[valor] = self.sorteio.choice(textos)
+            indice.adicionar(valores[valor], valor)
+
+    def test_arvore_bk(self):
+        textos = textos_aleatorios(self.sorteio, 80)
+        arvore = ArvoreBK()
+        valores = {}
+        for valor in range(200):
+            valores[valor] = self.sorteio.choice(textos)
+            arvore.adicionar(valores[valor], valor)
+        termos = textos_aleatorios(self.sorteio, 25)
+        self.conferir(arvore, valores, termos, (0, 1, 2, 3))
+        self.alterar(arvore, valores, textos + textos_aleatorios(self.sorteio, 20))
+        self.conferir(arvore, valores, termos, (0, 1, 2, 3))
+
+    def test_indice_segmentos(self):
+        # Textos de tamanho parecido, como placas
+        textos = textos_aleatorios(self.sorteio, 120, "abc01", 5, 8)
+        indice = IndiceSegmentos(maximo=2)
+        valores = {}
+        for valor in range(300):
+            valores[valor] = self.sorteio.choice(textos)
+            indice.adicionar(valores[valor], valor)
+        termos = textos_aleatorios(self.sorteio, 25, "abc01", 3, 9) + textos[:5]
+        self.conferir(indice, valores, termos, (0, 1, 2))
+        self.alterar(indice, valores, textos + textos_aleatorios(self.sorteio, 20, "abc01", 5, 8))
+        self.conferir(indice, valores, termos, (0, 1, 2))
+
+
+class TesteIndiceValores(unittest.TestCase):
+    """IndiceValores comparado com a verificação de cada chave"""
+
+    def conferir(self, indice, valores):
+        for minimo, maximo in ((0, 100), (10, 20), (15, 15), (30, 10), (95, 200)):
+            esperado = {chave for chave, valor in valores.items() if minimo <= valor <= maximo}
+            self.assertEqual(set().union(*indice.faixa(minimo, maximo)), esperado,
+                             (minimo, maximo))
+
+    def test_faixa_depois_de_remover_e_alterar(self):
+        sorteio = random.Random(19)
+        indice, valores = IndiceValores(), {}
+        for chave in range(300):
+            valores[chave] = sorteio.randint(0, 100)
+            indice.adicionar(valores[chave], chave)
+        self.conferir(indice, valores)
+        for chave in sorteio.sample(sorted(valores), 100):
+            indice.remover(valores.pop(chave), chave)
+        for chave in sorteio.sample(sorted(valores), 100):
+            indice.remover(valores[chave], chave)
+            valores[chave] = sorteio.randint(0, 100)
+            indice.adicionar(valores[chave], chave)
+        self.conferir(indice, valores)
+
+    def test_contendo(self):
+        sorteio = random.Random(19)
+        textos = textos_aleatorios(sorteio, 40, "abc", 1, 5)
+        indice, valores = IndiceValores(), {}
+        for chave in range(200):
+            valores[chave] = sorteio.choice(textos)
+            indice.adicionar(valores[chave], chave)
+        for chave in sorteio.sample(sorted(valores), 80):
+            indice.remover(valores.pop(chave), chave)
+        for trecho in ("a", "ab", "cab", "bbb", ""):
+            esperado = {chave for chave, texto in valores.items() if trecho in texto}
+            self.assertEqual(set().union(*indice.contendo(trecho)), esperado, trecho)
+
+
+def mesmo_telefone(procurado: str, numero: str) -> bool:
+    """Critério da busca de telefones, conferido número a número"""
+    if len(procurado) < IndiceTelefones.FINAL or len(numero) < IndiceTelefones.FINAL:
+        return procurado == numero
+    return numero.endswith(procurado) or procurado.endswith(numero)
+
+
+class TesteIndiceTelefones(unittest.TestCase):
+    """IndiceTelefones comparado com a comparação de cada número"""
+
+    def setUp(self):
+        sorteio = self.sorteio = random.Random(24)
+        finais = [f"{sorteio.randint(0, 99999999):08d}" for _ in range(15)]
+        self.numeros = [prefixo + final[-tamanho:] for final in finais
+                        for prefixo, tamanho in (('', 8), ('', 6), ('9', 8), ('119', 8),
+                                                 ('219', 8), ('55119', 8))]
+
+    def sortear(self):
+        return self.sorteio.choice(self.numeros)
+
+    def conferir(self, indice, telefones):
+        for procurado in self.numeros + ['', '1234']:
+            esperado = {chave for chave, numero in telefones.items()
+                        if procurado and mesmo_telefone(procurado, numero)}
+            self.assertEqual(indice.buscar(procurado), esperado, procurado)
+
+        grupos = indice.repetidos()
+        vistos = set()
+        for grupo in grupos:
+            self.assertGreater(len(grupo), 1)
+            self.assertFalse(grupo & vistos)
+            vistos |= grupo
+            maior = max((telefones[chave] for chave in grupo), key=len)
+            for chave in grupo:
+                self.assertTrue(mesmo_telefone(telefones[chave], maior), (grupo, maior))
+        for chave, numero in telefones.items():
+            outros = [outra for outra, outro in telefones.items() if outra != chave]
+            if any(telefones[outra] == numero for outra in outros):
+                grupo = next(grupo for grupo in grupos if chave in grupo)
+                self.assertTrue(all(outra in grupo for outra in outros
+                                    if telefones[outra] == numero))
+            if not any(mesmo_telefone(numero, telefones[outra]) for outra in outros):
+                self.assertNotIn(chave, vistos)
+
+    def test_busca_e_repetidos_depois_de_remover_e_alterar(self):
+        indice, telefones = IndiceTelefones(), {}
+        for chave in range(150):
+            telefones[chave] = self.sortear()
+            indice.adicionar(chave, telefones[chave])
+        self.conferir(indice, telefones)
+        for chave in self.sorteio.sample(sorted(telefones), 50):
+            indice.remover(chave, telefones.pop(chave))
+        for chave in self.sorteio.sample(sorted(telefones), 50):
+            indice.remover(chave, telefones[chave])
+            telefones[chave] = self.sortear()
+            indice.adicionar(chave, telefones[chave])
+        self.conferir(indice, telefones)
+
+
+class TesteTrieSugestoes(unittest.TestCase):
+    """TrieSugestoes comparada com a contagem de todos os textos"""
+
+    def setUp(self):
+        self.sorteio = random.Random(25)
+        self.chaves = textos_aleatorios(self.sorteio, 150, "abc", 1, 4)
+        self.prefixos = [''] + sorted(set(chave[:tamanho] for chave in self.chaves
+                                          for tamanho in (1, 2, 3)))
+
+    def conferir(self, trie, usos):
+        """usos: (chave, grafia) -> quantidade"""
+        frequencias, grafias = {}, {}
+        for (chave, grafia), quantidade in usos.items():
+            frequencias[chave] = frequencias.get(chave, 0) + quantidade
+            grafias.setdefault(chave, {})[grafia] = quantidade
+        self.assertEqual(len(trie), len(frequencias))
+        for prefixo in self.prefixos:
+            for limite in (3, TrieSugestoes.LIMITE):
+                esperado = sorted((-frequencia, chave) for chave, frequencia in frequencias.items()
+                                  if chave.startswith(prefixo))[:limite]
+                sugeridas = trie.sugerir(prefixo, limite)
+                self.assertEqual(len(sugeridas), len(esperado), prefixo)
+                for sugerida, (_, chave) in zip(sugeridas, esperado):
+                    # Grafias empatadas podem sair em qualquer ordem
+                    mais_usada = max(grafias[chave].values())
+                    self.assertEqual(grafias[chave].get(sugerida), mais_usada, (prefixo, chave))
+
+    def test_sugestoes_depois_de_incluir_e_remover(self):
+        trie, usos = TrieSugestoes(), {}
+
+        def alterar(chave, grafia, quantidade):
+            if quantidade > 0:
+                trie.adicionar(chave, grafia, quantidade)
+            else:
+                trie.remover(chave, grafia, -quantidade)
+            usos[chave, grafia] = usos.get((chave, grafia), 0) + quantidade
+            if not usos[chave, grafia]:
+                del usos[chave, grafia]
+
+        for _ in range(600):
+            chave = self.sorteio.choice(self.chaves)
+            alterar(chave, self.sorteio.choice([chave, chave.upper(), chave.title()]),
+                    self.sorteio.randint(1, 5))
+        self.conferir(trie, usos)
+        # Remove usos, até esgotar chaves inteiras, e inclui outros
+        for rodada in range(600):
+            if rodada % 3 == 2:
+                chave = self.sorteio.choice(self.chaves)
+                alterar(chave, chave.upper(), 1)
+            else:
+                chave, grafia = self.sorteio.choice(sorted(usos))
+                alterar(chave, grafia, -self.sorteio.randint(1, usos[chave, grafia]))
+            if rodada % 200 == 199:
+                self.conferir(trie, usos)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import unittest
+
+from Program.instrumentacao import Instrumentacao
+from tests.auxiliares import TesteComDiretorio
+
+
+class Operacoes:
+
+    def somar(self, a, b):
+        return a + b
+
+
+class TesteInstrumentacao(TesteComDiretorio):
+
+    def test_falha_ao_gravar_perfil_nao_impede_os_proximos(self):
+        # Um arquivo no lugar do diretório de perfis faz a gravação falhar
+        bloqueio = os.path.join(self.diretorio, 'perfis')
+        open(bloqueio, 'w').close()
+        instrumentacao = Instrumentacao(limiar_perfil_ms=0, diretorio_perfis=bloqueio)
+        operacoes = Operacoes()
+        instrumentacao.envolver(operacoes, ['somar'])
+
+        self.assertEqual(operacoes.somar(1, 2), 3)  # Marca o perfil como pendente
+        self.assertEqual(operacoes.somar(1, 2), 3)  # Perfilada; a gravação falha
+        self.assertEqual(instrumentacao.perfis_gravados, [])
+
+        instrumentacao.diretorio_perfis = os.path.join(self.diretorio, 'novos')
+        operacoes.somar(1, 2)
+        self.assertEqual(len(instrumentacao.perfis_gravados), 1)
+        self.assertEqual(instrumentacao.histogramas['somar'].resumo()['chamadas'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
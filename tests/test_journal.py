@@ -0,0 +1,122 @@
+import os
+import threading
+
+from Program.cliente import GerenciadorClientes
+from Program.gravacao import GravadorEmSegundoPlano
+from Program.journal import Journal
+from tests.auxiliares import TesteComDiretorio, novo_cliente
+
+
+class TesteJournal(TesteComDiretorio):
+
+    def setUp(self):
+        super().setUp()
+        self.caminho = os.path.join(self.diretorio, 'clientes.json.journal')
+
+    def test_operacoes_sao_lidas_para_o_mesmo_snapshot(self):
+        journal = Journal(self.caminho)
+        journal.iniciar('10:0000abcd')
+        journal.registrar({'op': 'remover', 'id': 'x'})
+        journal.registrar({'op': 'remover', 'id': 'y'})
+        outro = Journal(self.caminho)
+        self.assertEqual([op['id'] for op in outro.ler('10:0000abcd')], ['x', 'y'])
+        self.assertEqual(outro.total_operacoes, 2)
+
+    def test_diario_de_outro_snapshot_e_descartado(self):
+        journal = Journal(self.caminho)
+        journal.iniciar('10:0000abcd')
+        journal.registrar({'op': 'remover', 'id': 'x'})
+        self.assertEqual(Journal(self.caminho).ler('20:0000beef'), [])
+        # O diário foi reiniciado para o snapshot atual
+        self.assertEqual(Journal(self.caminho).ler('10:0000abcd'), [])
+
+    def test_linha_incompleta_e_truncada(self):
+        journal = Journal(self.caminho)
+        journal.iniciar('10:0000abcd')
+        journal.registrar({'op': 'remover', 'id': 'x'})
+        tamanho_valido = os.path.getsize(self.caminho)
+        with open(self.caminho, 'ab') as f:
+            f.write(b'{"op": "remover", "i')  # Gravação interrompida
+        self.assertEqual([op['id'] for op in Journal(self.caminho).ler('10:0000abcd')], ['x'])
+        self.assertEqual(os.path.getsize(self.caminho), tamanho_valido)
+
+    def test_linha_corrompida_descarta_o_restante(self):
+        journal = Journal(self.caminho)
+        journal.iniciar('10:0000abcd')
+        journal.registrar({'op': 'remover', 'id': 'x'})
+        with open(self.caminho, 'ab') as f:
+            f.write(b'\xff\xfe lixo\n{"op": "remover", "id": "y"}\n')
+        self.assertEqual([op['id'] for op in Journal(self.caminho).ler('10:0000abcd')], ['x'])
+
+
+class TesteModoJournal(TesteComDiretorio):
+
+    def setUp(self):
+        super().setUp()
+        self.arquivo = os.path.join(self.diretorio, 'clientes.json')
+
+    def abrir(self, **opcoes):
+        return GerenciadorClientes(self.arquivo, modo_journal=True, **opcoes)
+
+    def test_alteracoes_sao_reaplicadas_ao_abrir(self):
+        gerenciador = self.abrir()
+        gerenciador.adicionar_cliente(novo_cliente("Ana", "AAA1111"))
+        gerenciador.adicionar_cliente(novo_cliente("Bia", "BBB2222"))
+        ana = gerenciador.obter_por_placa("AAA1111")
+        gerenciador.editar_cliente_por_id(ana.id, novo_cliente("Ana Maria", "AAA1111", id=ana.id))
+        gerenciador.remover_cliente_por_id(gerenciador.obter_por_placa("BBB2222").id)
+        self.assertFalse(os.path.exists(self.arquivo))  # Só o diário foi gravado
+
+        reaberto = self.abrir()
+        self.assertEqual([(c.id, c.nome) for c in reaberto.clientes], [(ana.id, "Ana Maria")])
+
+    def test_compactacao_reinicia_o_diario(self):
+        gerenciador = self.abrir(limite_compactacao=3)
+        for i in range(4):
+            gerenciador.adicionar_cliente(novo_cliente(f"Cliente {i}", f"ABC{i}D23"))
+        # A terceira operação compactou; só a quarta continua no diário
+        self.assertEqual(gerenciador.journal.total_operacoes, 1)
+        self.assertEqual(len(GerenciadorClientes(self.arquivo).clientes), 3)
+        self.assertEqual(len(self.abrir().clientes), 4)
+
+    def test_operacao_interrompida_e_ignorada(self):
+        gerenciador = self.abrir()
+        gerenciador.adicionar_cliente(novo_cliente("Ana", "AAA1111"))
+        with open(self.arquivo + '.journal', 'ab') as f:
+            f.write(b'{"op": "adicionar", "cliente": {"nome": "Bia"')
+        self.assertEqual([c.nome for c in self.abrir().clientes], ["Ana"])
+        self.assertEqual([c.nome for c in self.abrir().clientes], ["Ana"])
+
+
+class TesteGravacaoAdiada(TesteComDiretorio):
+
+    def setUp(self):
+        super().setUp()
+        self.arquivo = os.path.join(self.diretorio, 'clientes.json')
+
+    def abrir(self):
+        return GerenciadorClientes(self.arquivo, gravacao_adiada=True, atraso_gravacao=0)
+
+    def test_sem_diario_residual_nao_cria_diario(self):
+        gerenciador = self.abrir()
+        gerenciador.adicionar_cliente(novo_cliente("Ana", "AAA1111"))
+        self.assertTrue(gerenciador.fechar())
+        self.assertFalse(os.path.exists(self.arquivo + '.journal'))
+        self.assertEqual([c.nome for c in GerenciadorClientes(self.arquivo).clientes], ["Ana"])
+
+    def test_diario_residual_e_reaplicado_e_apagado(self):
+        GerenciadorClientes(self.arquivo, modo_journal=True).adicionar_cliente(
+            novo_cliente("Ana", "AAA1111"))
+        gerenciador = self.abrir()
+        self.assertEqual([c.nome for c in gerenciador.clientes], ["Ana"])
+        gerenciador.adicionar_cliente(novo_cliente("Bia", "BBB2222"))
+        self.assertTrue(gerenciador.fechar())
+        self.assertFalse(os.path.exists(self.arquivo + '.journal'))
+        self.assertEqual([c.nome for c in GerenciadorClientes(self.arquivo).clientes], ["Ana", "Bia"])
+
+    def test_falha_na_gravacao_chama_o_aviso(self):
+        falhou = threading.Event()
+        gravador = GravadorEmSegundoPlano(lambda: False, atraso=0, ao_falhar=falhou.set)
+        gravador.agendar()
+        self.assertTrue(falhou.wait(5))
+        self.assertFalse(gravador.encerrar(timeout=1))
@@ -0,0 +1,71 @@
+import random
+import unittest
+
+from Program.lista_virtual import SequenciaIndexada
+
+
+class Registro:
+    """Registro sem __eq__, como Cliente"""
+
+    def __init__(self, numero):
+        self.numero = numero
+
+
+class SequenciaPequena(SequenciaIndexada):
+    # Blocos pequenos para que os testes dividam e retirem blocos
+    TAMANHO_BLOCO = 4
+
+
+class TesteSequenciaIndexada(unittest.TestCase):
+
+    def conferir(self, sequencia, esperado):
+        self.assertEqual(len(sequencia), len(esperado))
+        self.assertEqual(list(sequencia), esperado)
+        for i, registro in enumerate(esperado):
+            self.assertIs(sequencia[i], registro)
+            self.assertEqual(sequencia.posicao(registro), i)
+
+    def test_acompanha_uma_lista_com_as_mesmas_alteracoes(self):
+        aleatorio = random.Random(7)
+        esperado = [Registro(i) for i in range(30)]
+        sequencia = SequenciaPequena(esperado)
+        for numero in range(30, 400):
+            operacao = aleatorio.random()
+            if operacao < 0.45 or not esperado:
+                posicao = aleatorio.randint(0, len(esperado))
+                registro = Registro(numero)
+                esperado.insert(posicao, registro)
+                sequencia.insert(posicao, registro)
+            elif operacao < 0.85:
+                posicao = aleatorio.randrange(len(esperado))
+                del esperado[posicao]
+                del sequencia[posicao]
+            else:
+                posicao = aleatorio.randrange(len(esperado))
+                esperado[posicao] = sequencia[posicao] = Registro(numero)
+            self.conferir(sequencia, esperado)
+
+    def test_retirados_e_trocados_nao_tem_posicao(self):
+        registros = [Registro(i) for i in range(10)]
+        sequencia = SequenciaPequena(registros)
+        del sequencia[3]
+        sequencia[0] = Registro(10)
+        self.assertIsNone(sequencia.posicao(registros[3]))
+        self.assertIsNone(sequencia.posicao(registros[0]))
+        self.assertNotIn(registros[0], sequencia)
+        self.assertEqual(sequencia.posicao(registros[4]), 3)
+
+    def test_esvaziar_e_incluir_de_novo(self):
+        registro = Registro(0)
+        sequencia = SequenciaPequena([registro])
+        del sequencia[0]
+        self.conferir(sequencia, [])
+        sequencia.insert(0, registro)
+        self.conferir(sequencia, [registro])
+        self.assertEqual(sequencia[-1:], [registro])
+        with self.assertRaises(IndexError):
+            sequencia[1]
+
+
+if __name__ == '__main__':
+    unittest.main()
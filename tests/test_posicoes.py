@@ -0,0 +1,50 @@
+import os
+import unittest
+
+from Program.cliente import GerenciadorClientes
+from Program.indices import PosicoesLista
+from tests.auxiliares import TesteComDiretorio, novo_cliente
+
+
+class TestePosicoesLista(unittest.TestCase):
+
+    def test_posicoes_seguem_a_lista_depois_de_remocoes(self):
+        lista = list("abcdef")
+        posicoes = PosicoesLista(lista)
+        for chave in ("b", "e", "a"):
+            del lista[posicoes.retirar(chave)]
+        lista.append("g")
+        posicoes.anexar("g")
+        self.assertEqual(lista, list("cdfg"))
+        self.assertEqual([posicoes[chave] for chave in lista], [0, 1, 2, 3])
+        self.assertNotIn("b", posicoes)
+        self.assertIsNone(posicoes.get("b"))
+
+    def test_substituir_mantem_a_posicao(self):
+        posicoes = PosicoesLista("abc")
+        posicoes.substituir("b", "x")
+        self.assertEqual(posicoes["x"], 1)
+        self.assertNotIn("b", posicoes)
+        self.assertEqual(len(posicoes), 3)
+
+
+class TestePosicoesGerenciador(TesteComDiretorio):
+
+    def test_indices_depois_de_remover_e_incluir(self):
+        gerenciador = GerenciadorClientes(os.path.join(self.diretorio, 'clientes.json'))
+        for i in range(6):
+            gerenciador.adicionar_cliente(novo_cliente(f"Cliente {i}", f"ABC{i}000"))
+        gerenciador.remover_cliente(1)
+        gerenciador.remover_cliente(3)
+        gerenciador.adicionar_cliente(novo_cliente("Cliente 6", "ABC6000"))
+
+        resultados = gerenciador.buscar_cliente("cliente")
+        self.assertEqual([indice for indice, _ in resultados], [0, 1, 2, 3, 4])
+        for indice, cliente in resultados:
+            self.assertIs(gerenciador.clientes[indice], cliente)
+        self.assertEqual([cliente.nome for _, cliente in resultados],
+                         ["Cliente 0", "Cliente 2", "Cliente 3", "Cliente 5", "Cliente 6"])
+
+
+if __name__ == '__main__':
+    unittest.main()
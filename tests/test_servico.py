@@ -0,0 +1,44 @@
+import http.client
+import json
+import os
+import threading
+import unittest
+
+from Program.cliente import GerenciadorClientes
+from Program.servico import ServidorClientes
+from tests.auxiliares import TesteComDiretorio, novo_cliente
+
+
+class TesteServico(TesteComDiretorio):
+
+    def setUp(self):
+        super().setUp()
+        self.gerenciador = GerenciadorClientes(os.path.join(self.diretorio, 'clientes.json'))
+        self.gerenciador.adicionar_cliente(novo_cliente("Ana", "AAA1111"))
+        self.servidor = ServidorClientes(('127.0.0.1', 0), self.gerenciador, trabalhadores=2)
+        thread = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.servidor.server_close)
+        self.addCleanup(self.servidor.shutdown)
+
+    def requisitar(self, caminho):
+        conexao = http.client.HTTPConnection('127.0.0.1', self.servidor.server_port, timeout=5)
+        self.addCleanup(conexao.close)
+        conexao.request('GET', caminho)
+        resposta = conexao.getresponse()
+        return resposta.status, json.loads(resposta.read() or b'null')
+
+    def test_erro_inesperado_responde_500(self):
+        def falhar():
+            raise RuntimeError("falha simulada")
+        self.gerenciador.total_clientes = falhar
+
+        status, corpo = self.requisitar('/estatisticas')
+        self.assertEqual(status, 500)
+        self.assertIn('erro', corpo)
+        # O servidor continua atendendo
+        self.assertEqual(self.requisitar('/clientes/placa/AAA1111')[0], 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
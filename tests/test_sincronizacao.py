@@ -0,0 +1,70 @@
+import os
+
+from Program.cliente import GerenciadorClientes
+from tests.auxiliares import TesteComDiretorio, novo_cliente
+
+
+class TesteSincronizacao(TesteComDiretorio):
+    """Duas estações (a e b) usando o mesmo arquivo de dados"""
+
+    def setUp(self):
+        super().setUp()
+        self.arquivo = os.path.join(self.diretorio, 'clientes.json')
+        self.a = GerenciadorClientes(self.arquivo)
+        self.assertTrue(self.a.adicionar_cliente(novo_cliente("A", "AAA1111")))
+        self.b = GerenciadorClientes(self.arquivo)
+
+    @staticmethod
+    def nomes(gerenciador):
+        return sorted(cliente.nome for cliente in gerenciador.clientes)
+
+    def nomes_no_arquivo(self):
+        return self.nomes(GerenciadorClientes(self.arquivo))
+
+    def editar(self, gerenciador, placa, nome):
+        cliente = gerenciador.obter_por_placa(placa)
+        editado = novo_cliente(nome, cliente.placa, id=cliente.id)
+        self.assertTrue(gerenciador.editar_cliente_por_id(cliente.id, editado))
+
+    def test_sincronizar_traz_alteracoes_da_outra_estacao(self):
+        self.a.adicionar_cliente(novo_cliente("C", "CCC3333"))
+        self.editar(self.a, "AAA1111", "A2")
+        self.assertEqual(self.b.sincronizar(), 2)
+        self.assertEqual(self.nomes(self.b), ["A2", "C"])
+        self.assertEqual(self.b.sincronizar(), 0)
+
+    def test_gravacao_mescla_alteracoes_das_duas_estacoes(self):
+        self.a.adicionar_cliente(novo_cliente("C", "CCC3333"))
+        self.b.adicionar_cliente(novo_cliente("B", "BBB2222"))
+        self.assertEqual(self.nomes_no_arquivo(), ["A", "B", "C"])
+        # b ainda não tem C na memória; a próxima sincronização o traz
+        self.assertEqual(self.nomes(self.b), ["A", "B"])
+        self.assertEqual(self.b.sincronizar(), 1)
+        self.assertEqual(self.nomes(self.b), ["A", "B", "C"])
+
+    def test_remocao_na_outra_estacao(self):
+        self.a.remover_cliente_por_id(self.a.obter_por_placa("AAA1111").id)
+        self.b.adicionar_cliente(novo_cliente("B", "BBB2222"))
+        self.assertEqual(self.nomes_no_arquivo(), ["B"])
+        self.assertEqual(self.b.sincronizar(), 1)
+        self.assertEqual(self.nomes(self.b), ["B"])
+
+    def test_alteracao_local_prevalece(self):
+        self.editar(self.a, "AAA1111", "A de a")
+        self.editar(self.b, "AAA1111", "A de b")
+        self.assertEqual(self.nomes_no_arquivo(), ["A de b"])
+        self.assertEqual(self.b.sincronizar(), 0)
+        self.assertEqual(self.a.sincronizar(), 1)
+        self.assertEqual(self.nomes(self.a), ["A de b"])
+
+    def test_cliente_gravado_na_mescla_e_removido_nao_volta(self):
+        # b grava B mesclando com o arquivo que a alterou
+        self.a.adicionar_cliente(novo_cliente("C", "CCC3333"))
+        self.b.adicionar_cliente(novo_cliente("B", "BBB2222"))
+        self.editar(self.a, "AAA1111", "A2")
+        self.b.remover_cliente_por_id(self.b.obter_por_placa("BBB2222").id)
+        self.assertEqual(self.nomes_no_arquivo(), ["A2", "C"])
+        self.assertEqual(self.b.sincronizar(), 2)
+        self.assertEqual(self.nomes(self.b), ["A2", "C"])
+        self.assertEqual(self.a.sincronizar(), 0)
+        self.assertEqual(self.nomes(self.a), ["A2", "C"])
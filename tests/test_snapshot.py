@@ -0,0 +1,106 @@
+import os
+import unittest
+
+from Program.cliente import (CAMPOS_JSON, GerenciadorClientes, clientes_do_arquivo,
+                             serializar_clientes)
+from Program.snapshot import (_CABECALHO, codificar_snapshot, converter_arquivo,
+                              decodificar_snapshot, eh_snapshot)
+from tests.auxiliares import TesteComDiretorio, novo_cliente
+
+
+def clientes_exemplo():
+    return [
+        novo_cliente("João Silva", "ABC1234"),
+        novo_cliente("Zoë \"Aspas\" \\ Barra", "DEF1A23", cidade="São Paulo"),
+        novo_cliente("Ana\tTab", "GHI5678", telefone="(21) 98765-4321", cor="Azul"),
+    ]
+
+
+class TesteSnapshot(unittest.TestCase):
+
+    def test_ida_e_volta_sem_perda(self):
+        clientes = clientes_exemplo()
+        conteudo = serializar_clientes(clientes, 'binario')
+        self.assertTrue(eh_snapshot(conteudo))
+        lidos, ids_gerados = clientes_do_arquivo(conteudo)
+        self.assertFalse(ids_gerados)
+        self.assertEqual([c.to_dict() for c in lidos], [c.to_dict() for c in clientes])
+
+    def test_json_e_binario_convertem_entre_si(self):
+        json_original = serializar_clientes(clientes_exemplo(), 'json')
+        binario = serializar_clientes(clientes_do_arquivo(json_original)[0], 'binario')
+        self.assertEqual(serializar_clientes(clientes_do_arquivo(binario)[0], 'json'),
+                         json_original)
+
+    def test_valores_repetidos_ficam_uma_vez_na_tabela(self):
+        registros = [("Campinas", str(i)) for i in range(100)]
+        colunas = decodificar_snapshot(codificar_snapshot(("cidade", "n"), registros))
+        self.assertEqual(colunas["cidade"], ["Campinas"] * 100)
+        cabecalho = _CABECALHO.unpack_from(codificar_snapshot(("cidade", "n"), registros))
+        self.assertEqual(cabecalho[5], 2 + 1 + 100)  # campos, cidade e números
+
+    def test_lista_vazia(self):
+        conteudo = serializar_clientes([], 'binario')
+        self.assertEqual(clientes_do_arquivo(conteudo)[0], [])
+        self.assertEqual(decodificar_snapshot(conteudo), {campo: [] for campo in CAMPOS_JSON})
+
+    def test_registro_com_campos_a_mais_e_recusado(self):
+        with self.assertRaises(ValueError):
+            codificar_snapshot(("a", "b"), [("1", "2", "3")])
+
+    def test_corrupcao_e_detectada_pelo_crc(self):
+        conteudo = bytearray(serializar_clientes(clientes_exemplo(), 'binario'))
+        conteudo[_CABECALHO.size + 5] ^= 0x01
+        with self.assertRaisesRegex(ValueError, "CRC32"):
+            decodificar_snapshot(bytes(conteudo))
+
+    def test_arquivo_truncado_e_recusado(self):
+        conteudo = serializar_clientes(clientes_exemplo(), 'binario')
+        with self.assertRaises(ValueError):
+            decodificar_snapshot(conteudo[:-4])
+        with self.assertRaises(ValueError):
+            decodificar_snapshot(conteudo[:_CABECALHO.size - 1])
+
+    def test_versao_mais_nova_e_recusada(self):
+        conteudo = bytearray(serializar_clientes(clientes_exemplo(), 'binario'))
+        conteudo[4:6] = (99).to_bytes(2, 'little')
+        with self.assertRaisesRegex(ValueError, "versão"):
+            decodificar_snapshot(bytes(conteudo))
+
+    def test_conteudo_que_nao_e_snapshot(self):
+        self.assertFalse(eh_snapshot(b'[]'))
+        with self.assertRaises(ValueError):
+            decodificar_snapshot(b'[]')
+
+
+class TesteFormatoDoGerenciador(TesteComDiretorio):
+
+    def test_arquivo_bin_e_gravado_e_lido_no_formato_binario(self):
+        arquivo = os.path.join(self.diretorio, 'clientes.bin')
+        gerenciador = GerenciadorClientes(arquivo)
+        for cliente in clientes_exemplo():
+            gerenciador.adicionar_cliente(cliente)
+        with open(arquivo, 'rb') as f:
+            self.assertTrue(eh_snapshot(f.read()))
+        reaberto = GerenciadorClientes(arquivo)
+        self.assertEqual([c.to_dict() for c in reaberto.clientes],
+                         [c.to_dict() for c in gerenciador.clientes])
+
+    def test_formato_precisa_combinar_com_a_extensao(self):
+        with self.assertRaises(ValueError):
+            GerenciadorClientes(os.path.join(self.diretorio, 'clientes.json'), formato='binario')
+        with self.assertRaises(ValueError):
+            GerenciadorClientes(os.path.join(self.diretorio, 'clientes.bin'), formato='json')
+        with self.assertRaises(ValueError):
+            GerenciadorClientes(os.path.join(self.diretorio, 'clientes.json'), formato='xml')
+        with self.assertRaises(ValueError):
+            serializar_clientes([], 'xml')
+
+    def test_conversao_grava_no_formato_do_destino(self):
+        origem = os.path.join(self.diretorio, 'clientes.json')
+        destino = os.path.join(self.diretorio, 'clientes.bin')
+        GerenciadorClientes(origem).adicionar_cliente(novo_cliente("Ana", "AAA1111"))
+        self.assertEqual(converter_arquivo(origem, destino), 1)
+        with open(destino, 'rb') as f:
+            self.assertTrue(eh_snapshot(f.read()))
+        self.assertEqual([c.nome for c in GerenciadorClientes(destino).clientes], ["Ana"])